@@ -75,6 +75,68 @@ load_project_config() {
     return 0
 }
 
+# ============================================================================
+# PORTABILITY
+# ============================================================================
+
+# macOS ships bash 3.2 and a BSD userland. Associative arrays, `wait -n` and
+# {fd} redirections need bash 4.3; below that, callers take their serial or
+# plain path instead.
+if (( BASH_VERSINFO[0] > 4 || (BASH_VERSINFO[0] == 4 && BASH_VERSINFO[1] >= 3) )); then
+    HOOKS_MODERN_BASH=true
+else
+    HOOKS_MODERN_BASH=false
+fi
+
+# coreutils' sha256sum and BSD's shasum print the same format
+if command_exists sha256sum; then
+    SHA256SUM=(sha256sum)
+else
+    SHA256SUM=(shasum -a 256)
+fi
+
+# Set NOW_US to the current time in microseconds. EPOCHREALTIME (bash 5)
+# costs no fork; otherwise date is asked for nanoseconds, falling back to
+# whole seconds where date has no %N (BSD).
+now_us() {
+    if [[ -n "${EPOCHREALTIME:-}" ]]; then
+        NOW_US=${EPOCHREALTIME//[!0-9]/}
+        return
+    fi
+    local ns
+    ns=$(date +%s%N)
+    if [[ "$ns" =~ ^[0-9]+$ ]]; then
+        NOW_US=$((ns / 1000))
+    else
+        NOW_US=$(($(date +%s) * 1000000))
+    fi
+}
+
+# GNU and BSD stat spell their formats differently. FILE_STAMPS prints
+# "<path> <mtime> <size>" per file, with sub-second mtimes where recorded;
+# it is an array so that xargs can run it too.
+case "$OSTYPE" in
+    darwin*|*bsd*)
+        FILE_STAMPS=(stat -f '%N %Fm %z')
+        FILE_MTIME=(stat -L -f %m)
+        ;;
+    *)
+        FILE_STAMPS=(stat -c '%n %.9Y %s')
+        FILE_MTIME=(stat -L -c %Y)
+        ;;
+esac
+
+# Print the stamps of existing files
+# Usage: file_stamps <files...>
+file_stamps() {
+    "${FILE_STAMPS[@]}" "$@" 2>/dev/null
+}
+
+# Print a file's mtime in whole seconds, following symlinks
+file_mtime() {
+    "${FILE_MTIME[@]}" "$1" 2>/dev/null
+}
+
 # ============================================================================
 # ERROR TRACKING
 # ============================================================================
@@ -200,11 +262,109 @@ should_skip_file() {
     return 1
 }
 
+# Compile .claude-hooks-ignore into one extended regex, so a whole file list
+# is filtered by a single grep instead of a should_skip_file call per file.
+# Same pattern forms: dir/** prefixes, * and ? globs, exact paths. Paths may
+# carry a leading ./ or not. Prints nothing when there is nothing to ignore.
+compile_ignore_patterns() {
+    local ignore_file="${1:-.claude-hooks-ignore}"
+    [[ -f "$ignore_file" ]] || return 0
+    awk '
+        /^[[:space:]]*(#|$)/ { next }
+        {
+            p = $0
+            sub(/^\.\//, "", p)
+            dir = (p ~ /\/\*\*$/)
+            if (dir) p = substr(p, 1, length(p) - 3)
+            out = ""
+            for (i = 1; i <= length(p); i++) {
+                c = substr(p, i, 1)
+                if (c == "*") out = out ".*"
+                else if (c == "?") out = out "."
+                else if (index(".^$+(){}|\\", c)) out = out "\\" c
+                else out = out c
+            }
+            if (dir) out = out "/.*"
+            alts = alts (alts == "" ? "" : "|") out
+        }
+        END { if (alts != "") print "^(\\./)?(" alts ")$" }
+    ' "$ignore_file"
+}
+
+# Print the files (one per line on stdin) that carry a claude-hooks-disable
+# comment in their first 5 lines, reading every file in one awk pass
+files_with_disable_comment() {
+    tr '\n' '\0' | xargs -0 -r awk '
+        FNR > 5 { nextfile }
+        /claude-hooks-disable/ { print FILENAME; nextfile }
+    ' 2>/dev/null
+}
+
+# Filter a file list (one per line on stdin) by .claude-hooks-ignore and
+# inline claude-hooks-disable comments
+filter_skipped_files() {
+    local files ignore_regex disabled
+    files=$(grep -v '^$')
+    ignore_regex=$(compile_ignore_patterns)
+    if [[ -n "$ignore_regex" && -n "$files" ]]; then
+        files=$(grep -v -E "$ignore_regex" <<< "$files")
+    fi
+    [[ -z "$files" ]] && return 0
+    disabled=$(files_with_disable_comment <<< "$files")
+    if [[ -n "$disabled" ]]; then
+        log_debug "Skipping files with inline claude-hooks-disable comment: $(echo $disabled)"
+        grep -v -x -F -f <(echo "$disabled") <<< "$files"
+    else
+        echo "$files"
+    fi
+}
+
 # ============================================================================
 # PROJECT TYPE DETECTION
 # ============================================================================
 
+# Detection results are cached per directory in
+# $CLAUDE_HOOKS_CACHE_DIR/project-types, keyed by the mtime of the top-level
+# directory (entries added, removed or renamed) and the mtime and size of
+# the manifests. New sources deeper in the tree do not invalidate the
+# cache; touching a manifest or the top-level directory does.
+PROJECT_TYPE_MANIFESTS=(go.mod go.sum package.json tsconfig.json Cargo.toml pyproject.toml setup.py requirements.txt flake.nix default.nix shell.nix Tiltfile)
+
+# Print the cached result of a detection function, running it on a miss
+# Usage: cached_project_type <detection function>
+cached_project_type() {
+    local detector="$1"
+    local cache_dir="${CLAUDE_HOOKS_CACHE_DIR:-${XDG_CACHE_HOME:-$HOME/.cache}/claude-hooks}"
+    local cache="$cache_dir/project-types"
+    local key
+    key=$(file_stamps . "${PROJECT_TYPE_MANIFESTS[@]}" | tr '\n' ' ')
+    local prefix="$detector	$PWD	$key	"
+
+    local line
+    line=$(grep -F -m1 "$prefix" "$cache" 2>/dev/null)
+    if [[ -n "$line" ]]; then
+        log_debug "Detected project type: ${line##*	} (cached)"
+        echo "${line##*	}"
+        return
+    fi
+
+    local project_type
+    project_type=$("$detector")
+    if mkdir -p "$cache_dir" 2>/dev/null; then
+        # Replace this directory's entry; temp file and rename keep readers safe
+        local tmp="$cache.$$.tmp"
+        { grep -v -F "$detector	$PWD	" "$cache" 2>/dev/null; printf '%s%s\n' "$prefix" "$project_type"; } > "$tmp" \
+            && mv -f "$tmp" "$cache"
+    fi
+    echo "$project_type"
+}
+
 detect_project_type() {
+    cached_project_type scan_project_type
+}
+
+# Uncached detection: manifests first, then shallow find scans
+scan_project_type() {
     local project_type="unknown"
     local types=()
     
@@ -0,0 +1,227 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+hooks - command line access to the central hook logs.
+
+Usage:
+- ./hooks_cli.py index                                  # Ingest new log records
+- ./hooks_cli.py query --session <id> --tool Bash       # Bash commands in a session
+- ./hooks_cli.py query --tool Edit --file <path> --today --count
+- ./hooks_cli.py search "websocket reconnect"           # Ranked transcript search
+- ./hooks_cli.py stats --sort tokens --by-project       # Costliest projects
+- ./hooks_cli.py latency --bash                         # Slowest Bash programs
+- ./hooks_cli.py metrics --format prom > hooks.prom     # node-exporter textfile
+- ./hooks_cli.py top                                    # Live dashboard (q quits)
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add utils/logs to path to import the shared log modules
+sys.path.insert(0, str(Path(__file__).parent / "utils" / "logs"))
+import dashboard
+import latency
+import log_index
+import metrics
+import transcript_search
+import transcript_stats
+
+
+def parse_time(value):
+    """Parse an ISO date/time or a relative '<n>h' / '<n>d' into epoch seconds."""
+    if value[-1:] in ("h", "d") and value[:-1].isdigit():
+        unit = timedelta(hours=1) if value[-1] == "h" else timedelta(days=1)
+        return (datetime.now() - int(value[:-1]) * unit).timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+def cmd_index(args):
+    added = log_index.update_index()
+    print(f"Indexed {added} new record(s) into {log_index.get_index_path()}")
+
+
+def cmd_query(args):
+    if not args.no_refresh:
+        log_index.update_index()
+
+    since = parse_time(args.since) if args.since else None
+    if args.today:
+        since = datetime.combine(datetime.now().date(), datetime.min.time()).timestamp()
+    filters = dict(
+        session_id=args.session,
+        hook_event_name=args.event,
+        tool_name=args.tool,
+        file_path=args.file,
+        command=args.command,
+        since=since,
+        until=parse_time(args.until) if args.until else None,
+    )
+
+    if args.count:
+        print(log_index.count(**filters))
+        return
+
+    for row in log_index.query(limit=args.limit, **filters):
+        if args.json:
+            print(json.dumps(row))
+        else:
+            when = datetime.fromtimestamp(row["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
+            detail = row["command"] or row["file_path"] or ""
+            print(f"{when}  {row['session_id'] or '-':36}  "
+                  f"{row['hook_event_name'] or '-':16}  {row['tool_name'] or '-':10}  {detail}")
+
+
+def cmd_search(args):
+    if not args.no_refresh:
+        transcript_search.update_search_index()
+
+    results, elapsed_ms = transcript_search.timed_search(
+        " ".join(args.terms), limit=args.limit, session_id=args.session, raw=args.raw)
+    for hit in results:
+        if args.json:
+            print(json.dumps(hit))
+        else:
+            print(f"{hit['session_id']}  turn {hit['turn']:>5}  @{hit['offset']:<10}  "
+                  f"{hit['timestamp'] or '':24}  {hit['snippet']}")
+    print(f"{len(results)} result(s) in {elapsed_ms:.1f} ms", file=sys.stderr)
+
+
+def cmd_stats(args):
+    if args.refresh:
+        transcript_stats.refresh_all()
+
+    key = "project" if args.by_project else "session_id"
+    if not args.json:
+        print(f"{key:40}  {'turns':>6}  {'tools':>6}  {'in tok':>10}  {'out tok':>9}  "
+              f"{'cache rd':>10}  {'active':>8}  {'idle':>8}  top tools")
+    for row in transcript_stats.report(sort=args.sort, by_project=args.by_project,
+                                       limit=args.limit):
+        if args.json:
+            print(json.dumps(row))
+            continue
+        tools = json.loads(row["tools"]) if row.get("tools") else {}
+        top = ", ".join(f"{n}={c}" for n, c in
+                        sorted(tools.items(), key=lambda kv: -kv[1])[:3])
+        print(f"{(row[key] or '-')[-40:]:40}  {row['turns']:>6}  {row['tool_calls']:>6}  "
+              f"{row['input_tokens']:>10}  {row['output_tokens']:>9}  "
+              f"{row['cache_read_input_tokens']:>10}  {row['active_seconds'] / 60:>7.1f}m  "
+              f"{row['idle_seconds'] / 60:>7.1f}m  {top}")
+
+
+def cmd_latency(args):
+    summary = latency.update_latency()
+    group = "bash" if args.bash else "tools"
+    rows = latency.report_rows(summary, group)[:args.limit]
+    if args.json:
+        for name, row in rows:
+            print(json.dumps(dict(row, name=name)))
+        return
+
+    label = "argv[0]" if args.bash else "tool"
+    print(f"{label:24}  {'calls':>7}  {'mean':>9}  {'p50':>9}  {'p90':>9}  "
+          f"{'p99':>9}  {'max':>9}  {'total':>9}")
+    for name, row in rows:
+        print(f"{name[:24]:24}  {row['count']:>7}  {row['mean_ms']:>7.0f}ms  "
+              f"{row['p50_ms']:>7.0f}ms  {row['p90_ms']:>7.0f}ms  {row['p99_ms']:>7.0f}ms  "
+              f"{row['max_ms']:>7.0f}ms  {row['total_ms'] / 1000:>8.1f}s")
+
+
+def cmd_metrics(args):
+    data = metrics.load_metrics()
+    if args.format == "prom":
+        sys.stdout.write(metrics.to_prometheus(data))
+    else:
+        print(json.dumps(data, indent=2))
+
+
+def cmd_top(args):
+    state = dashboard.DashboardState(backfill=args.backfill)
+    if args.once:
+        state.poll()
+        print("\n".join(dashboard.render_lines(state)))
+        return
+    try:
+        dashboard.run_curses(state, args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="hooks", description="Query the central hook logs")
+    sub = parser.add_subparsers(dest="command_name", required=True)
+
+    p = sub.add_parser("index", help="Ingest records appended since the last run")
+    p.set_defaults(func=cmd_index)
+
+    p = sub.add_parser("query", help="Stream indexed hook events matching filters")
+    p.add_argument("--session", help="session_id")
+    p.add_argument("--event", help="hook_event_name, e.g. PreToolUse")
+    p.add_argument("--tool", help="tool_name, e.g. Bash or Edit")
+    p.add_argument("--file", help="exact tool_input file path")
+    p.add_argument("--command", help="exact Bash command as typed, even if its logged "
+                                      "copy has secrets redacted (matched by hash)")
+    since = p.add_mutually_exclusive_group()
+    since.add_argument("--since", help="ISO date/time or relative like 2h, 7d")
+    since.add_argument("--today", action="store_true", help="only events since midnight")
+    p.add_argument("--until", help="ISO date/time or relative like 2h, 7d")
+    p.add_argument("--limit", type=int, help="maximum rows to print")
+    p.add_argument("--count", action="store_true", help="print only the number of matches")
+    p.add_argument("--json", action="store_true", help="emit one JSON object per line")
+    p.add_argument("--no-refresh", action="store_true", help="skip ingesting new records first")
+    p.set_defaults(func=cmd_query)
+
+    p = sub.add_parser("search", help="Ranked full-text search over session transcripts")
+    p.add_argument("terms", nargs="+", help="words, tool names or file paths to find")
+    p.add_argument("--session", help="restrict to one session_id")
+    p.add_argument("--limit", type=int, default=20, help="maximum hits to print")
+    p.add_argument("--raw", action="store_true", help="pass terms through as FTS5 syntax")
+    p.add_argument("--json", action="store_true", help="emit one JSON object per line")
+    p.add_argument("--no-refresh", action="store_true", help="skip indexing new turns first")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("stats", help="Per-session token, tool and turn totals")
+    p.add_argument("--sort", choices=sorted(transcript_stats.SORT_COLUMNS), default="tokens")
+    p.add_argument("--by-project", action="store_true", help="aggregate sessions per project")
+    p.add_argument("--limit", type=int, default=20, help="maximum rows to print")
+    p.add_argument("--refresh", action="store_true",
+                   help="fold in transcripts from all Stop logs first")
+    p.add_argument("--json", action="store_true", help="emit one JSON object per line")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("latency", help="Tool-call duration histograms from paired Pre/Post events")
+    p.add_argument("--bash", action="store_true", help="group Bash calls by argv[0]")
+    p.add_argument("--limit", type=int, default=30, help="maximum rows to print")
+    p.add_argument("--json", action="store_true", help="emit one JSON object per line")
+    p.set_defaults(func=cmd_latency)
+
+    p = sub.add_parser("metrics", help="Export hook self-timing metrics")
+    p.add_argument("--format", choices=("prom", "json"), default="prom",
+                   help="Prometheus textfile format or raw JSON")
+    p.set_defaults(func=cmd_metrics)
+
+    p = sub.add_parser("top", help="Live dashboard of tool calls, blocks, TTS/LLM latency")
+    p.add_argument("--interval", type=float, default=1.0, help="seconds between polls")
+    p.add_argument("--backfill", action="store_true",
+                   help="start from the beginning of today's logs instead of their end")
+    p.add_argument("--once", action="store_true", help="print one snapshot and exit")
+    p.set_defaults(func=cmd_top)
+
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    try:
+        args.func(args)
+    except BrokenPipeError:
+        pass  # Output piped into head or similar
+
+
+if __name__ == '__main__':
+    main()
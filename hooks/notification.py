@@ -14,6 +14,13 @@ import subprocess
 import random
 from pathlib import Path
 
+# Add utils/logs to path to import the shared log store
+sys.path.insert(0, str(Path(__file__).parent / "utils" / "logs"))
+from log_store import append_log
+from metrics import HookMetrics
+
+metrics = HookMetrics('notification')
+
 try:
     from dotenv import load_dotenv
     load_dotenv()
@@ -67,12 +74,13 @@ def announce_notification():
             notification_message = "Your agent needs your input"
         
         # Call the TTS script with the notification message
-        subprocess.run([
-            "uv", "run", tts_script, notification_message
-        ], 
-        capture_output=True,  # Suppress output
-        timeout=10  # 10-second timeout
-        )
+        with metrics.span('tts'):
+            subprocess.run([
+                "uv", "run", tts_script, notification_message
+            ], 
+            capture_output=True,  # Suppress output
+            timeout=10  # 10-second timeout
+            )
         
     except (subprocess.TimeoutExpired, subprocess.SubprocessError, FileNotFoundError):
         # Fail silently if TTS encounters issues
@@ -90,30 +98,12 @@ def main():
         args = parser.parse_args()
         
         # Read JSON input from stdin
-        input_data = json.loads(sys.stdin.read())
-        
-        # Ensure log directory exists
-        import os
-        log_dir = os.path.join(os.getcwd(), 'logs')
-        os.makedirs(log_dir, exist_ok=True)
-        log_file = os.path.join(log_dir, 'notification.json')
-        
-        # Read existing log data or initialize empty list
-        if os.path.exists(log_file):
-            with open(log_file, 'r') as f:
-                try:
-                    log_data = json.load(f)
-                except (json.JSONDecodeError, ValueError):
-                    log_data = []
-        else:
-            log_data = []
-        
-        # Append new data
-        log_data.append(input_data)
+        with metrics.span('parse'):
+            input_data = json.loads(sys.stdin.read())
         
-        # Write back to file with formatting
-        with open(log_file, 'w') as f:
-            json.dump(log_data, f, indent=2)
+        # Append to this session's log outside the project tree
+        with metrics.span('log_write'):
+            append_log(input_data, 'notification')
         
         # Announce notification via TTS only if --notify flag is set
         # Skip TTS for the generic "Claude is waiting for your input" message
@@ -6,34 +6,50 @@
 import json
 import os
 import sys
+import time
 from pathlib import Path
 
+# Add utils/logs to path to import the shared log store
+sys.path.insert(0, str(Path(__file__).parent / "utils" / "logs"))
+from log_store import READ_ONLY_TOOLS, append_log, slim_record, stamp_record
+from blob_store import externalize_payload
+from metrics import HookMetrics
+
+# Add utils/policy to path to import the secret scanner
+sys.path.insert(0, str(Path(__file__).parent / "utils" / "policy"))
+from secret_scanner import redact_payload
+
+metrics = HookMetrics('post_tool_use')
+
 def main():
     try:
         # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
-        
-        # Ensure log directory exists
-        log_dir = Path.cwd() / 'logs'
-        log_dir.mkdir(parents=True, exist_ok=True)
-        log_path = log_dir / 'post_tool_use.json'
+        with metrics.span('parse'):
+            input_data = json.load(sys.stdin)
+            record = stamp_record(input_data)
         
-        # Read existing log data or initialize empty list
-        if log_path.exists():
-            with open(log_path, 'r') as f:
-                try:
-                    log_data = json.load(f)
-                except (json.JSONDecodeError, ValueError):
-                    log_data = []
-        else:
-            log_data = []
+        # Read-only tools log a slim record without the file contents or
+        # search output they returned
+        if input_data.get('tool_name') in READ_ONLY_TOOLS:
+            with metrics.span('log_write'):
+                append_log(slim_record(record), 'post_tool_use')
+            sys.exit(0)
         
-        # Append new data
-        log_data.append(input_data)
+        # Redact credentials before anything reaches the log or blob store
+        with metrics.span('secret_scan'):
+            started = time.perf_counter()
+            record, redactions = redact_payload(record)
+            record['secret_scan'] = {
+                'ms': round((time.perf_counter() - started) * 1000, 3),
+                'redacted': redactions,
+            }
+        for kind, n in redactions.items():
+            metrics.count('claude_hook_secrets_redacted_total', n, kind=kind)
         
-        # Write back to file with formatting
-        with open(log_path, 'w') as f:
-            json.dump(log_data, f, indent=2)
+        # Move large file bodies and outputs into the blob store, then
+        # append to this session's log outside the project tree
+        with metrics.span('log_write'):
+            append_log(externalize_payload(record), 'post_tool_use')
         
         sys.exit(0)
         
@@ -6,8 +6,20 @@
 import json
 import sys
 import re
+import time
 from pathlib import Path
 
+# Add utils/logs to path to import the shared log store
+sys.path.insert(0, str(Path(__file__).parent / "utils" / "logs"))
+from log_store import READ_ONLY_TOOLS, append_log, slim_record, stamp_record
+from metrics import HookMetrics
+
+# Add utils/policy to path to import the secret scanner
+sys.path.insert(0, str(Path(__file__).parent / "utils" / "policy"))
+from secret_scanner import redact_payload
+
+metrics = HookMetrics('pre_tool_use')
+
 def is_dangerous_rm_command(command):
     """
     Block ALL rm commands for safety.
@@ -110,6 +122,38 @@ def is_env_file_access(tool_name, tool_input):
     
     return False
 
+# Fields naming paths or path globs, per read-only tool (Grep's pattern
+# searches file contents, not names)
+ENV_PATH_FIELDS = {
+    'Glob': ('path', 'pattern'),
+    'Grep': ('path', 'glob'),
+    'LS': ('path',),
+}
+
+def is_env_file_name(name):
+    """
+    A .env file name or a glob that would match one: .env, .env.local, .env*.
+    .env.sample is allowed, and so are .envrc and names merely containing .env.
+    """
+    if name == '.env.sample':
+        return False
+    return name == '.env' or name.startswith('.env.') or name[:5] in ('.env*', '.env?', '.env[')
+
+def is_env_path_access(tool_name, tool_input):
+    """
+    Path policy for read-only tools. Read gets exactly the verdict of
+    is_env_file_access; the paths and globs of Glob, Grep and LS are blocked
+    when any component (or brace alternative) is a .env file name.
+    """
+    if tool_name == 'Read':
+        return is_env_file_access(tool_name, tool_input)
+    for key in ENV_PATH_FIELDS.get(tool_name, ()):
+        path = tool_input.get(key) or ''
+        if isinstance(path, str) and any(is_env_file_name(name)
+                                         for name in re.split(r'[/\\{},]', path)):
+            return True
+    return False
+
 def is_dangerous_disk_command(command):
     """
     Detect commands that could damage disks or filesystems.
@@ -250,89 +294,108 @@ def is_package_removal_command(command):
 def main():
     try:
         # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
+        with metrics.span('parse'):
+            input_data = json.load(sys.stdin)
+            record = stamp_record(input_data)
         
         tool_name = input_data.get('tool_name', '')
         tool_input = input_data.get('tool_input', {})
         
-        # Check for .env file access (blocks access to sensitive environment files)
-        if is_env_file_access(tool_name, tool_input):
-            print("BLOCKED: Access to .env files containing sensitive data is prohibited", file=sys.stderr)
-            print("Use .env.sample for template files instead", file=sys.stderr)
-            sys.exit(2)  # Exit code 2 blocks tool call and shows error to Claude
+        # Fast path for read-only tools: path policy and a slim log record only
+        if tool_name in READ_ONLY_TOOLS:
+            with metrics.span('policy'):
+                if is_env_path_access(tool_name, tool_input):
+                    print("BLOCKED: Access to .env files containing sensitive data is prohibited", file=sys.stderr)
+                    print("Use .env.sample for template files instead", file=sys.stderr)
+                    metrics.count('claude_hook_blocked_total', rule='env_file')
+                    sys.exit(2)
+            with metrics.span('log_write'):
+                append_log(slim_record(record), 'pre_tool_use')
+            sys.exit(0)
         
-        # Check for dangerous commands
-        if tool_name == 'Bash':
-            command = tool_input.get('command', '')
-            
-            # Block rm -rf commands with comprehensive pattern matching
-            if is_dangerous_rm_command(command):
-                print("BLOCKED: Dangerous rm command detected and prevented", file=sys.stderr)
+        # Run every policy rule family (exit code 2 blocks the call)
+        with metrics.span('policy'):
+            # Check for .env file access (blocks access to sensitive environment files)
+            if is_env_file_access(tool_name, tool_input):
+                print("BLOCKED: Access to .env files containing sensitive data is prohibited", file=sys.stderr)
+                print("Use .env.sample for template files instead", file=sys.stderr)
+                metrics.count('claude_hook_blocked_total', rule='env_file')
                 sys.exit(2)  # Exit code 2 blocks tool call and shows error to Claude
+        
+            # Check for dangerous commands
+            if tool_name == 'Bash':
+                command = tool_input.get('command', '')
             
-            # Block environment variable exposure commands
-            if is_env_exposure_command(command):
-                print("BLOCKED: Command could expose sensitive environment variables", file=sys.stderr)
-                print("Environment variable access is prohibited for security", file=sys.stderr)
-                sys.exit(2)  # Exit code 2 blocks tool call and shows error to Claude
+                # Block rm -rf commands with comprehensive pattern matching
+                if is_dangerous_rm_command(command):
+                    print("BLOCKED: Dangerous rm command detected and prevented", file=sys.stderr)
+                    metrics.count('claude_hook_blocked_total', rule='rm')
+                    sys.exit(2)  # Exit code 2 blocks tool call and shows error to Claude
             
-            # Block disk/filesystem damaging commands
-            if is_dangerous_disk_command(command):
-                print("BLOCKED: Command could damage disk or filesystem", file=sys.stderr)
-                print("Disk operations like dd, mkfs, fdisk are prohibited", file=sys.stderr)
-                sys.exit(2)
+                # Block environment variable exposure commands
+                if is_env_exposure_command(command):
+                    print("BLOCKED: Command could expose sensitive environment variables", file=sys.stderr)
+                    print("Environment variable access is prohibited for security", file=sys.stderr)
+                    metrics.count('claude_hook_blocked_total', rule='env_exposure')
+                    sys.exit(2)  # Exit code 2 blocks tool call and shows error to Claude
             
-            # Block download-and-execute patterns
-            if is_download_execute_command(command):
-                print("BLOCKED: Download-and-execute pattern detected", file=sys.stderr)
-                print("Piping downloads directly to interpreters is prohibited", file=sys.stderr)
-                sys.exit(2)
+                # Block disk/filesystem damaging commands
+                if is_dangerous_disk_command(command):
+                    print("BLOCKED: Command could damage disk or filesystem", file=sys.stderr)
+                    print("Disk operations like dd, mkfs, fdisk are prohibited", file=sys.stderr)
+                    metrics.count('claude_hook_blocked_total', rule='disk')
+                    sys.exit(2)
             
-            # Block system control commands
-            if is_system_control_command(command):
-                print("BLOCKED: System control command detected", file=sys.stderr)
-                print("Commands that could affect system stability are prohibited", file=sys.stderr)
-                sys.exit(2)
+                # Block download-and-execute patterns
+                if is_download_execute_command(command):
+                    print("BLOCKED: Download-and-execute pattern detected", file=sys.stderr)
+                    print("Piping downloads directly to interpreters is prohibited", file=sys.stderr)
+                    metrics.count('claude_hook_blocked_total', rule='download_execute')
+                    sys.exit(2)
             
-            # Block dangerous permission changes
-            if is_permission_change_command(command):
-                print("BLOCKED: Dangerous permission change detected", file=sys.stderr)
-                print("Unsafe chmod/chown operations are prohibited", file=sys.stderr)
-                sys.exit(2)
+                # Block system control commands
+                if is_system_control_command(command):
+                    print("BLOCKED: System control command detected", file=sys.stderr)
+                    print("Commands that could affect system stability are prohibited", file=sys.stderr)
+                    metrics.count('claude_hook_blocked_total', rule='system_control')
+                    sys.exit(2)
             
-            # Block destructive git operations
-            if is_git_destructive_command(command):
-                print("BLOCKED: Destructive git operation detected", file=sys.stderr)
-                print("Force push, hard reset, and history rewriting are prohibited", file=sys.stderr)
-                sys.exit(2)
+                # Block dangerous permission changes
+                if is_permission_change_command(command):
+                    print("BLOCKED: Dangerous permission change detected", file=sys.stderr)
+                    print("Unsafe chmod/chown operations are prohibited", file=sys.stderr)
+                    metrics.count('claude_hook_blocked_total', rule='permission_change')
+                    sys.exit(2)
             
-            # Block package removal
-            if is_package_removal_command(command):
-                print("BLOCKED: Package removal command detected", file=sys.stderr)
-                print("Removing system packages or tools is prohibited", file=sys.stderr)
-                sys.exit(2)
-        
-        # Ensure log directory exists
-        log_dir = Path.cwd() / 'logs'
-        log_dir.mkdir(parents=True, exist_ok=True)
-        log_path = log_dir / 'pre_tool_use.json'
-        
-        # Read existing log data or initialize empty list
-        if log_path.exists():
-            with open(log_path, 'r') as f:
-                try:
-                    log_data = json.load(f)
-                except (json.JSONDecodeError, ValueError):
-                    log_data = []
-        else:
-            log_data = []
+                # Block destructive git operations
+                if is_git_destructive_command(command):
+                    print("BLOCKED: Destructive git operation detected", file=sys.stderr)
+                    print("Force push, hard reset, and history rewriting are prohibited", file=sys.stderr)
+                    metrics.count('claude_hook_blocked_total', rule='git_destructive')
+                    sys.exit(2)
+            
+                # Block package removal
+                if is_package_removal_command(command):
+                    print("BLOCKED: Package removal command detected", file=sys.stderr)
+                    print("Removing system packages or tools is prohibited", file=sys.stderr)
+                    metrics.count('claude_hook_blocked_total', rule='package_removal')
+                    sys.exit(2)
         
-        # Append new data
-        log_data.append(input_data)
+        # Redact credentials (Write/Edit content, inline tokens in commands)
+        # before the record reaches the log
+        with metrics.span('secret_scan'):
+            started = time.perf_counter()
+            record, redactions = redact_payload(record)
+            record['secret_scan'] = {
+                'ms': round((time.perf_counter() - started) * 1000, 3),
+                'redacted': redactions,
+            }
+        for kind, n in redactions.items():
+            metrics.count('claude_hook_secrets_redacted_total', n, kind=kind)
         
-        # Write back to file with formatting
-        with open(log_path, 'w') as f:
-            json.dump(log_data, f, indent=2)
+        # Append to this session's log outside the project tree
+        with metrics.span('log_write'):
+            append_log(record, 'pre_tool_use')
         
         sys.exit(0)
         
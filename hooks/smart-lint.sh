@@ -11,6 +11,50 @@
 # OPTIONS
 #   --debug       Enable debug output
 #   --fast        Skip slow checks (import cycles, security scans)
+#   --all         Lint the whole project even when run from a hook
+#   --watch       Keep running; re-lint files as they change
+#   --status [f]  Print the verdicts recorded by --watch (for one file: exit
+#                 0 when clean and current, 2 otherwise)
+#   --stop-daemons  Stop this project's formatter daemons
+#
+# PARALLELISM
+#   In mixed projects each language's linters run concurrently, up to
+#   CLAUDE_HOOKS_LINT_JOBS at a time (default: CPU count). Output is
+#   buffered per language and printed in detection order. Below bash 4.3
+#   (macOS ships 3.2) languages run one after another, and --watch and the
+#   formatter daemons are unavailable.
+#
+# SCOPE
+#   When a PostToolUse payload arrives on stdin, only the file it edited
+#   (tool_input.file_path or notebook_path) is linted, with the tools for
+#   that file's language. Payloads without a path fall back to the files
+#   changed according to git. Without a payload the whole project is linted.
+#
+# FILES
+#   Whole-project runs list files once: git ls-files inside a work tree (so
+#   .gitignore applies), a pruned find elsewhere. .claude-hooks-ignore is
+#   compiled into one regex and disable comments are found in one awk pass;
+#   each language then lints every remaining file, uncapped.
+#
+# WATCH
+#   --watch follows changes with inotifywait, or by polling every
+#   CLAUDE_HOOKS_WATCH_POLL seconds (default 2) without it. Once no change has
+#   arrived for CLAUDE_HOOKS_WATCH_DEBOUNCE seconds (default 0.5), each changed
+#   file is linted on its own and its verdict is stored with a hash of its
+#   contents. While a watcher runs, a hook run whose files all have current
+#   clean verdicts returns at once without starting any tool.
+#
+# TIMING
+#   With CLAUDE_HOOKS_SHOW_TIMING=true each run appends a JSON report (wall
+#   time, file counts, cache hits and issues per language and tool) to
+#   $CLAUDE_HOOKS_TIMING_FILE, default $CLAUDE_HOOKS_CACHE_DIR/lint-timing.jsonl.
+#
+# FORMATTER DAEMONS
+#   With CLAUDE_HOOKS_FORMAT_DAEMONS=true, black formatting goes through a
+#   per-project blackd (settings from [tool.black] sent as request headers)
+#   and prettier through prettierd when it is installed. Whatever a daemon
+#   cannot handle falls back to the CLI. Daemons stop after
+#   CLAUDE_HOOKS_DAEMON_IDLE seconds without use (default 900).
 #
 # EXIT CODES
 #   0 - Success (all checks passed - everything is ✅ GREEN)
@@ -20,6 +64,12 @@
 # CONFIGURATION
 #   Project-specific overrides can be placed in .claude-hooks-config.sh
 #   See inline documentation for all available options.
+#
+# CACHE
+#   Files that passed black, ruff, flake8, prettier, nixpkgs-fmt or alejandra
+#   are remembered by path, content hash and nearest config under
+#   $CLAUDE_HOOKS_CACHE_DIR (default ~/.cache/claude-hooks) and skipped until
+#   they, the tool or its config change.
 
 # Don't use set -e - we need to control exit codes carefully
 set +e
@@ -34,6 +84,11 @@ source "${SCRIPT_DIR}/common-helpers.sh"
 
 # Add Tilt project detection to the common detect_project_type function
 detect_project_type_with_tilt() {
+    cached_project_type scan_project_type_with_tilt
+}
+
+# Uncached detection, including Tilt
+scan_project_type_with_tilt() {
     local project_type="unknown"
     local types=()
     
@@ -84,7 +139,171 @@ get_modified_files() {
         # Get files modified in the last commit or currently staged/modified
         git diff --name-only HEAD 2>/dev/null || true
         git diff --cached --name-only 2>/dev/null || true
+        # New files the edit tools created
+        git ls-files --others --exclude-standard 2>/dev/null || true
+    fi
+}
+
+# ============================================================================
+# EDIT SCOPE
+# ============================================================================
+
+# Files this run is limited to; only used when LINT_SCOPED is true
+LINT_SCOPED=false
+declare -a LINT_SCOPE_FILES=()
+
+# Print the paths edited by the PostToolUse payload on stdin, if any
+read_hook_payload_paths() {
+    [[ -t 0 ]] && return 1
+    command_exists python3 || return 1
+    python3 -c '
+import json, sys
+try:
+    data = json.load(sys.stdin)
+except ValueError:
+    sys.exit(1)
+tool_input = (data.get("tool_input") or {}) if isinstance(data, dict) else {}
+if not isinstance(tool_input, dict):
+    sys.exit(1)
+for key in ("file_path", "notebook_path"):
+    if isinstance(tool_input.get(key), str) and tool_input[key]:
+        print(tool_input[key])
+' 2>/dev/null
+}
+
+# Turn a path into the ./relative form that find produces; fails for files
+# outside the project
+to_project_path() {
+    local path="$1"
+    case "$path" in
+        "$PWD"/*) echo "./${path#"$PWD"/}" ;;
+        /*) return 1 ;;
+        ./*) echo "$path" ;;
+        *) echo "./$path" ;;
+    esac
+}
+
+# Limit this run to the edited files (or the git-changed files)
+collect_edit_scope() {
+    local payload_paths
+    payload_paths=$(read_hook_payload_paths) || return 0  # No payload: whole project
+    LINT_SCOPED=true
+
+    local source="edit"
+    if [[ -z "$payload_paths" ]]; then
+        payload_paths=$(get_modified_files | sort -u)
+        source="git diff"
+    fi
+
+    local path project_path
+    while IFS= read -r path; do
+        [[ -z "$path" ]] && continue
+        project_path=$(to_project_path "$path") || continue
+        [[ -f "$project_path" ]] && LINT_SCOPE_FILES+=("$project_path")
+    done <<< "$payload_paths"
+    log_debug "Lint scope ($source): ${LINT_SCOPE_FILES[*]:-none}"
+}
+
+# Print scoped files whose names match an extended regex
+scoped_files() {
+    local pattern="$1"
+    local file
+    for file in "${LINT_SCOPE_FILES[@]}"; do
+        [[ "$file" =~ $pattern ]] && echo "$file"
+    done
+}
+
+# Project type built from the scoped files' languages alone
+scoped_project_type() {
+    local types=()
+    [[ -n "$(scoped_files '\.go$')" ]] && types+=("go")
+    [[ -n "$(scoped_files '\.py$')" ]] && types+=("python")
+    [[ -n "$(scoped_files '\.(js|ts|jsx|tsx)$')" ]] && types+=("javascript")
+    [[ -n "$(scoped_files '\.rs$')" ]] && types+=("rust")
+    [[ -n "$(scoped_files '\.nix$')" ]] && types+=("nix")
+    [[ -n "$(scoped_files '(^|/)Tiltfile$|\.tiltfile$')" ]] && types+=("tilt")
+
+    if [[ ${#types[@]} -eq 0 ]]; then
+        echo "none"
+    elif [[ ${#types[@]} -eq 1 ]]; then
+        echo "${types[0]}"
+    else
+        echo "mixed:$(IFS=,; echo "${types[*]}")"
+    fi
+}
+
+# ============================================================================
+# FILE DISCOVERY
+# ============================================================================
+
+# The project is walked once per run; every linter reads its language's
+# bucket from LINT_FILES_<language>, already filtered by .claude-hooks-ignore
+# and inline claude-hooks-disable comments. The tables below are indexed
+# arrays in LINT_LANGUAGES order, since bash 3.2 has no associative ones.
+LINT_LANGUAGES=(python javascript rust nix)
+LINT_FILE_PATTERNS=(
+    '\.py$'
+    '\.(js|ts|jsx|tsx)$'
+    '\.rs$'
+    '\.nix$'
+)
+LINT_FILE_EXCLUDES=(
+    '(^|/)(venv|\.venv|__pycache__|\.git)/'
+    '(^|/)(node_modules|dist|build|\.git)/'
+    '(^|/)(target|\.git)/'
+    '(^|/)result/|/nix/store/'
+)
+
+# List every project file in ./relative form: git's view (tracked plus
+# untracked, minus .gitignore) inside a work tree, a pruned find elsewhere
+list_project_files() {
+    if command_exists git && git rev-parse --is-inside-work-tree &>/dev/null; then
+        git ls-files --cached --others --exclude-standard 2>/dev/null | sed 's#^#./#'
+    else
+        find . \( -name .git -o -name node_modules -o -name venv -o -name .venv \
+            -o -name __pycache__ -o -name target -o -name result \) -prune \
+            -o -type f -print 2>/dev/null
+    fi
+}
+
+# Fill LINT_FILES from the edit scope or a single walk of the project
+discover_lint_files() {
+    local files
+    if [[ "$LINT_SCOPED" == "true" ]]; then
+        files=$(printf '%s\n' "${LINT_SCOPE_FILES[@]}")
+    else
+        files=$(list_project_files)
     fi
+
+    # Only lintable files are checked for existence and disable comments
+    local pattern
+    pattern=$(IFS='|'; echo "${LINT_FILE_PATTERNS[*]}")
+    files=$(grep -E "$pattern" <<< "$files" | filter_skipped_files)
+
+    local i lang file bucket
+    local -i count
+    local counts=""
+    for i in "${!LINT_LANGUAGES[@]}"; do
+        lang=${LINT_LANGUAGES[$i]}
+        bucket=""
+        count=0
+        while IFS= read -r file; do
+            # Tracked files deleted in the work tree are still in the index
+            if [[ -f "$file" ]]; then
+                bucket+="$file"$'\n'
+                count+=1
+            fi
+        done < <(grep -E "${LINT_FILE_PATTERNS[$i]}" <<< "$files" | grep -v -E "${LINT_FILE_EXCLUDES[$i]}")
+        printf -v "LINT_FILES_$lang" '%s' "$bucket"
+        counts+=" $lang=$count"
+    done
+    log_debug "Discovered files:$counts"
+}
+
+# Print a language's discovered files, space-separated
+lint_files() {
+    local bucket="LINT_FILES_$1"
+    echo ${!bucket}
 }
 
 # ============================================================================
@@ -127,6 +346,9 @@ load_config() {
     export CLAUDE_HOOKS_ENABLED="${CLAUDE_HOOKS_ENABLED:-true}"
     export CLAUDE_HOOKS_FAIL_FAST="${CLAUDE_HOOKS_FAIL_FAST:-false}"
     export CLAUDE_HOOKS_SHOW_TIMING="${CLAUDE_HOOKS_SHOW_TIMING:-false}"
+    export CLAUDE_HOOKS_LINT_JOBS="${CLAUDE_HOOKS_LINT_JOBS:-$(nproc 2>/dev/null || echo 4)}"
+    export CLAUDE_HOOKS_FORMAT_DAEMONS="${CLAUDE_HOOKS_FORMAT_DAEMONS:-false}"
+    export CLAUDE_HOOKS_DAEMON_IDLE="${CLAUDE_HOOKS_DAEMON_IDLE:-900}"
     
     # Language enables
     export CLAUDE_HOOKS_GO_ENABLED="${CLAUDE_HOOKS_GO_ENABLED:-true}"
@@ -143,14 +365,571 @@ load_config() {
             exit 2
         }
     fi
-    
-    # Quick exit if hooks are disabled
+}
+
+# Quick exit if hooks are disabled. Kept out of load_config so that the
+# daemon-control modes can still stop daemons after hooks are turned off.
+exit_if_disabled() {
     if [[ "$CLAUDE_HOOKS_ENABLED" != "true" ]]; then
         log_info "Claude hooks are disabled"
         exit 0
     fi
 }
 
+# ============================================================================
+# LINT CACHE
+# ============================================================================
+
+# Files that already passed a tool are remembered by path, content hash and
+# the config files nearest to them. Each tool keeps one clean-set per
+# fingerprint of (tool, tool version, root config files), so upgrading a tool
+# or editing its config starts from an empty set. A nested config (ruff,
+# black and prettier resolve the one closest to each file) only invalidates
+# the files below it.
+CLAUDE_HOOKS_CACHE_DIR="${CLAUDE_HOOKS_CACHE_DIR:-${XDG_CACHE_HOME:-$HOME/.cache}/claude-hooks}"
+LINT_CACHE_MAX_ENTRIES=20000
+
+# Fingerprints computed during this run, one "<tool and configs>\t<key>" line each
+LINT_TOOL_KEYS=$'\n'
+LINT_CONFIG_KEYS=$'\n'
+
+# Print a tool's version, cached by binary path and mtime so that the tool
+# itself is only started again after it has been upgraded
+tool_version() {
+    local tool="$1"
+    local bin
+    bin=$(command -v "$tool" 2>/dev/null) || { echo "missing"; return; }
+    local stamp
+    stamp="$bin $(file_mtime "$bin")"
+
+    local versions="$CLAUDE_HOOKS_CACHE_DIR/tool-versions"
+    local cached
+    cached=$(grep -F -m1 "$stamp	" "$versions" 2>/dev/null | cut -f2)
+    if [[ -n "$cached" ]]; then
+        echo "$cached"
+        return
+    fi
+
+    local version
+    version=$("$tool" --version 2>/dev/null | head -n 1)
+    mkdir -p "$CLAUDE_HOOKS_CACHE_DIR"
+    printf '%s\t%s\n' "$stamp" "${version:-unknown}" >> "$versions"
+    echo "${version:-unknown}"
+}
+
+# Set LINT_TOOL_KEY to the fingerprint of a tool and its config files
+# Usage: lint_tool_key <tool> [config files...]
+lint_tool_key() {
+    local tool="$1"
+    shift
+    local memo="$tool $*"
+    local key=${LINT_TOOL_KEYS#*$'\n'"$memo"$'\t'}
+    if [[ "$key" == "$LINT_TOOL_KEYS" ]]; then
+        key=$(
+            {
+                echo "$tool"
+                tool_version "$tool"
+                local config
+                for config in "$@"; do
+                    [[ -f "$config" ]] && { echo "== $config"; cat "$config"; }
+                done
+            } | "${SHA256SUM[@]}" | cut -c1-16
+        )
+        LINT_TOOL_KEYS+="$memo"$'\t'"$key"$'\n'
+    else
+        key=${key%%$'\n'*}
+    fi
+    LINT_TOOL_KEY="${tool}-${key}"
+}
+
+# Set LINT_CONFIG_KEY to the fingerprint of the config files a directory
+# resolves: those in the nearest of it and its parents, up to the project
+# root, that holds any of the given names ("-" when there are none)
+# Usage: lint_config_key <dir> [config names...]
+lint_config_key() {
+    local dir="$1"
+    shift
+    local memo="$dir $*"
+    local key=${LINT_CONFIG_KEYS#*$'\n'"$memo"$'\t'}
+    if [[ "$key" != "$LINT_CONFIG_KEYS" ]]; then
+        LINT_CONFIG_KEY=${key%%$'\n'*}
+        return
+    fi
+
+    local -a found=()
+    local name
+    while true; do
+        for name in "$@"; do
+            [[ -f "$dir/$name" ]] && found+=("$dir/$name")
+        done
+        [[ ${#found[@]} -gt 0 || "$dir" == "." ]] && break
+        if [[ "$dir" == */* ]]; then
+            dir=${dir%/*}
+        else
+            dir="."
+        fi
+    done
+    if [[ ${#found[@]} -eq 0 ]]; then
+        LINT_CONFIG_KEY="-"
+    else
+        LINT_CONFIG_KEY=$(
+            for name in "${found[@]}"; do
+                echo "== $name"
+                cat "$name"
+            done | "${SHA256SUM[@]}" | cut -c1-16
+        )
+    fi
+    LINT_CONFIG_KEYS+="$memo"$'\t'"$LINT_CONFIG_KEY"$'\n'
+}
+
+# Print a clean-set entry, "<content sha256> <config key> <path>", for each
+# existing file, keyed by the configs passed to the last lint_cache_filter
+# Usage: lint_cache_entries <files>
+lint_cache_entries() {
+    local dir keys=""
+    while IFS= read -r dir; do
+        lint_config_key "$dir" "${LINT_CACHE_CONFIGS[@]}"
+        keys+="$dir"$'\t'"$LINT_CONFIG_KEY"$'\n'
+    done < <(tr ' ' '\n' <<< "$1" | awk 'NF { if (sub(/\/[^\/]*$/, "") == 0) $0 = "."; print }' | sort -u)
+
+    echo "$1" | xargs "${SHA256SUM[@]}" 2>/dev/null | awk -v keys="$keys" '
+        BEGIN {
+            n = split(keys, lines, "\n")
+            for (i = 1; i <= n; i++) if (split(lines[i], kv, "\t") == 2) key[kv[1]] = kv[2]
+        }
+        {
+            path = substr($0, 67)
+            dir = path
+            if (sub(/\/[^\/]*$/, "", dir) == 0) dir = "."
+            print substr($0, 1, 64), key[dir], path
+        }'
+}
+
+# Set LINT_UNCACHED to the files not yet known to be clean for a tool, and
+# LINT_CACHE_HITS to how many were skipped
+# Usage: lint_cache_filter <files> <tool> [config files...]
+lint_cache_filter() {
+    local files="$1"
+    shift
+    lint_tool_key "$@"
+    LINT_CACHE_CONFIGS=("${@:2}")
+    local clean_set="$CLAUDE_HOOKS_CACHE_DIR/lint/$LINT_TOOL_KEY"
+
+    LINT_UNCACHED=$(lint_cache_entries "$files" | \
+        awk 'NR == FNR { clean[$0]; next } !($0 in clean) { print substr($0, length($1 " " $2 " ") + 1) }' \
+            "$clean_set" - 2>/dev/null | tr '\n' ' ')
+    # An empty set would make awk read the entries as the set itself
+    if [[ ! -s "$clean_set" ]]; then
+        LINT_UNCACHED="$files"
+    fi
+
+    local total uncached
+    total=$(echo "$files" | wc -w)
+    uncached=$(echo "$LINT_UNCACHED" | wc -w)
+    LINT_CACHE_HITS=$((total - uncached))
+    log_debug "$LINT_TOOL_KEY: $LINT_CACHE_HITS cached, $uncached to check"
+}
+
+# Record files as clean for the tool last passed to lint_cache_filter
+lint_cache_mark() {
+    local files="$1"
+    [[ -z "${files// /}" ]] && return 0
+    local clean_set="$CLAUDE_HOOKS_CACHE_DIR/lint/$LINT_TOOL_KEY"
+    mkdir -p "${clean_set%/*}"
+    lint_cache_entries "$files" >> "$clean_set"
+
+    # Keep the clean-set bounded; recent entries are the useful ones
+    if [[ $(wc -l < "$clean_set") -gt $LINT_CACHE_MAX_ENTRIES ]]; then
+        tail -n $((LINT_CACHE_MAX_ENTRIES / 2)) "$clean_set" > "$clean_set.$$" && mv "$clean_set.$$" "$clean_set"
+    fi
+}
+
+# ============================================================================
+# TIMING REPORT
+# ============================================================================
+
+# With CLAUDE_HOOKS_SHOW_TIMING=true each run appends one JSON line to
+# $CLAUDE_HOOKS_TIMING_FILE (default $CLAUDE_HOOKS_CACHE_DIR/lint-timing.jsonl)
+# with wall time, file counts, cache hits and issues per language and tool.
+# Records go to a per-run file first, so parallel language subshells can
+# add theirs; write_timing_report folds them into the report.
+LINT_REPORT_FILE=""
+REPORT_LANGUAGE=""
+
+# Start the per-run record file
+start_timing_report() {
+    now_us
+    LINT_REPORT_STARTED=$NOW_US
+    LINT_REPORT_FILE=$(mktemp "${TMPDIR:-/tmp}/smart-lint-timing.XXXXXX") || LINT_REPORT_FILE=""
+}
+
+# Mark the start of one tool's run
+report_tool_start() {
+    [[ -n "$LINT_REPORT_FILE" ]] || return 0
+    now_us
+    REPORT_TOOL_STARTED=$NOW_US
+    REPORT_TOOL_ERRORS=$CLAUDE_HOOKS_ERROR_COUNT
+    LINT_CACHE_HITS=0
+}
+
+# Record the tool run started by report_tool_start
+# Usage: report_tool <tool> <files>
+report_tool() {
+    [[ -n "$LINT_REPORT_FILE" ]] || return 0
+    now_us
+    local now=$NOW_US
+    local -a files
+    read -ra files <<< "$2"
+    printf 'tool\t%s\t%s\t%d\t%d\t%d\t%d\n' "$REPORT_LANGUAGE" "$1" \
+        $(((now - REPORT_TOOL_STARTED) / 1000)) ${#files[@]} "${LINT_CACHE_HITS:-0}" \
+        $((CLAUDE_HOOKS_ERROR_COUNT - REPORT_TOOL_ERRORS)) >> "$LINT_REPORT_FILE"
+}
+
+# Record one language's run
+# Usage: report_language <language> <start in microseconds> <errors before>
+report_language() {
+    [[ -n "$LINT_REPORT_FILE" ]] || return 0
+    now_us
+    local now=$NOW_US
+    local bucket="LINT_FILES_$1"
+    local list=${!bucket}
+    local -a files
+    read -ra files <<< "${list//$'\n'/ }"
+    printf 'language\t%s\t%d\t%d\t%d\n' "$1" $(((now - $2) / 1000)) ${#files[@]} \
+        $((CLAUDE_HOOKS_ERROR_COUNT - $3)) >> "$LINT_REPORT_FILE"
+}
+
+# Fold the run's records into one JSON line and append it to the history
+write_timing_report() {
+    [[ -n "$LINT_REPORT_FILE" ]] || return 0
+    now_us
+    local now=$NOW_US
+    local history="${CLAUDE_HOOKS_TIMING_FILE:-$CLAUDE_HOOKS_CACHE_DIR/lint-timing.jsonl}"
+    local wall_ms=$(((now - LINT_REPORT_STARTED) / 1000))
+    local report
+    report=$(awk -F'\t' -v ts="$(date -u +%Y-%m-%dT%H:%M:%SZ)" -v project="$PWD" \
+        -v type="$PROJECT_TYPE" -v scoped="$LINT_SCOPED" -v wall="$wall_ms" \
+        -v issues="$CLAUDE_HOOKS_ERROR_COUNT" '
+        function esc(s) { gsub(/\\/, "\\\\", s); gsub(/"/, "\\\"", s); return s }
+        $1 == "tool" {
+            tools[$2] = tools[$2] (tools[$2] == "" ? "" : ",") \
+                sprintf("{\"tool\":\"%s\",\"wall_ms\":%d,\"files\":%d,\"cache_hits\":%d,\"issues\":%d}",
+                        esc($3), $4, $5, $6, $7)
+        }
+        $1 == "language" {
+            order[++n] = $2
+            lang[$2] = sprintf("\"wall_ms\":%d,\"files\":%d,\"issues\":%d", $3, $4, $5)
+        }
+        END {
+            printf "{\"timestamp\":\"%s\",\"project\":\"%s\",\"project_type\":\"%s\",\"scoped\":%s,\"wall_ms\":%d,\"issues\":%d,\"languages\":[",
+                   ts, esc(project), esc(type), scoped, wall, issues
+            for (i = 1; i <= n; i++)
+                printf "%s{\"language\":\"%s\",%s,\"tools\":[%s]}", (i > 1 ? "," : ""),
+                       esc(order[i]), lang[order[i]], tools[order[i]]
+            print "]}"
+        }' "$LINT_REPORT_FILE")
+    rm -f "$LINT_REPORT_FILE"
+    LINT_REPORT_FILE=""
+
+    if mkdir -p "${history%/*}" 2>/dev/null; then
+        echo "$report" >> "$history"
+    fi
+    log_info "Lint took ${wall_ms}ms (report appended to $history)"
+    log_debug "Timing report: $report"
+}
+
+# ============================================================================
+# FORMATTER DAEMONS
+# ============================================================================
+
+# With CLAUDE_HOOKS_FORMAT_DAEMONS=true, black and prettier formatting goes
+# through long-lived servers instead of a fresh interpreter per run: blackd
+# over HTTP, and prettierd when installed. Daemons are per project, recorded
+# under $CLAUDE_HOOKS_CACHE_DIR/daemons/<project>, and a reaper stops them
+# after CLAUDE_HOOKS_DAEMON_IDLE seconds (default 900) without use. Files a
+# daemon cannot handle are left in LINT_UNCACHED for the CLI.
+
+# Set DAEMON_DIR for the current directory
+daemon_paths() {
+    local key
+    key=$(printf '%s' "$PWD" | "${SHA256SUM[@]}" | cut -c1-16)
+    DAEMON_DIR="$CLAUDE_HOOKS_CACHE_DIR/daemons/$key"
+}
+
+# Format LINT_UNCACHED through the tool's daemon. Fails when daemons are off
+# or unreachable, or when files are left over for the CLI.
+# Usage: format_with_daemon <black|prettier>
+format_with_daemon() {
+    [[ "$CLAUDE_HOOKS_FORMAT_DAEMONS" == "true" ]] || return 1
+    # The daemon lock uses {fd} redirections (bash 4.1)
+    [[ "$HOOKS_MODERN_BASH" == "true" ]] || return 1
+    daemon_paths
+    case "$1" in
+        black) blackd_format ;;
+        prettier) prettierd_format ;;
+        *) return 1 ;;
+    esac
+}
+
+# Print a free localhost port
+free_port() {
+    python3 -c 'import socket; s = socket.socket(); s.bind(("127.0.0.1", 0)); print(s.getsockname()[1])' 2>/dev/null
+}
+
+# Print blackd request headers for the [tool.black] settings in pyproject.toml
+blackd_headers() {
+    [[ -f pyproject.toml ]] || return 0
+    awk '
+        /^[[:space:]]*\[/ { in_black = ($0 ~ /^[[:space:]]*\[tool\.black\][[:space:]]*$/); next }
+        in_black && /=/ {
+            key = $0; sub(/[[:space:]]*=.*/, "", key); gsub(/[[:space:]]/, "", key); gsub(/_/, "-", key)
+            value = $0; sub(/^[^=]*=[[:space:]]*/, "", value); sub(/[[:space:]]*#.*$/, "", value)
+            gsub(/["'\''[:space:]]|\[|\]/, "", value)
+            if (value == "") next
+            if (key == "line-length") print "X-Line-Length: " value
+            else if (key == "target-version") print "X-Python-Variant: " value
+            else if (key == "skip-string-normalization" && value == "true") print "X-Skip-String-Normalization: 1"
+            else if (key == "skip-magic-trailing-comma" && value == "true") print "X-Skip-Magic-Trailing-Comma: 1"
+            else if (key == "preview" && value == "true") print "X-Preview: 1"
+        }' pyproject.toml
+}
+
+# Print which of the given files black's force-exclude skips. The black CLI
+# applies only force-exclude to paths named on its command line, so these
+# are the files it would leave alone. Fails when the setting cannot be read.
+black_force_excluded() {
+    [[ -f pyproject.toml ]] && grep -q 'force[-_]exclude' pyproject.toml || return 0
+    command_exists python3 || return 1
+    python3 - "$@" <<'PY'
+import os, re, sys
+try:
+    import tomllib
+except ImportError:
+    sys.exit(1)
+with open("pyproject.toml", "rb") as f:
+    black = tomllib.load(f).get("tool", {}).get("black", {})
+pattern = black.get("force-exclude") or black.get("force_exclude")
+if pattern:
+    regex = re.compile(pattern, re.VERBOSE if "\n" in pattern else 0)
+    for path in sys.argv[1:]:
+        if regex.search("/" + os.path.normpath(path).replace(os.sep, "/")):
+            print(path)
+PY
+}
+
+# Print the port of this project's blackd, starting it if needed
+ensure_blackd() {
+    command_exists blackd && command_exists curl || return 1
+    mkdir -p "$DAEMON_DIR" || return 1
+
+    # One starter at a time; a concurrent run waits and reuses the daemon
+    local lock_fd
+    exec {lock_fd}>"$DAEMON_DIR/lock"
+    command_exists flock && flock -w 10 "$lock_fd"
+
+    # Restart after an upgrade so results match the black CLI's cache key
+    local bin stamp pid port
+    bin=$(command -v blackd)
+    stamp="$bin $(file_mtime "$bin")"
+    pid=$(cat "$DAEMON_DIR/blackd.pid" 2>/dev/null)
+    port=$(cat "$DAEMON_DIR/blackd.port" 2>/dev/null)
+    if [[ -n "$pid" ]] && kill -0 "$pid" 2>/dev/null; then
+        if [[ -n "$port" && "$(cat "$DAEMON_DIR/blackd.stamp" 2>/dev/null)" == "$stamp" ]]; then
+            exec {lock_fd}>&-
+            # The reaper may have been killed with an earlier hook's group
+            start_daemon_reaper
+            echo "$port"
+            return 0
+        fi
+        kill "$pid" 2>/dev/null
+    fi
+
+    port=$(free_port)
+    if [[ -z "$port" ]]; then
+        exec {lock_fd}>&-
+        return 1
+    fi
+    log_debug "Starting blackd on port $port"
+    # Detached from the hook's stdio, so the hook can exit while it runs
+    local -a detach=()
+    command_exists setsid && detach=(setsid)
+    "${detach[@]}" blackd --bind-host 127.0.0.1 --bind-port "$port" \
+        < /dev/null > "$DAEMON_DIR/blackd.log" 2>&1 {lock_fd}>&- &
+    pid=$!
+    local tries
+    for ((tries = 0; tries < 50; tries++)); do
+        if [[ $(curl -s -o /dev/null -w '%{http_code}' -X POST --data-binary '' \
+                "http://127.0.0.1:$port/" 2>/dev/null) == "204" ]]; then
+            echo "$pid" > "$DAEMON_DIR/blackd.pid"
+            echo "$port" > "$DAEMON_DIR/blackd.port"
+            echo "$stamp" > "$DAEMON_DIR/blackd.stamp"
+            # The reaper outlives this run; it must not hold the lock
+            exec {lock_fd}>&-
+            start_daemon_reaper
+            echo "$port"
+            return 0
+        fi
+        kill -0 "$pid" 2>/dev/null || break
+        sleep 0.1
+    done
+    kill "$pid" 2>/dev/null
+    exec {lock_fd}>&-
+    log_debug "blackd did not start, using the black CLI"
+    return 1
+}
+
+# Format LINT_UNCACHED with one curl call carrying a request per file.
+# blackd answers 204 (unchanged), 200 (formatted source) or 400 (invalid
+# source); anything else leaves the file to the CLI.
+blackd_format() {
+    local port
+    port=$(ensure_blackd) || return 1
+    touch "$DAEMON_DIR/last-used"
+
+    local -a headers=() files=() args=() clean=() fallback=()
+    local header
+    while IFS= read -r header; do
+        headers+=(-H "$header")
+    done < <(blackd_headers)
+
+    # Skip what the CLI would skip; blackd itself knows no exclusions
+    local excluded file
+    read -ra files <<< "$LINT_UNCACHED"
+    excluded=$(black_force_excluded "${files[@]}") || return 1
+    if [[ -n "$excluded" ]]; then
+        local -a kept=()
+        for file in "${files[@]}"; do
+            grep -qxF -- "$file" <<< "$excluded" || kept+=("$file")
+        done
+        files=("${kept[@]}")
+        log_debug "blackd: skipping force-excluded $(echo "$excluded" | wc -l) file(s)"
+    fi
+    if [[ ${#files[@]} -eq 0 ]]; then
+        LINT_UNCACHED=""
+        return 0
+    fi
+
+    local work
+    work=$(mktemp -d "${TMPDIR:-/tmp}/smart-lint-blackd.XXXXXX") || return 1
+    local i
+    for i in "${!files[@]}"; do
+        [[ $i -gt 0 ]] && args+=(--next)
+        args+=(-s -o "$work/$i" -w "%{http_code} $i\n" "${headers[@]}" \
+            --data-binary "@${files[$i]}" "http://127.0.0.1:$port/")
+    done
+
+    local code
+    while read -r code i; do
+        file="${files[$i]}"
+        case "$code" in
+            204) clean+=("$file") ;;
+            200)
+                cat "$work/$i" > "$file"
+                clean+=("$file")
+                ;;
+            400)
+                add_error "Python formatting failed"
+                echo "$file: $(cat "$work/$i")" >&2
+                ;;
+            *) fallback+=("$file") ;;
+        esac
+        unset 'files[$i]'
+    done < <(curl "${args[@]}" 2>/dev/null)
+    rm -rf "$work"
+
+    # Requests curl never reported on go to the CLI as well
+    fallback+=("${files[@]}")
+    lint_cache_mark "${clean[*]}"
+    LINT_UNCACHED="${fallback[*]}"
+    [[ ${#fallback[@]} -eq 0 ]]
+}
+
+# Format LINT_UNCACHED with prettierd, which keeps its own server. A server
+# this script started is stopped by the reaper; one already running is not.
+prettierd_format() {
+    command_exists prettierd || return 1
+    mkdir -p "$DAEMON_DIR" || return 1
+    if [[ ! -f "$DAEMON_DIR/prettierd.started" ]] && ! prettierd status 2>/dev/null | grep -qi '^running'; then
+        touch "$DAEMON_DIR/prettierd.started"
+    fi
+    [[ -f "$DAEMON_DIR/prettierd.started" ]] && start_daemon_reaper
+    touch "$DAEMON_DIR/last-used"
+
+    local -a files=() clean=() fallback=()
+    read -ra files <<< "$LINT_UNCACHED"
+    local out file
+    out=$(mktemp "${TMPDIR:-/tmp}/smart-lint-prettierd.XXXXXX") || return 1
+    for file in "${files[@]}"; do
+        # Errors are left to the CLI, which reports them in its usual form
+        if prettierd "$file" < "$file" > "$out" 2>/dev/null && [[ -s "$out" || ! -s "$file" ]]; then
+            cmp -s "$out" "$file" || cat "$out" > "$file"
+            clean+=("$file")
+        else
+            fallback+=("$file")
+        fi
+    done
+    rm -f "$out"
+
+    lint_cache_mark "${clean[*]}"
+    LINT_UNCACHED="${fallback[*]}"
+    [[ ${#fallback[@]} -eq 0 ]]
+}
+
+# Start the project's idle reaper unless one is running. Like blackd it is
+# detached into its own session, so killing the hook's process group on a
+# timeout leaves it running.
+start_daemon_reaper() {
+    # By command line, so neither a zombie nor a reused pid counts
+    local pid
+    pid=$(cat "$DAEMON_DIR/reaper.pid" 2>/dev/null)
+    [[ -n "$pid" && "$(ps -o args= -p "$pid" 2>/dev/null)" == *--reap-daemons* ]] && return 0
+
+    local -a detach=()
+    command_exists setsid && detach=(setsid)
+    "${detach[@]}" "$BASH" "$SCRIPT_DIR/smart-lint.sh" --reap-daemons \
+        < /dev/null > /dev/null 2>&1 &
+    echo $! > "$DAEMON_DIR/reaper.pid"
+}
+
+# Body of the reaper (smart-lint.sh --reap-daemons): stop the daemons once
+# they have gone CLAUDE_HOOKS_DAEMON_IDLE seconds without use
+reap_daemons() {
+    daemon_paths
+    echo "$$" > "$DAEMON_DIR/reaper.pid"
+    trap '' HUP
+    local idle="$CLAUDE_HOOKS_DAEMON_IDLE"
+    local interval=$((idle < 30 ? idle : 30))
+    [[ $interval -ge 1 ]] || interval=1
+    local last
+    while sleep "$interval"; do
+        last=$(file_mtime "$DAEMON_DIR/last-used" || echo 0)
+        if [[ $(($(date +%s) - last)) -ge $idle ]]; then
+            stop_daemons
+            return 0
+        fi
+    done
+}
+
+# Stop this project's daemons and their reaper
+stop_daemons() {
+    daemon_paths
+    local pid
+    pid=$(cat "$DAEMON_DIR/blackd.pid" 2>/dev/null)
+    if [[ -n "$pid" ]]; then
+        kill "$pid" 2>/dev/null && log_debug "Stopped blackd (pid $pid)"
+    fi
+    rm -f "$DAEMON_DIR/blackd.pid" "$DAEMON_DIR/blackd.port" "$DAEMON_DIR/blackd.stamp"
+    if [[ -f "$DAEMON_DIR/prettierd.started" ]]; then
+        prettierd stop > /dev/null 2>&1
+        rm -f "$DAEMON_DIR/prettierd.started"
+    fi
+    pid=$(cat "$DAEMON_DIR/reaper.pid" 2>/dev/null)
+    if [[ -n "$pid" && "$pid" != "$$" ]]; then
+        kill "$pid" 2>/dev/null
+    fi
+    rm -f "$DAEMON_DIR/reaper.pid"
+}
+
 # ============================================================================
 # LANGUAGE-SPECIFIC LINTERS
 # ============================================================================
@@ -176,53 +955,64 @@ lint_python() {
     
     log_info "Running Python linters..."
     
-    # Find Python files
-    local py_files=$(find . -name "*.py" -type f | grep -v -E "(venv/|\.venv/|__pycache__|\.git/)" | head -100)
-    
-    if [[ -z "$py_files" ]]; then
-        log_debug "No Python files found"
-        return 0
-    fi
-    
-    # Filter out files that should be skipped
-    local filtered_files=""
-    for file in $py_files; do
-        if ! should_skip_file "$file"; then
-            filtered_files="$filtered_files$file "
-        fi
-    done
+    # Python files from the shared discovery pass
+    local filtered_files
+    filtered_files=$(lint_files python)
     
     if [[ -z "$filtered_files" ]]; then
-        log_debug "All Python files were skipped by .claude-hooks-ignore"
+        log_debug "No Python files to lint (none found, or all skipped)"
         return 0
     fi
     
     # Black formatting
     if command_exists black; then
-        local black_output
-        if ! black_output=$(echo "$filtered_files" | xargs black --check 2>&1); then
-            # Apply formatting and capture any errors
-            local format_output
-            if ! format_output=$(echo "$filtered_files" | xargs black 2>&1); then
-                add_error "Python formatting failed"
-                echo "$format_output" >&2
+        report_tool_start
+        lint_cache_filter "$filtered_files" black pyproject.toml
+        if [[ -n "${LINT_UNCACHED// /}" ]] && ! format_with_daemon black; then
+            local black_output
+            if ! black_output=$(echo "$LINT_UNCACHED" | xargs black --check 2>&1); then
+                # Apply formatting and capture any errors
+                local format_output
+                if ! format_output=$(echo "$LINT_UNCACHED" | xargs black 2>&1); then
+                    add_error "Python formatting failed"
+                    echo "$format_output" >&2
+                else
+                    lint_cache_mark "$LINT_UNCACHED"
+                fi
+            else
+                lint_cache_mark "$LINT_UNCACHED"
             fi
         fi
+        report_tool black "$filtered_files"
     fi
     
     # Linting
     if command_exists ruff; then
-        local ruff_output
-        if ! ruff_output=$(echo "$filtered_files" | xargs ruff check --fix 2>&1); then
-            add_error "Ruff found issues"
-            echo "$ruff_output" >&2
+        report_tool_start
+        lint_cache_filter "$filtered_files" ruff pyproject.toml ruff.toml .ruff.toml
+        if [[ -n "${LINT_UNCACHED// /}" ]]; then
+            local ruff_output
+            if ! ruff_output=$(echo "$LINT_UNCACHED" | xargs ruff check --fix 2>&1); then
+                add_error "Ruff found issues"
+                echo "$ruff_output" >&2
+            else
+                lint_cache_mark "$LINT_UNCACHED"
+            fi
         fi
+        report_tool ruff "$filtered_files"
     elif command_exists flake8; then
-        local flake8_output
-        if ! flake8_output=$(echo "$filtered_files" | xargs flake8 2>&1); then
-            add_error "Flake8 found issues"
-            echo "$flake8_output" >&2
+        report_tool_start
+        lint_cache_filter "$filtered_files" flake8 setup.cfg tox.ini .flake8
+        if [[ -n "${LINT_UNCACHED// /}" ]]; then
+            local flake8_output
+            if ! flake8_output=$(echo "$LINT_UNCACHED" | xargs flake8 2>&1); then
+                add_error "Flake8 found issues"
+                echo "$flake8_output" >&2
+            else
+                lint_cache_mark "$LINT_UNCACHED"
+            fi
         fi
+        report_tool flake8 "$filtered_files"
     fi
     
     return 0
@@ -236,60 +1026,70 @@ lint_javascript() {
     
     log_info "Running JavaScript/TypeScript linters..."
     
-    # Find JS/TS files
-    local js_files=$(find . \( -name "*.js" -o -name "*.ts" -o -name "*.jsx" -o -name "*.tsx" \) -type f | grep -v -E "(node_modules/|dist/|build/|\.git/)" | head -100)
-    
-    if [[ -z "$js_files" ]]; then
-        log_debug "No JavaScript/TypeScript files found"
-        return 0
-    fi
-    
-    # Filter out files that should be skipped
-    local filtered_files=""
-    for file in $js_files; do
-        if ! should_skip_file "$file"; then
-            filtered_files="$filtered_files$file "
-        fi
-    done
+    # JS/TS files from the shared discovery pass
+    local filtered_files
+    filtered_files=$(lint_files javascript)
     
     if [[ -z "$filtered_files" ]]; then
-        log_debug "All JavaScript/TypeScript files were skipped by .claude-hooks-ignore"
+        log_debug "No JavaScript/TypeScript files to lint (none found, or all skipped)"
         return 0
     fi
     
     # Check for ESLint
     if [[ -f "package.json" ]] && grep -q "eslint" package.json 2>/dev/null; then
         if command_exists npm; then
+            report_tool_start
             local eslint_output
             if ! eslint_output=$(npm run lint --if-present 2>&1); then
                 add_error "ESLint found issues"
                 echo "$eslint_output" >&2
             fi
+            report_tool eslint "$filtered_files"
         fi
     fi
     
     # Prettier
     if [[ -f ".prettierrc" ]] || [[ -f "prettier.config.js" ]] || [[ -f ".prettierrc.json" ]]; then
+        local prettier_configs=(.prettierrc prettier.config.js .prettierrc.json .prettierignore package.json)
         if command_exists prettier; then
-            local prettier_output
-            if ! prettier_output=$(echo "$filtered_files" | xargs prettier --check 2>&1); then
-                # Apply formatting and capture any errors
-                local format_output
-                if ! format_output=$(echo "$filtered_files" | xargs prettier --write 2>&1); then
-                    add_error "Prettier formatting failed"
-                    echo "$format_output" >&2
+            report_tool_start
+            lint_cache_filter "$filtered_files" prettier "${prettier_configs[@]}"
+            if [[ -n "${LINT_UNCACHED// /}" ]] && ! format_with_daemon prettier; then
+                local prettier_output
+                if ! prettier_output=$(echo "$LINT_UNCACHED" | xargs prettier --check 2>&1); then
+                    # Apply formatting and capture any errors
+                    local format_output
+                    if ! format_output=$(echo "$LINT_UNCACHED" | xargs prettier --write 2>&1); then
+                        add_error "Prettier formatting failed"
+                        echo "$format_output" >&2
+                    else
+                        lint_cache_mark "$LINT_UNCACHED"
+                    fi
+                else
+                    lint_cache_mark "$LINT_UNCACHED"
                 fi
             fi
+            report_tool prettier "$filtered_files"
         elif command_exists npx; then
-            local prettier_output
-            if ! prettier_output=$(echo "$filtered_files" | xargs npx prettier --check 2>&1); then
-                # Apply formatting and capture any errors
-                local format_output
-                if ! format_output=$(echo "$filtered_files" | xargs npx prettier --write 2>&1); then
-                    add_error "Prettier formatting failed"
-                    echo "$format_output" >&2
+            report_tool_start
+            # npx resolves the project's prettier; its lockfile stands in for the version
+            lint_cache_filter "$filtered_files" npx "${prettier_configs[@]}" package-lock.json yarn.lock pnpm-lock.yaml
+            if [[ -n "${LINT_UNCACHED// /}" ]] && ! format_with_daemon prettier; then
+                local prettier_output
+                if ! prettier_output=$(echo "$LINT_UNCACHED" | xargs npx prettier --check 2>&1); then
+                    # Apply formatting and capture any errors
+                    local format_output
+                    if ! format_output=$(echo "$LINT_UNCACHED" | xargs npx prettier --write 2>&1); then
+                        add_error "Prettier formatting failed"
+                        echo "$format_output" >&2
+                    else
+                        lint_cache_mark "$LINT_UNCACHED"
+                    fi
+                else
+                    lint_cache_mark "$LINT_UNCACHED"
                 fi
             fi
+            report_tool "npx prettier" "$filtered_files"
         fi
     fi
     
@@ -304,28 +1104,17 @@ lint_rust() {
     
     log_info "Running Rust linters..."
     
-    # Find Rust files
-    local rust_files=$(find . -name "*.rs" -type f | grep -v -E "(target/|\.git/)" | head -100)
-    
-    if [[ -z "$rust_files" ]]; then
-        log_debug "No Rust files found"
-        return 0
-    fi
-    
-    # Filter out files that should be skipped
-    local filtered_files=""
-    for file in $rust_files; do
-        if ! should_skip_file "$file"; then
-            filtered_files="$filtered_files$file "
-        fi
-    done
+    # Rust files from the shared discovery pass
+    local filtered_files
+    filtered_files=$(lint_files rust)
     
     if [[ -z "$filtered_files" ]]; then
-        log_debug "All Rust files were skipped by .claude-hooks-ignore"
+        log_debug "No Rust files to lint (none found, or all skipped)"
         return 0
     fi
     
     if command_exists cargo; then
+        report_tool_start
         local fmt_output
         if ! fmt_output=$(cargo fmt -- --check 2>&1); then
             # Apply formatting and capture any errors
@@ -335,12 +1124,15 @@ lint_rust() {
                 echo "$format_output" >&2
             fi
         fi
+        report_tool "cargo fmt" "$filtered_files"
         
+        report_tool_start
         local clippy_output
         if ! clippy_output=$(cargo clippy --quiet -- -D warnings 2>&1); then
             add_error "Clippy found issues"
             echo "$clippy_output" >&2
         fi
+        report_tool clippy "$filtered_files"
     else
         log_info "Cargo not found, skipping Rust checks"
     fi
@@ -356,69 +1148,350 @@ lint_nix() {
     
     log_info "Running Nix linters..."
     
-    # Find all .nix files
-    local nix_files=$(find . -name "*.nix" -type f | grep -v -E "(result/|/nix/store/)" | head -20)
-    
-    if [[ -z "$nix_files" ]]; then
-        log_debug "No Nix files found"
-        return 0
-    fi
-    
-    # Filter out files that should be skipped
-    local filtered_files=""
-    for file in $nix_files; do
-        if ! should_skip_file "$file"; then
-            filtered_files="$filtered_files$file "
-        fi
-    done
+    # Nix files from the shared discovery pass
+    local nix_files
+    nix_files=$(lint_files nix)
     
-    nix_files="$filtered_files"
     if [[ -z "$nix_files" ]]; then
-        log_debug "All Nix files were skipped by .claude-hooks-ignore"
+        log_debug "No Nix files to lint (none found, or all skipped)"
         return 0
     fi
     
     # Check formatting with nixpkgs-fmt or alejandra
     if command_exists nixpkgs-fmt; then
-        local fmt_output
-        if ! fmt_output=$(echo "$nix_files" | xargs nixpkgs-fmt --check 2>&1); then
-            # Apply formatting and capture any errors
-            local format_output
-            if ! format_output=$(echo "$nix_files" | xargs nixpkgs-fmt 2>&1); then
-                add_error "Nix formatting failed"
-                echo "$format_output" >&2
+        report_tool_start
+        lint_cache_filter "$nix_files" nixpkgs-fmt
+        if [[ -n "${LINT_UNCACHED// /}" ]]; then
+            local fmt_output
+            if ! fmt_output=$(echo "$LINT_UNCACHED" | xargs nixpkgs-fmt --check 2>&1); then
+                # Apply formatting and capture any errors
+                local format_output
+                if ! format_output=$(echo "$LINT_UNCACHED" | xargs nixpkgs-fmt 2>&1); then
+                    add_error "Nix formatting failed"
+                    echo "$format_output" >&2
+                else
+                    lint_cache_mark "$LINT_UNCACHED"
+                fi
+            else
+                lint_cache_mark "$LINT_UNCACHED"
             fi
         fi
+        report_tool nixpkgs-fmt "$nix_files"
     elif command_exists alejandra; then
-        local fmt_output
-        if ! fmt_output=$(echo "$nix_files" | xargs alejandra --check 2>&1); then
-            # Apply formatting and capture any errors
-            local format_output
-            if ! format_output=$(echo "$nix_files" | xargs alejandra 2>&1); then
-                add_error "Nix formatting failed"
-                echo "$format_output" >&2
+        report_tool_start
+        lint_cache_filter "$nix_files" alejandra
+        if [[ -n "${LINT_UNCACHED// /}" ]]; then
+            local fmt_output
+            if ! fmt_output=$(echo "$LINT_UNCACHED" | xargs alejandra --check 2>&1); then
+                # Apply formatting and capture any errors
+                local format_output
+                if ! format_output=$(echo "$LINT_UNCACHED" | xargs alejandra 2>&1); then
+                    add_error "Nix formatting failed"
+                    echo "$format_output" >&2
+                else
+                    lint_cache_mark "$LINT_UNCACHED"
+                fi
+            else
+                lint_cache_mark "$LINT_UNCACHED"
             fi
         fi
+        report_tool alejandra "$nix_files"
     fi
     
     # Static analysis with statix
     if command_exists statix; then
+        report_tool_start
         local statix_output
         if ! statix_output=$(statix check 2>&1); then
             add_error "Statix found issues"
             echo "$statix_output" >&2
         fi
+        report_tool statix "$nix_files"
     fi
     
     return 0
 }
 
+# ============================================================================
+# LINTER DISPATCH
+# ============================================================================
+
+# Run the linters for one language
+run_language_linter() {
+    REPORT_LANGUAGE="$1"
+    now_us
+    local started=$NOW_US
+    local errors=$CLAUDE_HOOKS_ERROR_COUNT
+    case "$1" in
+        "go") lint_go ;;
+        "python") lint_python ;;
+        "javascript") lint_javascript ;;
+        "rust") lint_rust ;;
+        "nix") lint_nix ;;
+        "tilt") 
+            if type -t lint_tilt &>/dev/null; then
+                lint_tilt
+            else
+                log_debug "Tilt linting function not available"
+            fi
+            ;;
+    esac
+    report_language "$1" "$started" "$errors"
+}
+
+# Run several languages' linters concurrently, at most CLAUDE_HOOKS_LINT_JOBS
+# at a time. Each language runs in a subshell whose output and errors are
+# buffered, then replayed in the order given so the report never interleaves.
+run_linters_parallel() {
+    local buffer_dir
+    buffer_dir=$(mktemp -d "${TMPDIR:-/tmp}/smart-lint.XXXXXX") || return 1
+    local i=0 type
+    for type in "$@"; do
+        while [[ $(jobs -rp | wc -l) -ge $CLAUDE_HOOKS_LINT_JOBS ]]; do
+            wait -n
+        done
+        (
+            CLAUDE_HOOKS_ERROR_COUNT=0
+            CLAUDE_HOOKS_SUMMARY=()
+            run_language_linter "$type"
+            echo "$CLAUDE_HOOKS_ERROR_COUNT" > "$buffer_dir/$i.count"
+            if [[ ${#CLAUDE_HOOKS_SUMMARY[@]} -gt 0 ]]; then
+                printf '%s\n' "${CLAUDE_HOOKS_SUMMARY[@]}" > "$buffer_dir/$i.summary"
+            fi
+        ) > "$buffer_dir/$i.out" 2>&1 &
+        i=$((i + 1))
+    done
+    wait
+
+    local j item
+    for ((j = 0; j < i; j++)); do
+        cat "$buffer_dir/$j.out" >&2
+        CLAUDE_HOOKS_ERROR_COUNT+=$(cat "$buffer_dir/$j.count" 2>/dev/null || echo 1)
+        if [[ -f "$buffer_dir/$j.summary" ]]; then
+            while IFS= read -r item; do
+                CLAUDE_HOOKS_ERRORS+=("$item")
+                CLAUDE_HOOKS_SUMMARY+=("$item")
+            done < "$buffer_dir/$j.summary"
+        fi
+    done
+    rm -rf "$buffer_dir"
+}
+
+# ============================================================================
+# WATCH MODE
+# ============================================================================
+
+CLAUDE_HOOKS_WATCH_DEBOUNCE="${CLAUDE_HOOKS_WATCH_DEBOUNCE:-0.5}"
+CLAUDE_HOOKS_WATCH_POLL="${CLAUDE_HOOKS_WATCH_POLL:-2}"
+WATCH_EXCLUDE_RE='(^|/)(\.git|node_modules|target|venv|\.venv|__pycache__|result|dist|build)/'
+
+# Verdicts by file: "<clean|issues>\t<issue count>\t<sha256>\t<epoch>".
+# Watch mode needs bash 4.3; older shells refuse --watch.
+[[ "$HOOKS_MODERN_BASH" == "true" ]] && declare -A WATCH_VERDICTS=()
+
+# Set WATCH_STATUS_FILE and WATCH_PID_FILE for the current directory
+watch_paths() {
+    local key
+    key=$(printf '%s' "$PWD" | "${SHA256SUM[@]}" | cut -c1-16)
+    WATCH_STATUS_FILE="$CLAUDE_HOOKS_CACHE_DIR/watch/$key.status"
+    WATCH_PID_FILE="$CLAUDE_HOOKS_CACHE_DIR/watch/$key.pid"
+}
+
+# Succeeds when a watcher is running for the current directory
+watcher_running() {
+    watch_paths
+    local pid
+    pid=$(cat "$WATCH_PID_FILE" 2>/dev/null)
+    [[ -n "$pid" ]] && kill -0 "$pid" 2>/dev/null
+}
+
+# Print changed paths, one per line, as they change: from inotifywait when
+# available, otherwise by comparing stat snapshots of the project files
+watch_events() {
+    if command_exists inotifywait; then
+        inotifywait -m -r -q -e close_write,create,delete,moved_to,moved_from \
+            --exclude "$WATCH_EXCLUDE_RE" --format '%w%f' . 2>/dev/null
+        return
+    fi
+    local previous="" current
+    while true; do
+        current=$(list_project_files | grep -v -E "$WATCH_EXCLUDE_RE" | tr '\n' '\0' | \
+            xargs -0 -r "${FILE_STAMPS[@]}" 2>/dev/null)
+        if [[ -n "$previous" ]]; then
+            diff <(echo "$previous") <(echo "$current") | \
+                sed -n 's/^[<>] \(.*\) [0-9.]* [0-9]*$/\1/p' | sort -u
+        fi
+        previous="$current"
+        sleep "$CLAUDE_HOOKS_WATCH_POLL"
+    done
+}
+
+# Lint one file in a subshell and print its issue count
+lint_file_verdict() {
+    (
+        LINT_SCOPED=true
+        LINT_SCOPE_FILES=("$1")
+        CLAUDE_HOOKS_ERROR_COUNT=0
+        CLAUDE_HOOKS_SUMMARY=()
+        discover_lint_files
+        local type
+        type=$(scoped_project_type)
+        if [[ "$type" != "none" ]]; then
+            run_language_linter "$type"
+        fi
+        echo "$CLAUDE_HOOKS_ERROR_COUNT"
+    )
+}
+
+# Rewrite the status file from WATCH_VERDICTS; readers never see a partial file
+write_watch_status() {
+    mkdir -p "${WATCH_STATUS_FILE%/*}"
+    local tmp="$WATCH_STATUS_FILE.$$.tmp"
+    local file
+    for file in "${!WATCH_VERDICTS[@]}"; do
+        printf '%s\t%s\n' "$file" "${WATCH_VERDICTS[$file]}"
+    done | sort > "$tmp" && mv -f "$tmp" "$WATCH_STATUS_FILE"
+}
+
+# Re-lint changed files and record their verdicts
+relint_files() {
+    local file hash issues verdict
+    for file in "$@"; do
+        if [[ ! -f "$file" ]]; then
+            unset 'WATCH_VERDICTS[$file]'
+            continue
+        fi
+        # Hash before linting: if a formatter rewrites the file, the verdict
+        # is stale until the rewrite is linted in turn
+        hash=$("${SHA256SUM[@]}" "$file" | cut -c1-64)
+        issues=$(lint_file_verdict "$file")
+        issues=${issues:-1}
+        if [[ $issues -eq 0 ]]; then
+            verdict="clean"
+            log_success "$file"
+        else
+            verdict="issues"
+            log_error "$file: $issues issue(s)"
+        fi
+        WATCH_VERDICTS[$file]="$verdict	$issues	$hash	$(date +%s)"
+    done
+    write_watch_status
+}
+
+# Watch the project until interrupted
+watch_project() {
+    if watcher_running; then
+        log_error "Already watching $PWD (pid $(cat "$WATCH_PID_FILE"))"
+        exit 1
+    fi
+    mkdir -p "${WATCH_PID_FILE%/*}"
+    echo $$ > "$WATCH_PID_FILE"
+
+    # Earlier verdicts carry content hashes, so they stay valid across restarts
+    local file entry
+    if [[ -f "$WATCH_STATUS_FILE" ]]; then
+        while IFS=$'\t' read -r file entry; do
+            [[ -n "$file" ]] && WATCH_VERDICTS[$file]="$entry"
+        done < "$WATCH_STATUS_FILE"
+    fi
+
+    local events_fd events_pid
+    exec {events_fd}< <(watch_events)
+    events_pid=$!
+    trap 'pkill -P '"$events_pid"' 2>/dev/null; kill '"$events_pid"' 2>/dev/null; rm -f "$WATCH_PID_FILE"' EXIT
+    trap 'exit 0' INT TERM
+
+    local source="polling every ${CLAUDE_HOOKS_WATCH_POLL}s"
+    command_exists inotifywait && source="inotify"
+    log_info "Watching $PWD ($source). Press Ctrl-C to stop."
+
+    local lintable path status
+    lintable=$(IFS='|'; echo "${LINT_FILE_PATTERNS[*]}")
+    local -A dirty=()
+    while true; do
+        IFS= read -r -t "$CLAUDE_HOOKS_WATCH_DEBOUNCE" -u "$events_fd" path
+        status=$?
+        if [[ $status -eq 0 ]]; then
+            if [[ "$path" =~ $lintable && ! "$path" =~ $WATCH_EXCLUDE_RE ]]; then
+                dirty[$path]=1
+            fi
+            continue
+        fi
+        # Above 128 is a timeout; anything else means the event source ended
+        if [[ $status -le 128 ]]; then
+            log_error "File watcher stopped"
+            exit 1
+        fi
+        # Quiet for a whole debounce interval: lint what changed
+        if [[ ${#dirty[@]} -gt 0 ]]; then
+            relint_files "${!dirty[@]}"
+            dirty=()
+        fi
+    done
+}
+
+# Succeeds when a running watcher holds a clean verdict for every scoped
+# file, recorded for the file's current contents
+watch_verdicts_clean() {
+    [[ ${#LINT_SCOPE_FILES[@]} -gt 0 ]] || return 1
+    watcher_running || return 1
+    "${SHA256SUM[@]}" "${LINT_SCOPE_FILES[@]}" 2>/dev/null | awk -F'\t' '
+        NR == FNR { if ($2 == "clean") clean[$1 "\t" $4]; next }
+        !((substr($0, 67) "\t" substr($0, 1, 64)) in clean) { stale = 1 }
+        END { exit stale }
+    ' "$WATCH_STATUS_FILE" -
+}
+
+# Print the recorded verdicts, marking those whose file has changed since
+# it was checked. With a file, exit 0 only if its verdict is clean and current.
+print_watch_status() {
+    local file="$1"
+    local running="not running"
+    watcher_running && running="running (pid $(cat "$WATCH_PID_FILE"))"
+    echo "Watcher for $PWD: $running"
+    if [[ ! -f "$WATCH_STATUS_FILE" ]]; then
+        echo "No verdicts recorded"
+        return 2
+    fi
+
+    local files
+    if [[ -n "$file" ]]; then
+        files=$(to_project_path "$file") || return 2
+    else
+        files=$(cut -f1 "$WATCH_STATUS_FILE")
+    fi
+    echo "$files" | tr '\n' '\0' | xargs -0 -r "${SHA256SUM[@]}" 2>/dev/null | awk -F'\t' -v only="$files" -v now="$(date +%s)" '
+        NR == FNR { verdict[$1] = $2; issues[$1] = $3; hash[$1] = $4; stamp[$1] = $5; next }
+        {
+            path = substr($0, 67)
+            seen[path] = 1
+            if (!(path in verdict)) { print path "\tunknown"; bad = 1; next }
+            state = verdict[path]
+            if (hash[path] != substr($0, 1, 64)) state = "stale"
+            else if (state == "issues") state = "issues (" issues[path] ")"
+            print path "\t" state "\t" (now - stamp[path]) "s ago"
+            if (state != "clean") bad = 1
+        }
+        END {
+            n = split(only, wanted, "\n")
+            for (i = 1; i <= n; i++) if (wanted[i] != "" && !(wanted[i] in seen)) { print wanted[i] "\tmissing"; bad = 1 }
+            exit bad ? 2 : 0
+        }
+    ' "$WATCH_STATUS_FILE" -
+}
+
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
 
 # Parse command line options
 FAST_MODE=false
+LINT_ALL=false
+WATCH_MODE=false
+STOP_DAEMONS=false
+REAP_DAEMONS=false
+STATUS_MODE=false
+STATUS_FILE=""
 while [[ $# -gt 0 ]]; do
     case $1 in
         --debug)
@@ -429,6 +1502,31 @@ while [[ $# -gt 0 ]]; do
             FAST_MODE=true
             shift
             ;;
+        --all)
+            LINT_ALL=true
+            shift
+            ;;
+        --watch)
+            WATCH_MODE=true
+            shift
+            ;;
+        --stop-daemons)
+            STOP_DAEMONS=true
+            shift
+            ;;
+        --reap-daemons)
+            # Internal: the detached idle reaper started by start_daemon_reaper
+            REAP_DAEMONS=true
+            shift
+            ;;
+        --status)
+            STATUS_MODE=true
+            if [[ -n "${2:-}" && "$2" != --* ]]; then
+                STATUS_FILE="$2"
+                shift
+            fi
+            shift
+            ;;
         *)
             echo "Unknown option: $1" >&2
             exit 2
@@ -436,6 +1534,30 @@ while [[ $# -gt 0 ]]; do
     esac
 done
 
+# Stop this project's formatter daemons, found under the configured cache dir
+if [[ "$STOP_DAEMONS" == "true" ]]; then
+    load_config
+    stop_daemons
+    exit 0
+fi
+
+# Run as the daemons' idle reaper, with the project's configured timeout
+if [[ "$REAP_DAEMONS" == "true" ]]; then
+    load_config
+    reap_daemons
+    exit 0
+fi
+
+# Answer --status from the watcher's verdicts without running any linter.
+# The project config may move CLAUDE_HOOKS_CACHE_DIR, so load it first to
+# read the verdicts --watch wrote.
+if [[ "$STATUS_MODE" == "true" ]]; then
+    load_config
+    exit_if_disabled
+    print_watch_status "$STATUS_FILE"
+    exit $?
+fi
+
 # Print header
 echo "" >&2
 echo "🔍 Style Check - Validating code formatting..." >&2
@@ -443,13 +1565,46 @@ echo "────────────────────────
 
 # Load configuration
 load_config
+exit_if_disabled
 
 # Start timing
 START_TIME=$(time_start)
 
-# Detect project type
-PROJECT_TYPE=$(detect_project_type_with_tilt)
-log_info "Project type: $PROJECT_TYPE"
+if [[ "$WATCH_MODE" == "true" ]]; then
+    if [[ "$HOOKS_MODERN_BASH" != "true" ]]; then
+        log_error "--watch needs bash 4.3 or newer (this is $BASH_VERSION)"
+        exit 1
+    fi
+    watch_project
+    exit 0
+fi
+
+# Record per-language and per-tool timing when asked to
+if [[ "$CLAUDE_HOOKS_SHOW_TIMING" == "true" ]]; then
+    start_timing_report
+fi
+
+# Limit the run to the edited file when called from a hook
+if [[ "$LINT_ALL" != "true" ]]; then
+    collect_edit_scope
+fi
+
+# Detect project type (from the scoped files alone when scoped)
+if [[ "$LINT_SCOPED" == "true" ]] && watch_verdicts_clean; then
+    PROJECT_TYPE="watched"
+    log_info "Clean verdicts from smart-lint --watch for ${#LINT_SCOPE_FILES[@]} file(s)"
+elif [[ "$LINT_SCOPED" == "true" ]]; then
+    PROJECT_TYPE=$(scoped_project_type)
+    log_info "Project type: $PROJECT_TYPE (${#LINT_SCOPE_FILES[@]} edited file(s))"
+else
+    PROJECT_TYPE=$(detect_project_type_with_tilt)
+    log_info "Project type: $PROJECT_TYPE"
+fi
+
+# Walk the project once for every language's linters
+if [[ "$PROJECT_TYPE" != "unknown" && "$PROJECT_TYPE" != "none" && "$PROJECT_TYPE" != "watched" ]]; then
+    discover_lint_files
+fi
 
 # Main execution
 main() {
@@ -458,50 +1613,40 @@ main() {
         local types="${PROJECT_TYPE#mixed:}"
         IFS=',' read -ra TYPE_ARRAY <<< "$types"
         
-        for type in "${TYPE_ARRAY[@]}"; do
-            case "$type" in
-                "go") lint_go ;;
-                "python") lint_python ;;
-                "javascript") lint_javascript ;;
-                "rust") lint_rust ;;
-                "nix") lint_nix ;;
-                "tilt") 
-                    if type -t lint_tilt &>/dev/null; then
-                        lint_tilt
-                    else
-                        log_debug "Tilt linting function not available"
-                    fi
-                    ;;
-            esac
-            
-            # Fail fast if configured
-            if [[ "$CLAUDE_HOOKS_FAIL_FAST" == "true" && $CLAUDE_HOOKS_ERROR_COUNT -gt 0 ]]; then
-                break
-            fi
-        done
+        # Fail fast needs each language's result before starting the next,
+        # and bash before 4.3 has no `wait -n` to bound the jobs with
+        if [[ "$CLAUDE_HOOKS_FAIL_FAST" != "true" && $CLAUDE_HOOKS_LINT_JOBS -gt 1 \
+                && "$HOOKS_MODERN_BASH" == "true" ]]; then
+            run_linters_parallel "${TYPE_ARRAY[@]}"
+        else
+            for type in "${TYPE_ARRAY[@]}"; do
+                run_language_linter "$type"
+                
+                # Fail fast if configured
+                if [[ "$CLAUDE_HOOKS_FAIL_FAST" == "true" && $CLAUDE_HOOKS_ERROR_COUNT -gt 0 ]]; then
+                    break
+                fi
+            done
+        fi
     else
         # Single project type
         case "$PROJECT_TYPE" in
-            "go") lint_go ;;
-            "python") lint_python ;;
-            "javascript") lint_javascript ;;
-            "rust") lint_rust ;;
-            "nix") lint_nix ;;
-            "tilt") 
-                if type -t lint_tilt &>/dev/null; then
-                    lint_tilt
-                else
-                    log_debug "Tilt linting function not available"
-                fi
-                ;;
             "unknown") 
                 log_info "No recognized project type, skipping checks"
                 ;;
+            "none")
+                log_info "No lintable files changed, skipping checks"
+                ;;
+            "watched")
+                log_debug "Verdicts are current, skipping checks"
+                ;;
+            *) run_language_linter "$PROJECT_TYPE" ;;
         esac
     fi
     
     # Show timing if enabled
     time_end "$START_TIME"
+    write_timing_report
     
     # Print summary
     print_summary
@@ -14,6 +14,14 @@ import subprocess
 from pathlib import Path
 from datetime import datetime
 
+# Add utils/logs to path to import the shared log store
+sys.path.insert(0, str(Path(__file__).parent / "utils" / "logs"))
+from log_store import append_log, get_session_dir
+from transcript_export import export_transcript
+from metrics import HookMetrics
+
+metrics = HookMetrics('subagent_stop')
+
 try:
     from dotenv import load_dotenv
     load_dotenv()
@@ -61,12 +69,13 @@ def announce_subagent_completion():
         completion_message = "Subagent Complete"
         
         # Call the TTS script with the completion message
-        subprocess.run([
-            "uv", "run", tts_script, completion_message
-        ], 
-        capture_output=True,  # Suppress output
-        timeout=10  # 10-second timeout
-        )
+        with metrics.span('tts'):
+            subprocess.run([
+                "uv", "run", tts_script, completion_message
+            ], 
+            capture_output=True,  # Suppress output
+            timeout=10  # 10-second timeout
+            )
         
     except (subprocess.TimeoutExpired, subprocess.SubprocessError, FileNotFoundError):
         # Fail silently if TTS encounters issues
@@ -80,58 +89,30 @@ def main():
     try:
         # Parse command line arguments
         parser = argparse.ArgumentParser()
-        parser.add_argument('--chat', action='store_true', help='Copy transcript to chat.json')
+        parser.add_argument('--chat', action='store_true', help='Export new transcript lines to chat.jsonl')
         args = parser.parse_args()
         
         # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
+        with metrics.span('parse'):
+            input_data = json.load(sys.stdin)
 
         # Extract required fields
         session_id = input_data.get("session_id", "")
         stop_hook_active = input_data.get("stop_hook_active", False)
 
-        # Ensure log directory exists
-        log_dir = os.path.join(os.getcwd(), "logs")
-        os.makedirs(log_dir, exist_ok=True)
-        log_path = os.path.join(log_dir, "subagent_stop.json")
-
-        # Read existing log data or initialize empty list
-        if os.path.exists(log_path):
-            with open(log_path, 'r') as f:
-                try:
-                    log_data = json.load(f)
-                except (json.JSONDecodeError, ValueError):
-                    log_data = []
-        else:
-            log_data = []
-        
-        # Append new data
-        log_data.append(input_data)
-        
-        # Write back to file with formatting
-        with open(log_path, 'w') as f:
-            json.dump(log_data, f, indent=2)
+        # Append to this session's log outside the project tree
+        with metrics.span('log_write'):
+            append_log(input_data, 'subagent_stop')
+        log_dir = get_session_dir(input_data)
         
         # Handle --chat switch (same as stop.py)
         if args.chat and 'transcript_path' in input_data:
             transcript_path = input_data['transcript_path']
             if os.path.exists(transcript_path):
-                # Read .jsonl file and convert to JSON array
-                chat_data = []
+                # Append only the transcript lines added since the last stop
                 try:
-                    with open(transcript_path, 'r') as f:
-                        for line in f:
-                            line = line.strip()
-                            if line:
-                                try:
-                                    chat_data.append(json.loads(line))
-                                except json.JSONDecodeError:
-                                    pass  # Skip invalid lines
-                    
-                    # Write to logs/chat.json
-                    chat_file = os.path.join(log_dir, 'chat.json')
-                    with open(chat_file, 'w') as f:
-                        json.dump(chat_data, f, indent=2)
+                    with metrics.span('export'):
+                        export_transcript(transcript_path, log_dir)
                 except Exception:
                     pass  # Fail silently
 
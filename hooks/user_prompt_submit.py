@@ -13,6 +13,21 @@ import sys
 from pathlib import Path
 from datetime import datetime
 
+# Add utils/logs to path to import the shared log store
+sys.path.insert(0, str(Path(__file__).parent / "utils" / "logs"))
+from log_store import append_log
+from metrics import HookMetrics
+
+# Add utils/policy to path to import the compiled prompt rules
+sys.path.insert(0, str(Path(__file__).parent / "utils" / "policy"))
+from prompt_filter import load_filter
+
+# Add utils/context to path to import the cached repository summary
+sys.path.insert(0, str(Path(__file__).parent / "utils" / "context"))
+from repo_context import render as render_repo_context
+
+metrics = HookMetrics('user_prompt_submit')
+
 try:
     from dotenv import load_dotenv
     load_dotenv()
@@ -21,48 +36,22 @@ except ImportError:
 
 
 def log_user_prompt(session_id, input_data):
-    """Log user prompt to logs directory."""
-    # Ensure logs directory exists
-    log_dir = Path("logs")
-    log_dir.mkdir(parents=True, exist_ok=True)
-    log_file = log_dir / 'user_prompt_submit.json'
-    
-    # Read existing log data or initialize empty list
-    if log_file.exists():
-        with open(log_file, 'r') as f:
-            try:
-                log_data = json.load(f)
-            except (json.JSONDecodeError, ValueError):
-                log_data = []
-    else:
-        log_data = []
-    
+    """Log user prompt to the session's log directory."""
     # Append the entire input data
-    log_data.append(input_data)
-    
-    # Write back to file with formatting
-    with open(log_file, 'w') as f:
-        json.dump(log_data, f, indent=2)
+    append_log(input_data, 'user_prompt_submit')
 
 
 def validate_prompt(prompt):
     """
-    Validate the user prompt for security or policy violations.
+    Validate the user prompt against the rules in prompt_rules.txt.
     Returns tuple (is_valid, reason).
     """
-    # Example validation rules (customize as needed)
-    blocked_patterns = [
-        # Add any patterns you want to block
-        # Example: ('rm -rf /', 'Dangerous command detected'),
-    ]
-    
-    prompt_lower = prompt.lower()
-    
-    for pattern, reason in blocked_patterns:
-        if pattern.lower() in prompt_lower:
-            return False, reason
+    match = load_filter().match(prompt)
+    if match is None:
+        return True, None
     
-    return True, None
+    rule = match.rule
+    return False, f"{rule.reason} (rule on line {rule.line}: {rule.pattern!r})"
 
 
 def main():
@@ -73,29 +62,37 @@ def main():
                           help='Enable prompt validation')
         parser.add_argument('--log-only', action='store_true',
                           help='Only log prompts, no validation or blocking')
+        parser.add_argument('--context', action='store_true',
+                          help='Add a cached repository summary to the prompt context')
         args = parser.parse_args()
         
         # Read JSON input from stdin
-        input_data = json.loads(sys.stdin.read())
+        with metrics.span('parse'):
+            input_data = json.loads(sys.stdin.read())
         
         # Extract session_id and prompt
         session_id = input_data.get('session_id', 'unknown')
         prompt = input_data.get('prompt', '')
         
         # Log the user prompt
-        log_user_prompt(session_id, input_data)
+        with metrics.span('log_write'):
+            log_user_prompt(session_id, input_data)
         
         # Validate prompt if requested and not in log-only mode
         if args.validate and not args.log_only:
-            is_valid, reason = validate_prompt(prompt)
+            with metrics.span('policy'):
+                is_valid, reason = validate_prompt(prompt)
             if not is_valid:
+                metrics.count('claude_hook_blocked_total', rule='prompt')
                 # Exit code 2 blocks the prompt with error message
                 print(f"Prompt blocked: {reason}", file=sys.stderr)
                 sys.exit(2)
         
         # Add context information (optional)
-        # You can print additional context that will be added to the prompt
-        # Example: print(f"Current time: {datetime.now()}")
+        # Anything printed to stdout is added to the prompt context
+        if args.context:
+            with metrics.span('context'):
+                print(render_repo_context(input_data))
         
         # Success - prompt will be processed
         sys.exit(0)
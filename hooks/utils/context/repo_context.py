@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Repository Context
+Compact project summary for UserPromptSubmit: branch, dirty files,
+detected project type and the files edited recently in the session.
+
+The git-derived part is cached per project under
+``<log_root>/context/<project>.json``. It is keyed by the mtimes of the git
+index, HEAD and the current branch ref, so repeat prompts reuse it without
+running git. A cached summary that no longer matches its key (or is older
+than CLAUDE_HOOKS_CONTEXT_MAX_AGE) is still served at once, while a
+detached process refreshes it: stale-while-revalidate. With no cache at
+all, git gets CLAUDE_HOOKS_CONTEXT_BUDGET_MS to answer before the hook
+moves on with what it has. Recently edited files come from a bounded tail
+read of the session's post_tool_use log, so they are always current.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Add utils/logs to path to import the shared log store
+sys.path.insert(0, str(Path(__file__).parent.parent / "logs"))
+from log_store import get_log_root, get_session_dir, project_slug
+
+
+BUDGET_MS = int(os.getenv("CLAUDE_HOOKS_CONTEXT_BUDGET_MS", "300"))
+MAX_AGE = int(os.getenv("CLAUDE_HOOKS_CONTEXT_MAX_AGE", "120"))
+MAX_LISTED = 15
+TAIL_BYTES = 64 * 1024
+EDIT_TOOLS = ("Edit", "MultiEdit", "Write", "NotebookEdit")
+
+# Manifest files and source extensions, as in detect_project_type()
+# in common-helpers.sh
+PROJECT_MARKERS = (
+    ("go", ("go.mod", "go.sum"), (".go",)),
+    ("python", ("pyproject.toml", "setup.py", "requirements.txt"), (".py",)),
+    ("javascript", ("package.json", "tsconfig.json"), (".js", ".ts", ".jsx", ".tsx")),
+    ("rust", ("Cargo.toml",), (".rs",)),
+    ("nix", ("flake.nix", "default.nix", "shell.nix"), ()),
+)
+SKIP_DIRS = {"node_modules", "target", "vendor", "venv", ".venv", "__pycache__", "dist", "build"}
+
+
+def find_git_dir(cwd: str) -> Optional[Path]:
+    """Locate the git directory without spawning git (handles worktree files)."""
+    path = Path(cwd).resolve()
+    for candidate in (path, *path.parents):
+        dot_git = candidate / ".git"
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            text = dot_git.read_text(errors="replace").strip()
+            if text.startswith("gitdir:"):
+                return (candidate / text[len("gitdir:"):].strip()).resolve()
+    return None
+
+
+def cache_key(git_dir: Optional[Path]) -> List[Any]:
+    """Mtimes of the git index, HEAD and the branch ref HEAD points at."""
+    if git_dir is None:
+        return []
+    key: List[Any] = []
+    paths = [git_dir / "index", git_dir / "HEAD"]
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+        if head.startswith("ref:"):
+            paths.append(git_dir / head[4:].strip())
+    except OSError:
+        pass
+    for path in paths:
+        try:
+            key.append(path.stat().st_mtime_ns)
+        except OSError:
+            key.append(None)
+    return key
+
+
+def detect_project_type(cwd: str, max_depth: int = 3,
+                        deadline: Optional[float] = None) -> Tuple[str, bool]:
+    """
+    Python port of detect_project_type(): manifests first, then a shallow walk.
+    Returns the type and whether the walk finished; past ``deadline`` it stops
+    and reports what it found so far.
+    """
+    found = []
+    extensions = {}
+    for name, manifests, exts in PROJECT_MARKERS:
+        if any(os.path.exists(os.path.join(cwd, m)) for m in manifests):
+            found.append(name)
+        else:
+            for ext in exts:
+                extensions[ext] = name
+
+    pending = set(extensions.values())
+    base_depth = cwd.rstrip(os.sep).count(os.sep)
+    finished = True
+    for dirpath, dirnames, filenames in os.walk(cwd):
+        if not pending:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            finished = False
+            break
+        if dirpath.count(os.sep) - base_depth >= max_depth - 1:
+            dirnames[:] = []
+        else:
+            dirnames[:] = [d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS]
+        for filename in filenames:
+            name = extensions.get(os.path.splitext(filename)[1])
+            if name in pending:
+                pending.discard(name)
+                found.append(name)
+
+    order = [name for name, _, _ in PROJECT_MARKERS]
+    found = sorted(set(found), key=order.index)
+    if not found:
+        return "unknown", finished
+    return (found[0] if len(found) == 1 else "mixed:" + ",".join(found)), finished
+
+
+def _git(cwd: str, args: List[str], deadline: float) -> Optional[str]:
+    timeout = deadline - time.monotonic()
+    if timeout <= 0:
+        return None
+    try:
+        result = subprocess.run(["git", *args], cwd=cwd, capture_output=True,
+                                text=True, timeout=timeout)
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def collect(cwd: str, budget_ms: int = BUDGET_MS) -> Dict[str, Any]:
+    """
+    Run git and the project-type walk; unfinished git parts are left as
+    None, and a walk cut short keeps its partial type but leaves the
+    summary incomplete. Outside a git repository the git fields stay None and do not count
+    against completeness, so the summary is still cached.
+    """
+    deadline = time.monotonic() + budget_ms / 1000
+    summary: Dict[str, Any] = {"branch": None, "dirty": None, "project_type": None,
+                               "complete": False}
+    in_repo = find_git_dir(cwd) is not None
+    branch = _git(cwd, ["rev-parse", "--abbrev-ref", "HEAD"], deadline) if in_repo else None
+    if branch is not None:
+        summary["branch"] = branch.strip()
+    status = _git(cwd, ["status", "--porcelain=v1", "-z"], deadline) if in_repo else None
+    if status is not None:
+        dirty, entries = [], iter(status.split("\0"))
+        for entry in entries:
+            if len(entry) > 3:
+                dirty.append(entry[3:])
+                if entry[0] in "RC":
+                    next(entries, None)  # Skip the rename/copy source path
+        summary["dirty"] = dirty
+    walked = False
+    if time.monotonic() < deadline:
+        summary["project_type"], walked = detect_project_type(cwd, deadline=deadline)
+    required = ("branch", "dirty", "project_type") if in_repo else ("project_type",)
+    summary["complete"] = walked and all(summary[field] is not None for field in required)
+    return summary
+
+
+def _cache_path(cwd: str) -> Path:
+    return get_log_root() / "context" / f"{project_slug(cwd)}.json"
+
+
+def _write_cache(path: Path, entry: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(entry, f)
+    os.replace(tmp, path)
+
+
+def refresh(cwd: str) -> Optional[Dict[str, Any]]:
+    """Recompute and store the summary; skips if another refresh holds the lock."""
+    path = _cache_path(cwd)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lock_fd = os.open(path.with_name(f"{path.name}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return None  # A refresh is already running
+        key = cache_key(find_git_dir(cwd))
+        summary = collect(cwd, budget_ms=30_000)
+        _write_cache(path, {"key": key, "created": time.time(), "summary": summary})
+        return summary
+    finally:
+        os.close(lock_fd)
+
+
+def _revalidate_in_background(cwd: str) -> None:
+    subprocess.Popen([sys.executable, str(Path(__file__).resolve()), "--refresh", cwd],
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+def get_summary(cwd: str) -> Dict[str, Any]:
+    """Return the cached summary, serving stale entries while revalidating."""
+    path = _cache_path(cwd)
+    key = cache_key(find_git_dir(cwd))
+    try:
+        with open(path, "r") as f:
+            entry = json.load(f)
+    except (OSError, json.JSONDecodeError, ValueError):
+        entry = None
+    cached = entry.get("summary") if isinstance(entry, dict) else None
+
+    if isinstance(cached, dict):
+        fresh = (entry.get("key") == key and cached.get("complete")
+                 and time.time() - entry.get("created", 0) < MAX_AGE)
+        if not fresh:
+            _revalidate_in_background(cwd)
+        return cached
+
+    summary = collect(cwd)
+    if summary["complete"]:
+        _write_cache(path, {"key": key, "created": time.time(), "summary": summary})
+    else:
+        _revalidate_in_background(cwd)
+    return summary
+
+
+def recent_edits(input_data: Dict[str, Any], limit: int = MAX_LISTED) -> List[str]:
+    """Files edited in this session, newest first, from the tail of its log."""
+    log_path = get_session_dir(input_data, create=False) / "post_tool_use.jsonl"
+    try:
+        with open(log_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - TAIL_BYTES))
+            lines = f.read().split(b"\n")
+    except OSError:
+        return []
+    if size > TAIL_BYTES:
+        lines = lines[1:]  # First line is probably cut
+
+    seen: List[str] = []
+    for line in reversed(lines):
+        try:
+            record = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        if not isinstance(record, dict) or record.get("tool_name") not in EDIT_TOOLS:
+            continue
+        tool_input = record.get("tool_input") or {}
+        path = tool_input.get("file_path") or tool_input.get("notebook_path")
+        if isinstance(path, str) and path not in seen:
+            seen.append(path)
+            if len(seen) >= limit:
+                break
+    return seen
+
+
+def _listing(paths: List[str], cwd: str) -> str:
+    shown = [os.path.relpath(p, cwd) if os.path.isabs(p) else p for p in paths[:MAX_LISTED]]
+    more = f" (+{len(paths) - MAX_LISTED} more)" if len(paths) > MAX_LISTED else ""
+    return ", ".join(shown) + more
+
+
+def render(input_data: Dict[str, Any]) -> str:
+    """Build the context block printed by the hook."""
+    cwd = input_data.get("cwd") or os.getcwd()
+    summary = get_summary(cwd)
+    lines = [f"Project: {summary.get('project_type') or 'unknown'}"
+             + (f" on branch {summary['branch']}" if summary.get("branch") else "")]
+    dirty = summary.get("dirty")
+    if dirty:
+        lines.append(f"Uncommitted files ({len(dirty)}): {_listing(dirty, cwd)}")
+    edits = recent_edits(input_data)
+    if edits:
+        lines.append(f"Recently edited this session: {_listing(edits, cwd)}")
+    return "<repo-context>\n" + "\n".join(lines) + "\n</repo-context>"
+
+
+def main():
+    """Command line interface for testing."""
+    if len(sys.argv) > 2 and sys.argv[1] == "--refresh":
+        refresh(sys.argv[2])
+        return
+    cwd = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
+    started = time.perf_counter()
+    print(render({"cwd": cwd, "session_id": "cli"}))
+    print(f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
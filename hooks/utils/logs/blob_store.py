@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Hook Blob Store
+Content-addressed, compressed storage for large strings in hook payloads.
+
+Strings longer than CLAUDE_HOOKS_BLOB_THRESHOLD characters are written once
+to ``<log_root>/blobs/<aa>/<sha256>.gz`` and replaced in the logged record by
+a reference ``{"$blob": "<sha256>", "len": <chars>}``. Repeated file bodies
+from iterative Write/Edit calls are therefore stored a single time.
+"""
+
+import gzip
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from log_store import get_log_root
+
+
+BLOB_THRESHOLD = int(os.getenv("CLAUDE_HOOKS_BLOB_THRESHOLD", "2048"))
+BLOB_KEY = "$blob"
+
+
+def get_blob_dir(root: Optional[Path] = None) -> Path:
+    """Return the blob directory under the log root."""
+    return (root or get_log_root()) / "blobs"
+
+
+def _blob_path(digest: str, root: Optional[Path] = None) -> Path:
+    return get_blob_dir(root) / digest[:2] / f"{digest}.gz"
+
+
+def put_blob(text: str, root: Optional[Path] = None) -> str:
+    """Store a string if it is not already present and return its sha256."""
+    data = text.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    path = _blob_path(digest, root)
+    if path.exists():
+        os.utime(path)  # Keep reused blobs young for the retention sweep
+        return digest
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with gzip.open(tmp, "wb", compresslevel=6) as f:
+        f.write(data)
+    os.replace(tmp, path)  # Identical content, so losing a race is harmless
+    return digest
+
+
+def get_blob(digest: str, root: Optional[Path] = None) -> str:
+    """Load a stored string by its sha256."""
+    with gzip.open(_blob_path(digest, root), "rb") as f:
+        return f.read().decode("utf-8")
+
+
+class BlobRef:
+    """A lazily loaded blob reference found in a logged record."""
+
+    __slots__ = ("digest", "length", "_root", "_value")
+
+    def __init__(self, digest: str, length: int, root: Optional[Path] = None):
+        self.digest = digest
+        self.length = length
+        self._root = root
+        self._value = None
+
+    def read(self) -> str:
+        """Load the blob contents, caching them on first access."""
+        if self._value is None:
+            self._value = get_blob(self.digest, self._root)
+        return self._value
+
+    def __str__(self) -> str:
+        return self.read()
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __repr__(self) -> str:
+        return f"BlobRef({self.digest[:12]}, len={self.length})"
+
+
+def is_blob_ref(value: Any) -> bool:
+    """Check whether a value is a serialized blob reference."""
+    return isinstance(value, dict) and BLOB_KEY in value and len(value) == 2
+
+
+def externalize(value: Any, threshold: int = BLOB_THRESHOLD,
+                root: Optional[Path] = None) -> Any:
+    """Return a copy of a JSON value with long strings moved into the blob store."""
+    if isinstance(value, str):
+        if len(value) > threshold:
+            return {BLOB_KEY: put_blob(value, root), "len": len(value)}
+        return value
+    if isinstance(value, dict):
+        return {k: externalize(v, threshold, root) for k, v in value.items()}
+    if isinstance(value, list):
+        return [externalize(v, threshold, root) for v in value]
+    return value
+
+
+def rehydrate(value: Any, lazy: bool = True, root: Optional[Path] = None) -> Any:
+    """
+    Replace blob references in a logged record.
+    With ``lazy`` set they become BlobRef objects that load on first read,
+    otherwise the original strings are loaded immediately.
+    """
+    if is_blob_ref(value):
+        ref = BlobRef(value[BLOB_KEY], value.get("len", 0), root)
+        return ref if lazy else ref.read()
+    if isinstance(value, dict):
+        return {k: rehydrate(v, lazy, root) for k, v in value.items()}
+    if isinstance(value, list):
+        return [rehydrate(v, lazy, root) for v in value]
+    return value
+
+
+def externalize_payload(input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Externalize the tool_input and tool_response fields of a hook payload."""
+    record = dict(input_data)
+    for key in ("tool_input", "tool_response"):
+        if key in record:
+            record[key] = externalize(record[key])
+    return record
+
+
+def main():
+    """Command line interface for testing."""
+    import sys
+
+    if len(sys.argv) > 1:
+        print(get_blob(sys.argv[1]))
+    else:
+        print(f"Blob dir: {get_blob_dir()}")
+        print("Usage: ./blob_store.py <sha256>")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Hook Dashboard
+Live terminal view of hook activity, fed by incremental tail reads.
+
+The dashboard never re-parses whole logs. It follows the manifest by byte
+offset to discover sessions, then polls only the pre/post tool logs of
+sessions in the current day shards. A file is read only when its size or
+inode has changed since the last poll. Metric deltas are folded when hooks
+have appended some, and the shared metrics file is otherwise reloaded only
+when its mtime moves. Idle files are polled less often, which keeps a
+long-running view well under 1% of a CPU.
+"""
+
+import curses
+import json
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from log_store import MANIFEST_NAME, get_log_root
+from metrics import DELTAS_NAME, METRICS_NAME, _series_name, fold_deltas
+from latency import bash_program
+from log_index import parse_timestamp
+
+
+POLL_SECONDS = 1.0
+IDLE_POLL_SECONDS = 10.0
+IDLE_AFTER_SECONDS = 300
+ACTIVE_SESSION_SECONDS = 300
+WINDOW_MINUTES = 15
+WATCHED_LOGS = ("pre_tool_use", "post_tool_use")
+
+
+class TailFile:
+    """Follows one JSONL file by inode and byte offset."""
+
+    def __init__(self, path: Path, from_end: bool = False):
+        self.path = path
+        self.inode = None
+        self.offset = 0
+        self.pending = b""
+        self.last_change = time.time()
+        self.next_poll = 0.0
+        if from_end:
+            try:
+                st = path.stat()
+                self.inode, self.offset = st.st_ino, st.st_size
+            except FileNotFoundError:
+                pass
+
+    def poll(self, now: float) -> List[Dict[str, Any]]:
+        """Return records appended since the last poll."""
+        if now < self.next_poll:
+            return []
+        idle = now - self.last_change > IDLE_AFTER_SECONDS
+        self.next_poll = now + (IDLE_POLL_SECONDS if idle else POLL_SECONDS)
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return []
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            self.inode, self.offset, self.pending = st.st_ino, 0, b""  # Rotated
+        if st.st_size == self.offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(st.st_size - self.offset)
+        self.offset += len(data)
+        self.last_change = now
+        lines = (self.pending + data).split(b"\n")
+        self.pending = lines.pop()  # Incomplete trailing line
+        records = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if isinstance(record, dict):
+                records.append(record)
+        return records
+
+
+class DashboardState:
+    """Rolling aggregates for the dashboard panels."""
+
+    def __init__(self, root: Optional[Path] = None, backfill: bool = False):
+        self.root = root or get_log_root()
+        self.backfill = backfill
+        self.manifest = TailFile(self.root / MANIFEST_NAME)
+        self.tails: Dict[str, TailFile] = {}
+        self.calls: Deque[float] = deque()
+        self.recent: Deque[Tuple[float, str, str, str]] = deque(maxlen=500)
+        self.pending: Dict[str, float] = {}
+        self.sessions: Dict[str, float] = {}
+        self.metrics: Dict[str, Any] = {}
+        self.metrics_mtime = 0.0
+
+    def _watch_session(self, entry: Dict[str, Any]) -> None:
+        today = datetime.now().date()
+        shard_days = {str(today), str(today - timedelta(days=1))}
+        if entry.get("date") not in shard_days:
+            return
+        session_dir = self.root / entry.get("path", "")
+        for log_name in WATCHED_LOGS:
+            key = str(session_dir / log_name)
+            if key not in self.tails:
+                self.tails[key] = TailFile(session_dir / f"{log_name}.jsonl",
+                                           from_end=not self.backfill)
+
+    def _ingest(self, record: Dict[str, Any], now: float) -> None:
+        session = record.get("session_id", "")
+        self.sessions[session] = now
+        event = record.get("hook_event_name")
+        key = record.get("call_key")
+        mono = record.get("monotonic")
+        tool = record.get("tool_name", "?")
+        tool_input = record.get("tool_input") if isinstance(record.get("tool_input"), dict) else {}
+        detail = tool_input.get("command") or tool_input.get("file_path") or ""
+        if not isinstance(detail, str):
+            detail = ""
+        if tool == "Bash":
+            detail = f"{bash_program(detail) or ''}: {detail}"
+
+        if event == "PreToolUse":
+            # Bucket by when the call happened, so backfilled calls land in
+            # their own minute rather than the current one
+            called = parse_timestamp(record.get("timestamp"))
+            called = now if called is None else called
+            if called >= now - WINDOW_MINUTES * 60:
+                self.calls.append(called)
+            if key and isinstance(mono, (int, float)):
+                self.pending[key] = mono
+        elif event == "PostToolUse" and key in self.pending:
+            pre_mono = self.pending.pop(key)
+            if isinstance(mono, (int, float)) and mono >= pre_mono:
+                self.recent.append(((mono - pre_mono) * 1000, tool, detail, session))
+        if len(self.pending) > 5000:
+            self.pending.clear()  # Unpaired calls; keep memory bounded
+
+    def poll(self) -> None:
+        """Pull new manifest entries, log records and metrics."""
+        now = time.time()
+        self.manifest.next_poll = 0  # Manifest is tiny; always check it
+        for entry in self.manifest.poll(now):
+            self._watch_session(entry)
+        for tail in self.tails.values():
+            for record in tail.poll(now):
+                self._ingest(record, now)
+
+        cutoff = now - WINDOW_MINUTES * 60
+        while self.calls and self.calls[0] < cutoff:
+            self.calls.popleft()
+
+        if (self.root / DELTAS_NAME).exists():
+            try:
+                self.metrics = fold_deltas(self.root)
+            except OSError:
+                pass
+        try:
+            mtime = (self.root / METRICS_NAME).stat().st_mtime
+        except FileNotFoundError:
+            mtime = 0.0
+        if mtime != self.metrics_mtime:
+            self.metrics_mtime = mtime
+            try:
+                with open(self.root / METRICS_NAME, "r") as f:
+                    self.metrics = json.load(f)
+            except (OSError, json.JSONDecodeError, ValueError):
+                pass
+
+    # ------------------------------------------------------------------
+    # Panel data
+    # ------------------------------------------------------------------
+
+    def calls_per_minute(self) -> List[int]:
+        """Tool calls per minute for the window, oldest first."""
+        now = time.time()
+        buckets = [0] * WINDOW_MINUTES
+        for ts in self.calls:
+            age = int((now - ts) // 60)
+            if 0 <= age < WINDOW_MINUTES:
+                buckets[WINDOW_MINUTES - 1 - age] += 1
+        return buckets
+
+    def slowest(self, n: int = 10) -> List[Tuple[float, str, str, str]]:
+        return sorted(self.recent, key=lambda r: -r[0])[:n]
+
+    def blocked_by_rule(self) -> List[Tuple[str, int]]:
+        rows = []
+        for key, value in self.metrics.get("counters", {}).items():
+            if _series_name(key) == "claude_hook_blocked_total":
+                rule = key.split('rule="', 1)[-1].split('"', 1)[0]
+                rows.append((rule, int(value)))
+        return sorted(rows, key=lambda r: -r[1])
+
+    def phase_latency(self, phases=("llm", "tts")) -> List[Tuple[str, int, float]]:
+        rows = []
+        for key, hist in self.metrics.get("histograms", {}).items():
+            if _series_name(key) != "claude_hook_phase_duration_seconds":
+                continue
+            phase = key.split('phase="', 1)[-1].split('"', 1)[0]
+            hook = key.split('hook="', 1)[-1].split('"', 1)[0]
+            if phase in phases and hist.get("count"):
+                rows.append((f"{hook}/{phase}", hist["count"], hist["sum"] / hist["count"]))
+        return sorted(rows)
+
+    def active_sessions(self) -> List[Tuple[str, float]]:
+        now = time.time()
+        return sorted(((s, now - t) for s, t in self.sessions.items()
+                       if now - t <= ACTIVE_SESSION_SECONDS), key=lambda r: r[1])
+
+
+SPARK = " ▁▂▃▄▅▆▇█"
+
+
+def render_lines(state: DashboardState, width: int = 100) -> List[str]:
+    """Render the dashboard as plain text lines."""
+    per_minute = state.calls_per_minute()
+    peak = max(per_minute) or 1
+    spark = "".join(SPARK[min(8, round(8 * c / peak))] for c in per_minute)
+    lines = [
+        f"hooks top — {datetime.now():%H:%M:%S}  watching {len(state.tails)} log(s)  "
+        f"root {state.root}",
+        "",
+        f"Tool calls/min (last {WINDOW_MINUTES}m): {spark}  now {per_minute[-1]}  peak {peak}",
+        "",
+        "Slowest recent tool calls",
+    ]
+    for ms, tool, detail, session in state.slowest():
+        lines.append(f"  {ms:>9.0f}ms  {tool:10} {session[:8]}  {detail}"[:width])
+    lines += ["", "Blocked by rule (total)"]
+    lines += [f"  {count:>6}  {rule}" for rule, count in state.blocked_by_rule()] or ["  none"]
+    lines += ["", "LLM / TTS latency (mean)"]
+    lines += [f"  {name:28} {count:>6} calls  {mean * 1000:>8.0f}ms"
+              for name, count, mean in state.phase_latency()] or ["  no samples"]
+    lines += ["", f"Active sessions (last {ACTIVE_SESSION_SECONDS // 60}m)"]
+    lines += [f"  {session}  last event {age:>4.0f}s ago"
+              for session, age in state.active_sessions()] or ["  none"]
+    return [line[:width] for line in lines]
+
+
+def run_curses(state: DashboardState, interval: float = POLL_SECONDS) -> None:
+    """Run the interactive dashboard until 'q' is pressed."""
+
+    def loop(screen):
+        curses.curs_set(0)
+        screen.timeout(int(interval * 1000))
+        while True:
+            state.poll()
+            height, width = screen.getmaxyx()
+            screen.erase()
+            for y, line in enumerate(render_lines(state, width - 1)[:height - 1]):
+                screen.addstr(y, 0, line)
+            screen.refresh()
+            if screen.getch() in (ord("q"), ord("Q")):
+                break
+
+    curses.wrapper(loop)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Tool-Call Latency
+Pairs PreToolUse and PostToolUse events by call key and keeps streaming
+duration histograms per tool_name and per Bash argv[0].
+
+Events come from the SQLite log index, so rotation is already handled and
+each run only reads rows past the stored high-water id. The persisted
+summary (``<log_root>/latency.json``) holds the histograms, the high-water
+id and the few calls still waiting for their other half.
+"""
+
+import json
+import math
+import os
+import shlex
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from log_store import get_log_root
+import log_index
+
+
+SUMMARY_NAME = "latency.json"
+
+# Unpaired events older than this (relative to the newest event) are dropped
+PENDING_TTL_SECONDS = 3600
+
+
+def _empty_summary() -> Dict[str, Any]:
+    return {"last_id": 0, "pending": {}, "tools": {}, "bash": {}}
+
+
+def bucket_for(ms: float) -> int:
+    """Histogram bucket: durations in (2^(b-1), 2^b] milliseconds land in b."""
+    return max(0, math.ceil(math.log2(ms))) if ms > 1 else 0
+
+
+def _observe(hist: Dict[str, Any], ms: float) -> None:
+    hist["count"] = hist.get("count", 0) + 1
+    hist["sum_ms"] = hist.get("sum_ms", 0.0) + ms
+    hist["max_ms"] = max(hist.get("max_ms", 0.0), ms)
+    buckets = hist.setdefault("buckets", {})
+    key = str(bucket_for(ms))
+    buckets[key] = buckets.get(key, 0) + 1
+
+
+def percentile(hist: Dict[str, Any], q: float) -> float:
+    """Estimate a percentile as the upper bound of the bucket that holds it."""
+    target = q * hist.get("count", 0)
+    seen = 0
+    for bucket in sorted(hist.get("buckets", {}), key=int):
+        seen += hist["buckets"][bucket]
+        if seen >= target:
+            return min(float(2 ** int(bucket)), hist.get("max_ms", 0.0))
+    return hist.get("max_ms", 0.0)
+
+
+def bash_program(command: Optional[str]) -> Optional[str]:
+    """Return argv[0] of a Bash command, skipping leading VAR=value assignments."""
+    if not command:
+        return None
+    try:
+        words = shlex.split(command)
+    except ValueError:
+        words = command.split()
+    for word in words:
+        if "=" in word and not word.startswith(("/", ".")) and word.split("=", 1)[0].isidentifier():
+            continue
+        return os.path.basename(word)
+    return None
+
+
+def _load(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError, ValueError):
+        return _empty_summary()
+
+
+def update_latency(root: Optional[Path] = None, refresh_index: bool = True) -> Dict[str, Any]:
+    """Pair new Pre/Post events and fold their durations into the summary."""
+    root = root or get_log_root()
+    if refresh_index:
+        log_index.update_index(root)
+
+    path = root / SUMMARY_NAME
+    lock_fd = os.open(root / f"{SUMMARY_NAME}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        summary = _load(path)
+        pending: Dict[str, List[Any]] = summary["pending"]
+        newest = 0.0
+
+        conn = log_index.connect(root)
+        try:
+            rows = conn.execute(
+                "SELECT id, hook_event_name, tool_name, command, call_key, monotonic, timestamp "
+                "FROM events WHERE id > ? AND call_key IS NOT NULL AND monotonic IS NOT NULL "
+                "AND hook_event_name IN ('PreToolUse', 'PostToolUse') ORDER BY id",
+                (summary["last_id"],))
+            for row_id, event, tool, command, key, mono, ts in rows:
+                summary["last_id"] = row_id
+                newest = max(newest, ts or 0.0)
+                queue = pending.setdefault(key, [])
+                # Pair with the oldest waiting event of the opposite kind
+                match = next((i for i, p in enumerate(queue) if p[0] != event), None)
+                if match is None:
+                    queue.append([event, mono, ts, tool, command])
+                    continue
+                other = queue.pop(match)
+                if not queue:
+                    del pending[key]
+                pre_mono, post_mono = (other[1], mono) if event == "PostToolUse" else (mono, other[1])
+                ms = (post_mono - pre_mono) * 1000
+                if ms < 0:
+                    continue  # Clock domains differ (e.g. across a reboot)
+                tool = tool or other[3] or "unknown"
+                _observe(summary["tools"].setdefault(tool, {}), ms)
+                program = bash_program(command or other[4]) if tool == "Bash" else None
+                if program:
+                    _observe(summary["bash"].setdefault(program, {}), ms)
+        finally:
+            conn.close()
+
+        # Drop calls whose other half never arrived (denied or interrupted)
+        for key in list(pending):
+            pending[key] = [p for p in pending[key]
+                            if (p[2] or 0) >= newest - PENDING_TTL_SECONDS]
+            if not pending[key]:
+                del pending[key]
+
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(summary, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        return summary
+    finally:
+        os.close(lock_fd)
+
+
+def report_rows(summary: Dict[str, Any], group: str = "tools") -> List[Tuple[str, Dict[str, Any]]]:
+    """Return (name, stats) rows for a histogram group, slowest total first."""
+    rows = []
+    for name, hist in summary.get(group, {}).items():
+        count = hist.get("count", 0)
+        rows.append((name, {
+            "count": count,
+            "mean_ms": hist.get("sum_ms", 0.0) / count if count else 0.0,
+            "p50_ms": percentile(hist, 0.50),
+            "p90_ms": percentile(hist, 0.90),
+            "p99_ms": percentile(hist, 0.99),
+            "max_ms": hist.get("max_ms", 0.0),
+            "total_ms": hist.get("sum_ms", 0.0),
+        }))
+    return sorted(rows, key=lambda r: -r[1]["total_ms"])
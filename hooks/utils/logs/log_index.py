@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Hook Log Index
+Incrementally ingests hook logs into SQLite for fast filtered queries.
+
+The index lives at ``<log_root>/index.sqlite``. Each session log keeps a
+cursor (inode, first-line fingerprint and byte offset of the active file)
+plus the set of rotated segments already ingested, so a run only reads
+records appended since the previous one, including the tail of a file that
+was rotated in between. The fingerprint guards against inode reuse after
+a rotated file is compressed and unlinked.
+
+Stop and SubagentStop records keep their transcript_path, so
+iter_transcripts() lists the transcripts to refresh from the index instead
+of re-reading every session's Stop logs.
+
+Commands are indexed by the keyed command_hash the tool hooks record before
+redaction (see log_store), so ``query(command=...)`` finds a command as it
+was typed even when the stored text has secrets masked.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from log_store import (SEGMENT_RE, command_hash, file_fingerprint, get_log_root,
+                       iter_segments, iter_sessions, open_segment)
+from blob_store import BLOB_KEY, is_blob_ref
+
+
+INDEX_NAME = "index.sqlite"
+
+# Logs that are not hook event streams (chat.jsonl holds transcript lines)
+EXCLUDED_LOGS = {"chat"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT,
+    hook_event_name TEXT,
+    tool_name TEXT,
+    timestamp REAL,
+    file_path TEXT,
+    command_hash TEXT,
+    command TEXT,
+    project TEXT,
+    log_name TEXT,
+    call_key TEXT,
+    monotonic REAL,
+    transcript_path TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_session ON events(session_id);
+CREATE INDEX IF NOT EXISTS idx_events_event ON events(hook_event_name);
+CREATE INDEX IF NOT EXISTS idx_events_tool ON events(tool_name, timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_file ON events(file_path);
+CREATE INDEX IF NOT EXISTS idx_events_command ON events(command_hash);
+CREATE TABLE IF NOT EXISTS cursors (
+    log_key TEXT PRIMARY KEY,
+    inode INTEGER,
+    fingerprint TEXT,
+    offset INTEGER
+);
+CREATE TABLE IF NOT EXISTS segments (
+    path TEXT PRIMARY KEY
+);
+"""
+
+
+def get_index_path(root: Optional[Path] = None) -> Path:
+    """Return the path of the SQLite index under the log root."""
+    return (root or get_log_root()) / INDEX_NAME
+
+
+# Columns added after the first release, applied to older index files
+MIGRATIONS = (("call_key", "TEXT"), ("monotonic", "REAL"), ("transcript_path", "TEXT"))
+# PRAGMA user_version. Rows written before version 1 lack keyed command
+# hashes, before version 2 transcript paths; such an index is rebuilt.
+INDEX_VERSION = 2
+
+
+def connect(root: Optional[Path] = None) -> sqlite3.Connection:
+    """Open the index, creating or migrating the schema on first use."""
+    path = get_index_path(root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+    for column, kind in MIGRATIONS:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE events ADD COLUMN {column} {kind}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_transcript "
+                 "ON events(transcript_path) WHERE transcript_path IS NOT NULL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < INDEX_VERSION:
+        with conn:
+            for table in ("events", "cursors", "segments"):
+                conn.execute(f"DELETE FROM {table}")
+            conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+    return conn
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """Convert an epoch number or ISO-8601 string into epoch seconds."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _event_row(record: Dict[str, Any], project: str, log_name: str,
+               fallback_ts: float, root: Path) -> Tuple:
+    """Project a hook record onto the indexed columns."""
+    tool_input = record.get("tool_input") or {}
+    if not isinstance(tool_input, dict):
+        tool_input = {}
+
+    file_path = (tool_input.get("file_path") or tool_input.get("notebook_path")
+                 or tool_input.get("path"))
+    if not isinstance(file_path, str):
+        file_path = None
+
+    # Records from before the hooks stamped command_hash are hashed as stored
+    command = tool_input.get("command")
+    hashed = record.get("command_hash")
+    if not isinstance(hashed, str):
+        hashed = command_hash(command, root) if isinstance(command, str) else None
+    if is_blob_ref(command):
+        hashed, command = hashed or command[BLOB_KEY], None
+    elif not isinstance(command, str):
+        command = None
+
+    ts = parse_timestamp(record.get("timestamp")) or fallback_ts
+    monotonic = record.get("monotonic")
+    transcript_path = record.get("transcript_path")
+    return (record.get("session_id"), record.get("hook_event_name"),
+            record.get("tool_name"), ts, file_path, hashed, command,
+            project, log_name, record.get("call_key"),
+            monotonic if isinstance(monotonic, (int, float)) else None,
+            transcript_path if isinstance(transcript_path, str) else None)
+
+
+def _read_lines(f, skip: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (bytes consumed, record) for complete lines of a binary stream.
+    A trailing line without a newline is still being written and is left
+    for the next run.
+    """
+    if skip:
+        remaining = skip
+        while remaining > 0:
+            chunk = f.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+    for line in f:
+        if not line.endswith(b"\n"):
+            return
+        try:
+            record = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            record = None
+        yield len(line), record
+
+
+INSERT_SQL = """
+INSERT INTO events (session_id, hook_event_name, tool_name, timestamp,
+                    file_path, command_hash, command, project, log_name,
+                    call_key, monotonic, transcript_path)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _ingest_stream(conn, f, root, project, log_name, fallback_ts, skip=0) -> Tuple[int, int]:
+    """Insert records from a stream. Returns (bytes consumed, records added)."""
+    consumed, added, rows = 0, 0, []
+    for size, record in _read_lines(f, skip):
+        consumed += size
+        if isinstance(record, dict):
+            rows.append(_event_row(record, project, log_name, fallback_ts, root))
+            added += 1
+        if len(rows) >= 1000:
+            conn.executemany(INSERT_SQL, rows)
+            rows = []
+    if rows:
+        conn.executemany(INSERT_SQL, rows)
+    return consumed, added
+
+
+def _ingest_log(conn, root: Path, session_dir: Path, log_name: str, project: str) -> int:
+    """Ingest new records of one session log across its segments."""
+    log_key = str(session_dir / log_name)
+    cursor = conn.execute("SELECT inode, fingerprint, offset FROM cursors WHERE log_key = ?",
+                          (log_key,)).fetchone()
+    inode, fingerprint, offset = cursor if cursor else (None, None, 0)
+    active = session_dir / f"{log_name}.jsonl"
+    try:
+        active_file = open(active, "rb")
+    except FileNotFoundError:
+        active_file = None
+
+    with (active_file or open(os.devnull, "rb")) as f:
+        st = os.fstat(f.fileno()) if active_file else None
+        active_fp = file_fingerprint(f) if active_file else None
+        rotated_away = inode is not None and (
+            st is None or st.st_ino != inode or active_fp != fingerprint
+            or st.st_size < offset)
+        added = 0
+
+        for segment in iter_segments(session_dir, log_name):
+            if segment == active:
+                break
+            if conn.execute("SELECT 1 FROM segments WHERE path = ?",
+                            (str(segment),)).fetchone():
+                continue
+            if not segment.name.endswith((".gz", ".zst")):
+                return added  # Compression still in progress; retry next run
+            # The first unseen segment holds the generation we had partially read
+            skip = offset if rotated_away else 0
+            rotated_away, offset = False, 0
+            with open_segment(segment) as seg:
+                _, count = _ingest_stream(conn, seg, root, project, log_name,
+                                          segment.stat().st_mtime, skip)
+            added += count
+            conn.execute("INSERT OR IGNORE INTO segments (path) VALUES (?)", (str(segment),))
+
+        if active_file is not None:
+            if rotated_away or inode is None or st.st_ino != inode or active_fp != fingerprint:
+                offset = 0
+            f.seek(offset)
+            consumed, count = _ingest_stream(conn, f, root, project, log_name, time.time())
+            added += count
+            conn.execute("INSERT OR REPLACE INTO cursors (log_key, inode, fingerprint, offset) "
+                         "VALUES (?, ?, ?, ?)",
+                         (log_key, st.st_ino, active_fp, offset + consumed))
+        elif inode is not None:
+            # Rotated with no new active file yet: the partial read was
+            # consumed above, so the offset must not apply to the next segment
+            conn.execute("INSERT OR REPLACE INTO cursors (log_key, inode, fingerprint, offset) "
+                         "VALUES (?, NULL, NULL, 0)", (log_key,))
+    return added
+
+
+def _log_names(session_dir: Path) -> List[str]:
+    """List the hook log names present in a session directory."""
+    names = set()
+    for entry in os.scandir(session_dir):
+        match = SEGMENT_RE.match(entry.name)
+        if match:
+            names.add(match.group("name"))
+        elif entry.name.endswith(".jsonl"):
+            names.add(entry.name[:-len(".jsonl")])
+    return sorted(names - EXCLUDED_LOGS)
+
+
+def update_index(root: Optional[Path] = None) -> int:
+    """Ingest everything appended since the last run. Returns records added."""
+    root = root or get_log_root()
+    conn = connect(root)
+    added = 0
+    seen = set()
+    try:
+        for entry in iter_sessions(root):
+            session_dir = root / entry.get("path", "")
+            if entry.get("path") in seen or not session_dir.is_dir():
+                continue
+            seen.add(entry.get("path"))
+            with conn:
+                for log_name in _log_names(session_dir):
+                    added += _ingest_log(conn, root, session_dir, log_name,
+                                         entry.get("project", ""))
+    finally:
+        conn.close()
+    return added
+
+
+def iter_transcripts(root: Optional[Path] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Yield unique (session_id, transcript_path) pairs named in Stop logs.
+    The index is brought up to date first, which reads only new records.
+    """
+    root = root or get_log_root()
+    update_index(root)
+    conn = connect(root)
+    try:
+        rows = conn.execute(
+            "SELECT session_id, transcript_path FROM events "
+            "WHERE transcript_path IS NOT NULL AND log_name IN ('stop', 'subagent_stop') "
+            "GROUP BY transcript_path ORDER BY MIN(id)").fetchall()
+    finally:
+        conn.close()
+    for session_id, path in rows:
+        yield session_id or "", path
+
+
+def _where(root: Optional[Path], session_id=None, hook_event_name=None, tool_name=None,
+           file_path=None, command=None, since=None, until=None) -> Tuple[str, List[Any]]:
+    """Build the WHERE clause shared by query() and count()."""
+    clauses, params = [], []
+    for column, value in (("session_id", session_id),
+                          ("hook_event_name", hook_event_name),
+                          ("tool_name", tool_name),
+                          ("file_path", file_path)):
+        if value:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if command:
+        clauses.append("command_hash = ?")
+        params.append(command_hash(command, root))
+    if since is not None:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("timestamp < ?")
+        params.append(until)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def count(root: Optional[Path] = None, **filters) -> int:
+    """Count events matching the same filters accepted by query()."""
+    where, params = _where(root, **filters)
+    conn = connect(root)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM events" + where, params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def query(root: Optional[Path] = None, limit: Optional[int] = None,
+          **filters) -> Iterator[Dict[str, Any]]:
+    """
+    Stream matching events, oldest first.
+    Filters: session_id, hook_event_name, tool_name, file_path, command
+    (as typed, matched by keyed hash), since and until (epoch seconds).
+    """
+    where, params = _where(root, **filters)
+    sql = ("SELECT session_id, hook_event_name, tool_name, timestamp, file_path, "
+           "command_hash, command, project FROM events" + where)
+    sql += " ORDER BY timestamp, id"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+
+    conn = connect(root)
+    try:
+        cursor = conn.execute(sql, params)
+        columns = [d[0] for d in cursor.description]
+        for row in cursor:
+            yield dict(zip(columns, row))
+    finally:
+        conn.close()
@@ -0,0 +1,619 @@
+#!/usr/bin/env python3
+"""
+Hook Log Store
+Resolves where hook logs live and appends records to them.
+
+Logs are kept out of the project working tree, under a central root
+(``~/.claude/logs`` unless ``CLAUDE_HOOKS_LOG_DIR`` is set), sharded as:
+
+    <root>/<project>/<YYYY-MM-DD>/<session_id>/<hook>.jsonl
+
+Every session directory is recorded once in ``<root>/manifest.jsonl`` so
+sessions can be enumerated without walking the whole tree. A session stays
+in the day shard where it was first seen, even once it runs past midnight.
+
+Records are written as one JSON line per event with a single O_APPEND
+write under an advisory lock, so concurrent hook processes never lose or
+interleave records and a torn file can never wipe earlier history.
+
+Active logs are rotated once they pass CLAUDE_HOOKS_LOG_MAX_BYTES, or once
+they sit idle past CLAUDE_HOOKS_LOG_MAX_AGE, into compressed segments
+(``<hook>.<epoch_ms>.jsonl.zst`` when the zstandard module is available,
+``.gz`` otherwise). A periodic sweep, run in a detached process so no
+hook waits on it, keeps the whole log root under
+CLAUDE_HOOKS_LOG_RETENTION_BYTES by deleting the oldest segments first.
+Payload blobs are reference-counted through the logs that remain: a blob
+goes only once no kept segment or active log refers to it.
+iter_log() streams a log across its rotated segments and the active file.
+
+Tool records carry a command_hash of the Bash command as typed, taken
+before secrets are redacted so the command can still be looked up. It is an
+HMAC under a random per-root key (``<root>/.command-key``), so the hash
+cannot be used to guess the secrets a redacted command held.
+"""
+
+import gzip
+import hashlib
+import hmac
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Not available on Windows; O_APPEND alone still applies
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # Optional; rotated segments fall back to gzip
+
+
+LOG_ROOT_ENV = "CLAUDE_HOOKS_LOG_DIR"
+DEFAULT_LOG_ROOT = Path.home() / ".claude" / "logs"
+MANIFEST_NAME = "manifest.jsonl"
+COMMAND_KEY_NAME = ".command-key"
+SWEEP_MARKER = ".last_sweep"
+
+# Rotation and retention limits, overridable through the environment
+MAX_BYTES = int(os.getenv("CLAUDE_HOOKS_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+MAX_AGE = int(os.getenv("CLAUDE_HOOKS_LOG_MAX_AGE", str(6 * 3600)))
+RETENTION_BYTES = int(os.getenv("CLAUDE_HOOKS_LOG_RETENTION_BYTES", str(512 * 1024 * 1024)))
+SWEEP_INTERVAL = int(os.getenv("CLAUDE_HOOKS_LOG_SWEEP_INTERVAL", "600"))
+
+DAY_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+SEGMENT_RE = re.compile(r"^(?P<name>.+)\.(?P<stamp>\d+)\.jsonl(?P<ext>\.gz|\.zst)?$")
+
+# Payload blobs (blob_store.py) live under <root>/blobs/<xx>/<sha256>.gz and
+# are referenced from log lines as {"$blob":"<sha256>",...}. A blob is
+# written just before the line that refers to it, so young ones are kept.
+BLOB_DIR_NAME = "blobs"
+BLOB_REF_RE = re.compile(rb'"\$blob":\s*"([0-9a-f]{64})"')
+BLOB_GRACE_SECONDS = 300
+
+READ_ERRORS = (OSError, EOFError, ValueError) + ((zstandard.ZstdError,) if zstandard else ())
+
+# Read-only tools take the fast path in the tool hooks: path policy only,
+# and a slim log record that never carries file contents or search output
+READ_ONLY_TOOLS = frozenset(("Read", "Glob", "Grep", "LS"))
+SLIM_KEYS = ("session_id", "cwd", "hook_event_name", "tool_name", "tool_use_id",
+             "timestamp", "monotonic", "call_key")
+SLIM_INPUT_KEYS = ("file_path", "path", "pattern", "glob", "offset", "limit")
+
+
+def get_log_root() -> Path:
+    """Return the central log root, honouring CLAUDE_HOOKS_LOG_DIR."""
+    configured = os.getenv(LOG_ROOT_ENV, "").strip()
+    if configured:
+        return Path(configured).expanduser()
+    return DEFAULT_LOG_ROOT
+
+
+def _safe_name(value: str, fallback: str) -> str:
+    """Reduce a value to a single safe path component."""
+    cleaned = re.sub(r"[^A-Za-z0-9._-]+", "-", value or "").strip(".-")
+    return cleaned or fallback
+
+
+def project_slug(cwd: Optional[str] = None) -> str:
+    """
+    Turn a project directory into a flat directory name.
+    Mirrors the ``-home-user-project`` naming used under ~/.claude/projects.
+    """
+    path = os.path.abspath(cwd or os.getcwd())
+    return re.sub(r"[^A-Za-z0-9]", "-", path) or "unknown"
+
+
+def _existing_session_dir(project_dir: Path, session: str, now: datetime) -> Optional[Path]:
+    """Find a session's directory in any day shard: today, yesterday, then the rest."""
+    for day in (now, now - timedelta(days=1)):
+        candidate = project_dir / day.strftime("%Y-%m-%d") / session
+        if candidate.is_dir():
+            return candidate
+    try:
+        days = sorted(entry.name for entry in os.scandir(project_dir)
+                      if DAY_RE.match(entry.name))
+    except FileNotFoundError:
+        return None
+    for day in days:
+        candidate = project_dir / day / session
+        if candidate.is_dir():
+            return candidate
+    return None
+
+
+def get_session_dir(input_data: Dict[str, Any], create: bool = True) -> Path:
+    """
+    Return the log directory for the session described by a hook payload.
+    A session keeps the directory of the day it was first seen; the first
+    process to create the directory registers it in the manifest.
+    """
+    cwd = input_data.get("cwd") or os.getcwd()
+    project = project_slug(cwd)
+    now = datetime.now()
+    day = now.strftime("%Y-%m-%d")
+    session = _safe_name(str(input_data.get("session_id", "")), "unknown")
+
+    root = get_log_root()
+    existing = _existing_session_dir(root / project, session, now)
+    if existing is not None:
+        return existing
+    session_dir = root / project / day / session
+    if create:
+        session_dir.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            session_dir.mkdir()
+        except FileExistsError:
+            pass  # Another hook process won the race and registered it
+        else:
+            _register_session(root, {
+                "session_id": session,
+                "project": project,
+                "cwd": cwd,
+                "date": day,
+                "path": str(session_dir.relative_to(root)),
+                "created": time.time(),
+            })
+    return session_dir
+
+
+def get_log_path(input_data: Dict[str, Any], log_name: str) -> Path:
+    """Return the path of a named hook log (e.g. 'post_tool_use') for a session."""
+    return get_session_dir(input_data) / f"{log_name}.jsonl"
+
+
+def append_line(path: Path, record: Dict[str, Any], max_bytes: int = 0) -> None:
+    """
+    Append one JSON record as a single line.
+
+    The encoded line goes out in one O_APPEND write while holding an
+    exclusive flock, so concurrent writers can neither interleave bytes
+    nor observe a half-written file. With ``max_bytes`` set, the file is
+    rotated under the same lock once it grows past that size.
+    """
+    data = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+    rotated = None
+    while True:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                # A rotation may have renamed the file while we waited
+                try:
+                    if os.stat(path).st_ino != os.fstat(fd).st_ino:
+                        continue
+                except FileNotFoundError:
+                    continue
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+            if max_bytes and os.fstat(fd).st_size >= max_bytes:
+                rotated = _rename_segment(Path(path))
+            break
+        finally:
+            os.close(fd)  # Closing the descriptor releases the lock
+
+    if rotated is not None:
+        compress_segment(rotated)
+
+
+def rotate_log(path: Path) -> Optional[Path]:
+    """Rotate an active log under its lock and compress the resulting segment."""
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+    except FileNotFoundError:
+        return None
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        if os.stat(path).st_ino != os.fstat(fd).st_ino:
+            return None  # Someone else rotated it first
+        segment = _rename_segment(Path(path))
+    except FileNotFoundError:
+        return None
+    finally:
+        os.close(fd)
+    return compress_segment(segment)
+
+
+def _rename_segment(path: Path) -> Path:
+    """Move an active log aside as a timestamped, not yet compressed segment."""
+    stem = path.name[:-len(".jsonl")] if path.name.endswith(".jsonl") else path.name
+    stamp = int(time.time() * 1000)
+    # Two rotations in one millisecond must not overwrite each other
+    while any(path.with_name(f"{stem}.{stamp}.jsonl{ext}").exists() for ext in ("", ".gz", ".zst")):
+        stamp += 1
+    segment = path.with_name(f"{stem}.{stamp}.jsonl")
+    os.rename(path, segment)
+    return segment
+
+
+def compress_segment(segment: Path) -> Path:
+    """Compress a rotated segment in place and return the compressed path."""
+    if zstandard is not None:
+        target = segment.with_name(segment.name + ".zst")
+        opener = lambda p: zstandard.ZstdCompressor(level=10).stream_writer(open(p, "wb"))
+    else:
+        target = segment.with_name(segment.name + ".gz")
+        opener = lambda p: gzip.open(p, "wb", compresslevel=6)
+
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        with open(segment, "rb") as src, opener(tmp) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(tmp, target)
+        os.unlink(segment)
+    except FileNotFoundError:
+        pass  # Another process compressed it concurrently
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return target
+
+
+def open_segment(path: Path):
+    """Open a plain, gzip or zstd log file for streaming binary reads."""
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    if path.suffix == ".zst":
+        if zstandard is not None:
+            reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+            return io.BufferedReader(reader)
+        proc = subprocess.Popen(["zstd", "-dcq", str(path)], stdout=subprocess.PIPE)
+        return proc.stdout
+    return open(path, "rb")
+
+
+def file_fingerprint(f) -> str:
+    """
+    Hash the first line of an open binary file to identify its generation.
+    Used with the inode to notice files that were replaced or rotated.
+    """
+    position = f.tell()
+    f.seek(0)
+    first = f.readline(4096)
+    f.seek(position)
+    return hashlib.sha1(first).hexdigest()
+
+
+def resume_offset(f, cursor: Optional[Dict[str, Any]]) -> Tuple[int, Dict[str, Any]]:
+    """
+    Decide where to resume reading an open binary file.
+    Returns the offset from ``cursor`` if it still describes this file, or 0
+    if the file was replaced or truncated, plus the file's current identity
+    (inode and fingerprint) to store in the next cursor.
+    """
+    st = os.fstat(f.fileno())
+    identity = {"inode": st.st_ino, "fingerprint": file_fingerprint(f)}
+    if (cursor and cursor.get("inode") == identity["inode"]
+            and cursor.get("fingerprint") == identity["fingerprint"]
+            and st.st_size >= cursor.get("offset", 0)):
+        return cursor.get("offset", 0), identity
+    return 0, identity
+
+
+def iter_complete_lines(f, offset: int) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (line start offset, line) for complete lines after ``offset``.
+    A trailing line without a newline is still being written and is left
+    for the next reader.
+    """
+    f.seek(offset)
+    for line in f:
+        if not line.endswith(b"\n"):
+            return
+        yield offset, line
+        offset += len(line)
+
+
+def iter_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from a JSONL log or a compressed segment.
+    Legacy JSON-array logs are still readable; torn lines are skipped.
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    try:
+        raw = open_segment(path)
+    except (OSError, FileNotFoundError):
+        return
+    try:
+        # Peek rather than seek: decompressing streams cannot rewind
+        first = raw.peek(1)[:1] if hasattr(raw, "peek") else b""
+    except (OSError, ValueError):
+        raw.close()
+        return
+    with io.TextIOWrapper(raw) as f:
+        if first == b"[":
+            try:
+                yield from json.load(f)
+            except (json.JSONDecodeError, ValueError):
+                pass
+            return
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    pass  # Skip a record torn by a crash mid-write
+
+
+def _register_session(root: Path, entry: Dict[str, Any]) -> None:
+    """Append a manifest line for a newly created session directory."""
+    append_line(root / MANIFEST_NAME, entry)
+
+
+def iter_sessions(root: Optional[Path] = None) -> Iterator[Dict[str, Any]]:
+    """Yield manifest entries for every registered session directory."""
+    yield from iter_records((root or get_log_root()) / MANIFEST_NAME)
+
+
+def iter_segments(session_dir: Path, log_name: str) -> Iterator[Path]:
+    """Yield a log's rotated segments oldest first, then its active file."""
+    session_dir = Path(session_dir)
+    segments = []
+    if session_dir.is_dir():
+        for entry in os.scandir(session_dir):
+            match = SEGMENT_RE.match(entry.name)
+            if match and match.group("name") == log_name:
+                segments.append((int(match.group("stamp")), entry.name))
+    for _, name in sorted(segments):
+        yield session_dir / name
+    yield session_dir / f"{log_name}.jsonl"
+
+
+def iter_log(session_dir: Path, log_name: str) -> Iterator[Dict[str, Any]]:
+    """Stream every record of a session log across compressed and active segments."""
+    for segment in iter_segments(session_dir, log_name):
+        yield from iter_records(segment)
+
+
+def tool_call_key(input_data: Dict[str, Any]) -> str:
+    """
+    Return a key shared by the PreToolUse and PostToolUse events of one call.
+    Uses tool_use_id when the payload carries it, else a hash of the session,
+    tool and tool input (identical calls are then paired in FIFO order).
+    """
+    if input_data.get("tool_use_id"):
+        return str(input_data["tool_use_id"])
+    basis = json.dumps([input_data.get("session_id"), input_data.get("tool_name"),
+                        input_data.get("tool_input")], sort_keys=True, default=str)
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()
+
+
+_command_keys: Dict[Path, bytes] = {}
+
+
+def get_command_key(root: Optional[Path] = None) -> bytes:
+    """Return the log root's command hash key, creating it on first use."""
+    root = root or get_log_root()
+    key = _command_keys.get(root)
+    if key is None:
+        path = root / COMMAND_KEY_NAME
+        try:
+            key = path.read_bytes()
+        except FileNotFoundError:
+            # Publish a complete file with link(), which fails if another
+            # process got there first; theirs is then the key
+            root.mkdir(parents=True, exist_ok=True)
+            tmp = root / f"{COMMAND_KEY_NAME}.{os.getpid()}.tmp"
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(os.urandom(32))
+            try:
+                os.link(tmp, path)
+            except FileExistsError:
+                pass
+            finally:
+                tmp.unlink()
+            key = path.read_bytes()
+        _command_keys[root] = key
+    return key
+
+
+def command_hash(command: str, root: Optional[Path] = None) -> str:
+    """Return the keyed hash under which a Bash command is indexed."""
+    return hmac.new(get_command_key(root), command.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def stamp_record(input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return a copy of a tool hook payload with wall/monotonic times, a call
+    key and, for commands, the hash of the command before any redaction.
+    """
+    record = dict(input_data)
+    record["timestamp"] = datetime.now().astimezone().isoformat()
+    record["monotonic"] = time.monotonic()
+    record["call_key"] = tool_call_key(input_data)
+    tool_input = input_data.get("tool_input")
+    if isinstance(tool_input, dict) and isinstance(tool_input.get("command"), str):
+        try:
+            record["command_hash"] = command_hash(tool_input["command"])
+        except OSError:
+            pass  # An unwritable log root fails the append as well
+    return record
+
+
+def slim_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a stamped read-only tool record to its identifying fields."""
+    slim = {key: record[key] for key in SLIM_KEYS if key in record}
+    tool_input = record.get("tool_input")
+    if isinstance(tool_input, dict):
+        slim["tool_input"] = {key: tool_input[key] for key in SLIM_INPUT_KEYS
+                              if key in tool_input}
+    return slim
+
+
+def append_log(input_data: Dict[str, Any], log_name: str) -> Path:
+    """Append a hook payload to the session's named log and return its path."""
+    log_path = get_log_path(input_data, log_name)
+    append_line(log_path, input_data, max_bytes=MAX_BYTES)
+    maybe_sweep()
+    return log_path
+
+
+def maybe_sweep(root: Optional[Path] = None) -> bool:
+    """
+    Start a detached sweep if the last one is older than SWEEP_INTERVAL.
+    The marker's mtime is claimed with a rename so only one process sweeps.
+    """
+    root = root or get_log_root()
+    marker = root / SWEEP_MARKER
+    try:
+        if time.time() - marker.stat().st_mtime < SWEEP_INTERVAL:
+            return False
+    except FileNotFoundError:
+        pass
+
+    claim = root / f"{SWEEP_MARKER}.{os.getpid()}"
+    try:
+        claim.touch()
+        os.rename(claim, marker)
+    except OSError:
+        return False
+    _sweep_in_background(root)
+    return True
+
+
+def _sweep_in_background(root: Path) -> None:
+    subprocess.Popen([sys.executable, str(Path(__file__).resolve()), "--sweep"],
+                     env=dict(os.environ, **{LOG_ROOT_ENV: str(root)}),
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+def _blob_refs(path: Path) -> set:
+    """Digests of the blobs referenced by one log file or segment."""
+    refs = set()
+    try:
+        with open_segment(path) as f:
+            for line in f:
+                if b"$blob" in line:
+                    refs.update(digest.decode() for digest in BLOB_REF_RE.findall(line))
+    except READ_ERRORS:
+        pass
+    return refs
+
+
+def sweep(root: Optional[Path] = None, max_age: int = MAX_AGE,
+          retention_bytes: int = RETENTION_BYTES) -> Dict[str, int]:
+    """
+    Fold metric deltas, rotate idle active logs and enforce the retention cap.
+
+    Active ``.jsonl`` logs untouched for ``max_age`` seconds are rotated and
+    compressed. If the root then holds more than ``retention_bytes``, blobs
+    no log refers to are deleted, then the oldest rotated segments, each
+    taking along the blobs only it referred to, until the root fits.
+    """
+    root = root or get_log_root()
+    now = time.time()
+    stats = {"rotated": 0, "deleted": 0, "blobs_deleted": 0, "bytes": 0}
+
+    # Fold the metric deltas hooks appended, so that file stays small
+    try:
+        from metrics import fold_deltas  # Imports this module itself
+        fold_deltas(root)
+    except (ImportError, OSError):
+        pass
+    segments = []
+    active = []
+    blobs: Dict[str, Tuple[int, float, Path]] = {}
+
+    for dirpath, _, filenames in os.walk(root):
+        in_blobs = os.path.basename(os.path.dirname(dirpath)) == BLOB_DIR_NAME
+        for name in filenames:
+            path = Path(dirpath) / name
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            stats["bytes"] += st.st_size
+            if in_blobs:
+                if name.endswith(".gz"):
+                    blobs[name[:-len(".gz")]] = (st.st_size, st.st_mtime, path)
+            elif SEGMENT_RE.match(name):
+                if not name.endswith((".gz", ".zst")) and now - st.st_mtime > 60:
+                    path = compress_segment(path)  # Left behind by a crash
+                    if path.exists():
+                        stats["bytes"] += path.stat().st_size - st.st_size
+                        st = path.stat()
+                segments.append((st.st_mtime, st.st_size, path))
+            elif name.endswith(".jsonl") and name != MANIFEST_NAME:
+                if now - st.st_mtime > max_age and st.st_size > 0:
+                    rotated = rotate_log(path)
+                    if rotated is not None and rotated.exists():
+                        size = rotated.stat().st_size
+                        stats["bytes"] += size - st.st_size
+                        segments.append((rotated.stat().st_mtime, size, rotated))
+                        stats["rotated"] += 1
+                        continue
+                active.append(path)
+
+    if stats["bytes"] <= retention_bytes:
+        return stats
+
+    # Mark: count the references every surviving log holds on each blob
+    segment_refs = {path: _blob_refs(path) for _, _, path in segments}
+    counts: Dict[str, int] = {}
+    for refs in list(segment_refs.values()) + [_blob_refs(path) for path in active]:
+        for digest in refs:
+            counts[digest] = counts.get(digest, 0) + 1
+
+    def drop_blob(digest: str) -> None:
+        size, mtime, path = blobs.pop(digest)
+        if now - mtime < BLOB_GRACE_SECONDS:
+            return  # Possibly stored for a line not yet appended
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return
+        stats["bytes"] -= size
+        stats["blobs_deleted"] += 1
+
+    for digest in [d for d in blobs if not counts.get(d)]:
+        drop_blob(digest)
+
+    # Sweep: oldest segments first, with the blobs they alone referenced
+    for _, size, path in sorted(segments):
+        if stats["bytes"] <= retention_bytes:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        stats["bytes"] -= size
+        stats["deleted"] += 1
+        for digest in segment_refs[path]:
+            counts[digest] -= 1
+            if not counts[digest] and digest in blobs:
+                drop_blob(digest)
+    return stats
+
+
+def main():
+    """Command line interface for testing."""
+    if len(sys.argv) > 1 and sys.argv[1] == "--sessions":
+        for entry in iter_sessions():
+            print(json.dumps(entry))
+    elif len(sys.argv) > 1 and sys.argv[1] == "--sweep":
+        print(json.dumps(sweep()))
+    else:
+        print(f"Log root: {get_log_root()}")
+        print("Usage: ./log_store.py --sessions | --sweep")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Hook Metrics
+Self-timing for hooks: phase spans, counters and latency histograms that
+every hook process records for one shared metrics file.
+
+Each hook creates a HookMetrics, times its phases with ``span()`` and
+counts events with ``count()``. At exit, the process appends its deltas as
+one line to ``<log_root>/metrics.deltas`` (a single O_APPEND write, as the
+log store does), so hooks never wait on each other or rewrite shared state.
+``fold_deltas()`` adds the pending lines into ``<log_root>/metrics.json``
+under a lock; the ``metrics`` CLI, the dashboard and the periodic log sweep
+call it. Keys are stored in Prometheus form (``name{label="value"}``, label
+values escaped). If CLAUDE_HOOKS_METRICS_TEXTFILE is set, each fold also
+rewrites that ``.prom`` file for node-exporter's textfile collector.
+"""
+
+import atexit
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from log_store import append_line, get_log_root, iter_records
+
+
+METRICS_NAME = "metrics.json"
+DELTAS_NAME = "metrics.deltas"
+TEXTFILE_ENV = "CLAUDE_HOOKS_METRICS_TEXTFILE"
+
+# Histogram upper bounds in seconds, from sub-millisecond policy checks
+# up to multi-second LLM and TTS calls
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+           0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    "claude_hook_invocations_total": ("counter", "Hook process invocations"),
+    "claude_hook_duration_seconds": ("histogram", "Wall time of a whole hook process after imports"),
+    "claude_hook_phase_duration_seconds": ("histogram", "Wall time of a hook phase"),
+    "claude_hook_blocked_total": ("counter", "Tool calls or prompts blocked, by rule"),
+    "claude_hook_secrets_redacted_total": ("counter", "Secrets redacted from logged tool payloads, by kind"),
+}
+
+
+def _label_value(value: Any) -> str:
+    """Escape a label value as the Prometheus text format requires."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def metric_key(name: str, **labels: str) -> str:
+    """Build a Prometheus-style series key with sorted labels."""
+    if not labels:
+        return name
+    body = ",".join(f'{k}="{_label_value(v)}"' for k, v in sorted(labels.items()))
+    return f"{name}{{{body}}}"
+
+
+def _series_name(key: str) -> str:
+    return key.split("{", 1)[0]
+
+
+class HookMetrics:
+    """Collects one hook process's metrics and records them at exit."""
+
+    def __init__(self, hook: str, root: Optional[Path] = None):
+        self.hook = hook
+        self.root = root
+        self.started = time.perf_counter()
+        self.counters: Dict[str, float] = {}
+        self.observations: Dict[str, list] = {}
+        atexit.register(self.flush)
+
+    def count(self, name: str, value: float = 1, **labels: str) -> None:
+        """Increment a counter series."""
+        key = metric_key(name, hook=self.hook, **labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        """Record one histogram observation."""
+        key = metric_key(name, hook=self.hook, **labels)
+        self.observations.setdefault(key, []).append(seconds)
+
+    @contextmanager
+    def span(self, phase: str) -> Iterator[None]:
+        """Time a block as a hook phase (parse, policy, log_write, llm, tts)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("claude_hook_phase_duration_seconds",
+                         time.perf_counter() - started, phase=phase)
+
+    def flush(self) -> None:
+        """Append this process's deltas for the next fold."""
+        if getattr(self, "_flushed", False):
+            return
+        self._flushed = True
+        self.count("claude_hook_invocations_total")
+        self.observe("claude_hook_duration_seconds", time.perf_counter() - self.started)
+        try:
+            record(self.counters, self.observations, self.root)
+        except OSError:
+            pass  # Metrics must never break a hook
+
+
+def _load(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError, ValueError):
+        return {"counters": {}, "histograms": {}}
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _empty_histogram() -> Dict[str, Any]:
+    return {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0}
+
+
+def _histograms(observations: Dict[str, list]) -> Dict[str, Dict[str, Any]]:
+    """Bucket raw observations, so a delta line stays small."""
+    histograms = {}
+    for key, values in observations.items():
+        hist = histograms[key] = _empty_histogram()
+        for seconds in values:
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    hist["buckets"][i] += 1
+                    break
+            hist["sum"] += seconds
+            hist["count"] += 1
+    return histograms
+
+
+def record(counters: Dict[str, float], observations: Dict[str, list],
+           root: Optional[Path] = None) -> None:
+    """Append one process's counter deltas and histogram observations."""
+    root = root or get_log_root()
+    root.mkdir(parents=True, exist_ok=True)
+    append_line(root / DELTAS_NAME, {"counters": counters,
+                                     "histograms": _histograms(observations)})
+
+
+def _add(data: Dict[str, Any], delta: Dict[str, Any]) -> None:
+    for key, value in (delta.get("counters") or {}).items():
+        data["counters"][key] = data["counters"].get(key, 0) + value
+    for key, hist in (delta.get("histograms") or {}).items():
+        total = data["histograms"].setdefault(key, _empty_histogram())
+        total["buckets"] = [a + b for a, b in zip(total["buckets"], hist["buckets"])]
+        total["sum"] += hist["sum"]
+        total["count"] += hist["count"]
+
+
+def _claim(path: Path) -> Optional[Path]:
+    """Move the deltas file aside so that new appends start a fresh one."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)  # Let an append in progress finish
+        claimed = path.with_name(f"{path.name}.{os.getpid()}.fold")
+        os.rename(path, claimed)
+        return claimed
+    finally:
+        os.close(fd)
+
+
+def fold_deltas(root: Optional[Path] = None) -> Dict[str, Any]:
+    """Add every pending delta line to the shared file and return the totals."""
+    root = root or get_log_root()
+    root.mkdir(parents=True, exist_ok=True)
+    path = root / METRICS_NAME
+    lock_fd = os.open(root / f"{METRICS_NAME}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        # Claimed files left by an interrupted fold come first
+        pending = sorted(root.glob(f"{DELTAS_NAME}.*.fold"))
+        claimed = _claim(root / DELTAS_NAME)
+        if claimed is not None:
+            pending.append(claimed)
+        data = _load(path)
+        if not pending:
+            return data
+
+        for delta_path in pending:
+            for delta in iter_records(delta_path):
+                if isinstance(delta, dict):
+                    _add(data, delta)
+        data["updated"] = time.time()
+        _atomic_write(path, json.dumps(data, separators=(",", ":")))
+
+        textfile = os.getenv(TEXTFILE_ENV, "").strip()
+        if textfile:
+            _atomic_write(Path(textfile).expanduser(), to_prometheus(data))
+        for delta_path in pending:
+            try:
+                delta_path.unlink()
+            except FileNotFoundError:
+                pass
+        return data
+    finally:
+        os.close(lock_fd)
+
+
+def load_metrics(root: Optional[Path] = None) -> Dict[str, Any]:
+    """Fold pending deltas and return the shared totals."""
+    return fold_deltas(root)
+
+
+def _with_label(key: str, label: str) -> str:
+    if "{" in key:
+        return key[:-1] + "," + label + "}"
+    return key + "{" + label + "}"
+
+
+def to_prometheus(data: Dict[str, Any]) -> str:
+    """Render metrics in the Prometheus text exposition format."""
+    lines = []
+    described = set()
+
+    def describe(series: str) -> None:
+        if series in described:
+            return
+        described.add(series)
+        kind, text = HELP.get(series, ("untyped", series))
+        lines.append(f"# HELP {series} {text}")
+        lines.append(f"# TYPE {series} {kind}")
+
+    for key in sorted(data.get("counters", {})):
+        describe(_series_name(key))
+        lines.append(f"{key} {data['counters'][key]}")
+
+    for key in sorted(data.get("histograms", {})):
+        hist = data["histograms"][key]
+        series = _series_name(key)
+        describe(series)
+        labels = key[len(series):]
+        bucket_key = series + "_bucket" + labels
+        cumulative = 0
+        for bound, count in zip(BUCKETS, hist["buckets"]):
+            cumulative += count
+            lines.append("%s %d" % (_with_label(bucket_key, 'le="%s"' % bound), cumulative))
+        lines.append("%s %d" % (_with_label(bucket_key, 'le="+Inf"'), hist["count"]))
+        lines.append(f"{series}_sum{labels} {hist['sum']}")
+        lines.append(f"{series}_count{labels} {hist['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Hook Log Write Stress Check
+Spawns many concurrent post_tool_use.py processes against one session and
+verifies that every record landed intact in the session log. Payloads over
+the blob threshold are stored as blob references, so their contents are
+loaded back from the blob store and compared too.
+
+Usage:
+- ./stress_log_writes.py                 # 200 processes, 16 KB payloads
+- ./stress_log_writes.py 500 65536       # 500 processes, 64 KB payloads
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from blob_store import rehydrate
+from log_store import LOG_ROOT_ENV, get_session_dir, iter_log
+
+
+HOOK_SCRIPT = Path(__file__).parent.parent.parent / "post_tool_use.py"
+
+
+def run(processes: int, payload_size: int) -> bool:
+    """Run the stress check and print a summary. Returns True on success."""
+    with tempfile.TemporaryDirectory() as log_root:
+        env = dict(os.environ, **{LOG_ROOT_ENV: log_root})
+        session = {"session_id": f"stress-{uuid.uuid4()}", "cwd": log_root}
+
+        started = time.perf_counter()
+        procs = []
+        for i in range(processes):
+            payload = dict(session, hook_event_name="PostToolUse", tool_name="Write",
+                           tool_input={"seq": i, "content": "x" * payload_size})
+            proc = subprocess.Popen([sys.executable, str(HOOK_SCRIPT)],
+                                    stdin=subprocess.PIPE, env=env)
+            proc.stdin.write(json.dumps(payload).encode("utf-8"))
+            proc.stdin.close()
+            procs.append(proc)
+        for proc in procs:
+            proc.wait()
+        elapsed = time.perf_counter() - started
+
+        os.environ[LOG_ROOT_ENV] = log_root
+        session_dir = get_session_dir(session)
+        content = "x" * payload_size
+        seen = []
+        for record in iter_log(session_dir, "post_tool_use"):
+            try:
+                tool_input = rehydrate(record.get("tool_input", {}), lazy=False,
+                                       root=Path(log_root))
+            except (OSError, EOFError, UnicodeDecodeError):
+                continue  # Blob missing or torn: counts as lost
+            if tool_input.get("content") == content:
+                seen.append(tool_input["seq"])
+
+    missing = processes - len(set(seen))
+    print(f"Processes:   {processes}")
+    print(f"Payload:     {payload_size} bytes")
+    print(f"Records:     {len(seen)} intact, {missing} missing")
+    print(f"Wall time:   {elapsed:.2f}s ({processes / elapsed:.0f} hooks/s)")
+    return missing == 0 and len(seen) == processes
+
+
+def main():
+    """Command line interface for testing."""
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    payload_size = int(sys.argv[2]) if len(sys.argv) > 2 else 16384
+    ok = run(processes, payload_size)
+    print("✅ No records lost" if ok else "❌ Records were lost or corrupted")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Incremental Transcript Export
+Copies new lines of a session's transcript JSONL into the session log
+directory as ``chat.jsonl``, instead of re-converting the whole transcript
+on every stop.
+
+A small ``chat.state.json`` beside the output remembers the source inode,
+a first-line fingerprint and the byte offset already exported. Each export
+streams only the bytes past that offset. If the source was truncated or
+replaced, the previous output is rotated away and the export restarts.
+Stop and SubagentStop serialize on a lock, so they no longer overwrite
+each other's output.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from log_store import MAX_BYTES, file_fingerprint, rotate_log
+
+
+OUTPUT_NAME = "chat.jsonl"
+STATE_NAME = "chat.state.json"
+
+
+def _load_state(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError, ValueError):
+        return {}
+
+
+def _save_state(path: Path, state: Dict[str, Any]) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def export_transcript(transcript_path: str, session_dir: Path,
+                      max_bytes: int = MAX_BYTES) -> int:
+    """
+    Append transcript lines written since the last export to chat.jsonl.
+    Returns the number of lines exported.
+    """
+    session_dir = Path(session_dir)
+    output = session_dir / OUTPUT_NAME
+    state_path = session_dir / STATE_NAME
+
+    lock_fd = os.open(session_dir / f"{STATE_NAME}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+
+        with open(transcript_path, "rb") as src:
+            st = os.fstat(src.fileno())
+            fingerprint = file_fingerprint(src)
+            state = _load_state(state_path)
+
+            offset = state.get("offset", 0)
+            same_source = (state.get("source") == str(transcript_path)
+                           and state.get("inode") == st.st_ino
+                           and state.get("fingerprint") == fingerprint
+                           and st.st_size >= offset)
+            if not same_source:
+                # Truncated or replaced source: keep the old export as a segment
+                if output.exists() and offset:
+                    rotate_log(output)
+                offset = 0
+
+            src.seek(offset)
+            exported = 0
+            out_fd = os.open(output, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                for line in src:
+                    if not line.endswith(b"\n"):
+                        break  # Partial line still being written
+                    offset += len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        continue  # Skip invalid lines
+                    view = memoryview(line)
+                    while view:
+                        view = view[os.write(out_fd, view):]
+                    exported += 1
+                size = os.fstat(out_fd).st_size
+            finally:
+                os.close(out_fd)
+
+        _save_state(state_path, {
+            "source": str(transcript_path),
+            "inode": st.st_ino,
+            "fingerprint": fingerprint,
+            "offset": offset,
+        })
+        if max_bytes and size >= max_bytes:
+            rotate_log(output)
+        return exported
+    finally:
+        os.close(lock_fd)
+
+
+def main():
+    """Command line interface for testing."""
+    import sys
+
+    if len(sys.argv) == 3:
+        count = export_transcript(sys.argv[1], Path(sys.argv[2]))
+        print(f"Exported {count} new line(s)")
+    else:
+        print("Usage: ./transcript_export.py <transcript.jsonl> <session_dir>")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Transcript Search
+Full-text index over session transcripts using SQLite FTS5.
+
+Transcripts are discovered from the ``transcript_path`` of Stop and
+SubagentStop logs. Each transcript keeps a cursor, so a refresh parses
+only the lines appended since the previous one. Every turn is indexed
+with its message text, the tool names it used and the file paths it
+touched. Searches are ranked with bm25 and return the session_id, turn
+number and byte offset of each hit.
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from log_index import iter_transcripts
+from log_store import get_log_root, iter_complete_lines, resume_offset
+
+
+SEARCH_DB_NAME = "search.sqlite"
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS turns USING fts5(
+    text, tools, files,
+    session_id UNINDEXED, transcript UNINDEXED, turn UNINDEXED,
+    offset UNINDEXED, timestamp UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS transcripts (
+    path TEXT PRIMARY KEY,
+    session_id TEXT,
+    inode INTEGER,
+    fingerprint TEXT,
+    offset INTEGER,
+    turn INTEGER
+);
+"""
+
+# Column weights for bm25(): text, tools, files
+RANK_WEIGHTS = (1.0, 2.0, 3.0)
+FILE_KEYS = ("file_path", "notebook_path", "path")
+
+
+def connect(root: Optional[Path] = None) -> sqlite3.Connection:
+    """Open the search database, creating the schema on first use."""
+    path = (root or get_log_root()) / SEARCH_DB_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    try:
+        conn.executescript(SCHEMA)
+    except sqlite3.OperationalError as e:
+        conn.close()
+        raise RuntimeError(f"SQLite FTS5 is required for transcript search: {e}")
+    return conn
+
+
+def extract_turn(entry: Dict[str, Any]) -> Tuple[str, List[str], List[str]]:
+    """Pull (text, tool names, file paths) out of one transcript entry."""
+    texts, tools, files = [], [], []
+    message = entry.get("message")
+    content = message.get("content") if isinstance(message, dict) else None
+    if content is None:
+        content = entry.get("summary") or entry.get("content")
+
+    blocks = content if isinstance(content, list) else [content]
+    for block in blocks:
+        if isinstance(block, str):
+            texts.append(block)
+        elif isinstance(block, dict):
+            kind = block.get("type")
+            if kind == "text":
+                texts.append(block.get("text", ""))
+            elif kind == "thinking":
+                texts.append(block.get("thinking", ""))
+            elif kind == "tool_use":
+                tools.append(block.get("name", ""))
+                tool_input = block.get("input") or {}
+                if isinstance(tool_input, dict):
+                    for key in FILE_KEYS:
+                        if isinstance(tool_input.get(key), str):
+                            files.append(tool_input[key])
+                    if isinstance(tool_input.get("command"), str):
+                        texts.append(tool_input["command"])
+            elif kind == "tool_result":
+                result = block.get("content")
+                if isinstance(result, str):
+                    texts.append(result)
+                elif isinstance(result, list):
+                    texts.extend(r.get("text", "") for r in result if isinstance(r, dict))
+    return "\n".join(t for t in texts if t), tools, files
+
+
+def _index_transcript(conn, session_id: str, path: str) -> int:
+    """Index the lines appended to one transcript since its last cursor."""
+    row = conn.execute("SELECT inode, fingerprint, offset, turn FROM transcripts WHERE path = ?",
+                       (path,)).fetchone()
+    cursor = dict(zip(("inode", "fingerprint", "offset", "turn"), row)) if row else None
+
+    with open(path, "rb") as f:
+        offset, identity = resume_offset(f, cursor)
+        turn = cursor["turn"] if cursor and offset else 0
+        if cursor and not offset:
+            conn.execute("DELETE FROM turns WHERE transcript = ?", (path,))
+
+        added, rows = 0, []
+        for start, line in iter_complete_lines(f, offset):
+            offset = start + len(line)
+            try:
+                entry = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if not isinstance(entry, dict):
+                continue
+            text, tools, files = extract_turn(entry)
+            if text or tools or files:
+                rows.append((text, " ".join(tools), " ".join(files),
+                             entry.get("sessionId") or session_id, path, turn,
+                             start, entry.get("timestamp")))
+                added += 1
+            turn += 1
+            if len(rows) >= 500:
+                conn.executemany("INSERT INTO turns VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                rows = []
+        if rows:
+            conn.executemany("INSERT INTO turns VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    conn.execute("INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?)",
+                 (path, session_id, identity["inode"], identity["fingerprint"], offset, turn))
+    return added
+
+
+def update_search_index(root: Optional[Path] = None) -> int:
+    """Index new turns of every transcript named in the Stop logs."""
+    conn = connect(root)
+    added = 0
+    try:
+        for session_id, path in iter_transcripts(root):
+            try:
+                with conn:
+                    added += _index_transcript(conn, session_id, path)
+            except FileNotFoundError:
+                continue  # Transcript was removed; keep what is indexed
+    finally:
+        conn.close()
+    return added
+
+
+def _match_expression(text: str) -> str:
+    """Quote each term so paths and punctuation are matched literally."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in text.split())
+
+
+def search(text: str, root: Optional[Path] = None, limit: int = 20,
+           session_id: Optional[str] = None, raw: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Stream ranked matches for a query, best first.
+    With ``raw`` the query is passed through as FTS5 syntax.
+    """
+    sql = ("SELECT session_id, turn, offset, timestamp, tools, files, "
+           "snippet(turns, 0, '[', ']', '...', 12), bm25(turns, ?, ?, ?) AS rank "
+           "FROM turns WHERE turns MATCH ?")
+    params: List[Any] = list(RANK_WEIGHTS) + [text if raw else _match_expression(text)]
+    if session_id:
+        sql += " AND session_id = ?"
+        params.append(session_id)
+    sql += " ORDER BY rank LIMIT ?"
+    params.append(int(limit))
+
+    conn = connect(root)
+    try:
+        columns = ("session_id", "turn", "offset", "timestamp", "tools", "files",
+                   "snippet", "rank")
+        for row in conn.execute(sql, params):
+            yield dict(zip(columns, row))
+    finally:
+        conn.close()
+
+
+def timed_search(text: str, **kwargs) -> Tuple[List[Dict[str, Any]], float]:
+    """Run search() and return (results, elapsed milliseconds)."""
+    started = time.perf_counter()
+    results = list(search(text, **kwargs))
+    return results, (time.perf_counter() - started) * 1000
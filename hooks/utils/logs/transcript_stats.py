@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Transcript Statistics
+Streaming per-session totals computed from transcript JSONL.
+
+Each Stop folds only the transcript lines appended since the previous one
+into a per-session rollup row in ``<log_root>/stats.sqlite``. The row holds
+turns, tool calls by name, token usage and the gaps between turns. Memory
+stays constant: the running totals and the last message id and timestamp
+are all that is kept between lines.
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from log_index import iter_transcripts
+from log_store import get_log_root, iter_complete_lines, project_slug, resume_offset
+
+
+STATS_DB_NAME = "stats.sqlite"
+
+# Gaps longer than this count as idle time rather than active work
+IDLE_GAP_SECONDS = 300
+
+USAGE_KEYS = ("input_tokens", "output_tokens",
+              "cache_creation_input_tokens", "cache_read_input_tokens")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_stats (
+    session_id TEXT PRIMARY KEY,
+    project TEXT,
+    transcript TEXT,
+    inode INTEGER,
+    fingerprint TEXT,
+    offset INTEGER,
+    turns INTEGER,
+    user_turns INTEGER,
+    assistant_turns INTEGER,
+    tool_calls INTEGER,
+    tools TEXT,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    cache_creation_input_tokens INTEGER,
+    cache_read_input_tokens INTEGER,
+    first_ts REAL,
+    last_ts REAL,
+    active_seconds REAL,
+    idle_seconds REAL,
+    max_gap_seconds REAL,
+    last_message_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_session_stats_project ON session_stats(project);
+"""
+
+COUNTERS = ("turns", "user_turns", "assistant_turns", "tool_calls",
+            "input_tokens", "output_tokens", "cache_creation_input_tokens",
+            "cache_read_input_tokens", "active_seconds", "idle_seconds",
+            "max_gap_seconds")
+
+
+def connect(root: Optional[Path] = None) -> sqlite3.Connection:
+    """Open the stats database, creating the schema on first use."""
+    path = (root or get_log_root()) / STATS_DB_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _epoch(value: Any) -> Optional[float]:
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _empty_stats() -> Dict[str, Any]:
+    stats = {key: 0 for key in COUNTERS}
+    stats.update(tools={}, first_ts=None, last_ts=None, last_message_id=None)
+    return stats
+
+
+def fold_entry(stats: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    """Fold one transcript entry into running session totals."""
+    kind = entry.get("type")
+    if kind not in ("user", "assistant"):
+        return
+    message = entry.get("message") if isinstance(entry.get("message"), dict) else {}
+
+    # Streamed assistant messages repeat the same id and usage on
+    # consecutive lines; count each message once.
+    message_id = message.get("id")
+    repeat = message_id is not None and message_id == stats["last_message_id"]
+    stats["last_message_id"] = message_id
+
+    ts = _epoch(entry.get("timestamp"))
+    if ts is not None:
+        if stats["last_ts"] is not None and ts >= stats["last_ts"]:
+            gap = ts - stats["last_ts"]
+            stats["idle_seconds" if gap > IDLE_GAP_SECONDS else "active_seconds"] += gap
+            stats["max_gap_seconds"] = max(stats["max_gap_seconds"], gap)
+        if stats["first_ts"] is None:
+            stats["first_ts"] = ts
+        stats["last_ts"] = max(ts, stats["last_ts"] or ts)
+
+    content = message.get("content")
+    if isinstance(content, list):
+        for block in content:
+            if isinstance(block, dict) and block.get("type") == "tool_use":
+                name = block.get("name", "unknown")
+                stats["tools"][name] = stats["tools"].get(name, 0) + 1
+                stats["tool_calls"] += 1
+
+    if repeat:
+        return
+    stats["turns"] += 1
+    stats["user_turns" if kind == "user" else "assistant_turns"] += 1
+    usage = message.get("usage")
+    if isinstance(usage, dict):
+        for key in USAGE_KEYS:
+            value = usage.get(key)
+            if isinstance(value, int):
+                stats[key] += value
+
+
+def update_session_stats(session_id: str, transcript_path: str,
+                         cwd: Optional[str] = None, root: Optional[Path] = None) -> Dict[str, Any]:
+    """Fold the transcript lines appended since the last update into the rollup."""
+    conn = connect(root)
+    try:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")  # Serialize concurrent Stop hooks
+            row = conn.execute("SELECT * FROM session_stats WHERE session_id = ?",
+                               (session_id,)).fetchone()
+            with open(transcript_path, "rb") as f:
+                offset, identity = resume_offset(f, dict(row) if row else None)
+                if row and offset:
+                    stats = {key: row[key] for key in COUNTERS}
+                    stats.update(tools=json.loads(row["tools"] or "{}"),
+                                 first_ts=row["first_ts"], last_ts=row["last_ts"],
+                                 last_message_id=row["last_message_id"])
+                else:
+                    stats = _empty_stats()  # New or replaced transcript
+
+                for start, line in iter_complete_lines(f, offset):
+                    offset = start + len(line)
+                    try:
+                        entry = json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        continue
+                    if isinstance(entry, dict):
+                        fold_entry(stats, entry)
+
+            project = row["project"] if row and row["project"] else (
+                project_slug(cwd) if cwd else "")
+            values = dict(stats, session_id=session_id, project=project,
+                          transcript=str(transcript_path), offset=offset,
+                          tools=json.dumps(stats["tools"]), **identity)
+            columns = ", ".join(values)
+            placeholders = ", ".join(f":{key}" for key in values)
+            conn.execute(f"INSERT OR REPLACE INTO session_stats ({columns}) "
+                         f"VALUES ({placeholders})", values)
+            return values
+    finally:
+        conn.close()
+
+
+def refresh_all(root: Optional[Path] = None) -> int:
+    """Bring every session named in the Stop logs up to date."""
+    updated = 0
+    for session_id, path in iter_transcripts(root):
+        try:
+            update_session_stats(session_id, path, root=root)
+            updated += 1
+        except FileNotFoundError:
+            continue
+    return updated
+
+
+SORT_COLUMNS = {
+    "tokens": "(input_tokens + output_tokens + cache_creation_input_tokens)",
+    "output": "output_tokens",
+    "time": "active_seconds",
+    "tools": "tool_calls",
+    "turns": "turns",
+    "recent": "last_ts",
+}
+
+
+def report(root: Optional[Path] = None, sort: str = "tokens", by_project: bool = False,
+           limit: int = 20) -> Iterator[Dict[str, Any]]:
+    """Stream sessions (or projects) ordered by the chosen cost measure."""
+    order = SORT_COLUMNS[sort]
+    if by_project:
+        sums = ", ".join(f"SUM({c}) AS {c}" for c in COUNTERS if c != "max_gap_seconds")
+        sql = (f"SELECT project, COUNT(*) AS sessions, {sums}, MAX(max_gap_seconds) AS "
+               f"max_gap_seconds, MAX(last_ts) AS last_ts FROM session_stats "
+               f"GROUP BY project ORDER BY {order} DESC LIMIT ?")
+    else:
+        sql = f"SELECT * FROM session_stats ORDER BY {order} DESC LIMIT ?"
+
+    conn = connect(root)
+    try:
+        for row in conn.execute(sql, (int(limit),)):
+            yield dict(row)
+    finally:
+        conn.close()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Prompt Filter
+Multi-pattern prompt rules compiled into an Aho-Corasick automaton for
+literals plus one combined regex for everything else.
+
+Rules live in ``prompt_rules.txt`` next to the hooks (override with
+CLAUDE_HOOKS_PROMPT_RULES), one per line:
+
+    rm -rf /                  => Dangerous command detected
+    re:\\bdrop\\s+table\\b      => Destructive SQL requested
+
+The reason follows the last " => " on the line, so a regex may itself
+contain "=>". Literals and regexes are both matched case-insensitively. The
+compiled automaton is cached beside the rules file, keyed by the file's
+content hash, so a hook only pays for parsing when the rules change. A
+prompt is scanned once by the automaton and once by the combined regex, and
+the match that starts earliest is reported with the rule's line number.
+Regexes with numbered backreferences are matched on their own, since the
+combined regex renumbers their groups.
+"""
+
+import hashlib
+import marshal
+import os
+import re
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+RULES_ENV = "CLAUDE_HOOKS_PROMPT_RULES"
+DEFAULT_RULES_PATH = Path(__file__).parent.parent.parent / "prompt_rules.txt"
+CACHE_VERSION = 3
+REGEX_PREFIX = "re:"
+REASON_SEPARATOR = " => "
+# \1 or (?(1)...) refer to groups by number, which the combined regex shifts
+NUMBERED_GROUP_REF = re.compile(r"\\[1-9]|\(\?\(\d")
+
+
+class Rule(NamedTuple):
+    line: int
+    kind: str  # "literal" or "regex"
+    pattern: str
+    reason: str
+
+
+class Match(NamedTuple):
+    rule: Rule
+    start: int
+    end: int
+
+
+def get_rules_path() -> Path:
+    """Return the prompt rules file, honoring CLAUDE_HOOKS_PROMPT_RULES."""
+    override = os.getenv(RULES_ENV, "").strip()
+    return Path(override).expanduser() if override else DEFAULT_RULES_PATH
+
+
+def parse_rules(text: str) -> List[Rule]:
+    """Parse rule lines; blank lines, comments and invalid regexes are skipped."""
+    rules = []
+    for number, raw in enumerate(text.splitlines(), 1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        pattern, separator, reason = (line + " ").rpartition(REASON_SEPARATOR)
+        if not separator:
+            pattern, reason = line, ""
+        pattern, reason = pattern.strip(), reason.strip() or "Blocked by prompt rule"
+        if pattern.startswith(REGEX_PREFIX):
+            pattern = pattern[len(REGEX_PREFIX):].strip()
+            try:
+                re.compile(pattern)
+            except re.error:
+                continue
+            if pattern:
+                rules.append(Rule(number, "regex", pattern, reason))
+        elif pattern:
+            rules.append(Rule(number, "literal", pattern, reason))
+    return rules
+
+
+def _edge(state: int, ch: str) -> int:
+    return (state << 21) | ord(ch)  # Code points fit in 21 bits
+
+
+def build_automaton(literals: List[str]) -> Tuple[Dict[int, int], List[int], Dict[int, List[int]]]:
+    """
+    Build an Aho-Corasick automaton over lowercased literals.
+    Returns (delta, fail, out): delta maps _edge(state, ch) to the next
+    state, and out[state] lists every literal index that ends at that
+    state, fail-chain outputs included. The flat int-keyed tables keep the
+    on-disk cache quick to load.
+    """
+    goto: List[Dict[str, int]] = [{}]
+    out: List[List[int]] = [[]]
+    for index, literal in enumerate(literals):
+        state = 0
+        for ch in literal.lower():
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                nxt = len(goto)
+                goto[state][ch] = nxt
+                goto.append({})
+                out.append([])
+            state = nxt
+        out[state].append(index)
+
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for ch, nxt in goto[state].items():
+            queue.append(nxt)
+            f = fail[state]
+            while f and ch not in goto[f]:
+                f = fail[f]
+            fail[nxt] = goto[f].get(ch, 0) if goto[f].get(ch, 0) != nxt else 0
+            out[nxt] = out[nxt] + out[fail[nxt]]
+
+    delta = {_edge(state, ch): nxt for state, edges in enumerate(goto)
+             for ch, nxt in edges.items()}
+    return delta, fail, {state: hits for state, hits in enumerate(out) if hits}
+
+
+class PromptFilter:
+    """Compiled rule set: one automaton for literals, one regex for the rest."""
+
+    def __init__(self, rules: List[Rule], automaton=None):
+        self.rules = rules
+        self.literals = [r for r in rules if r.kind == "literal"]
+        self.lengths = [len(r.pattern.lower()) for r in self.literals]
+        self.longest = max(self.lengths, default=0)
+        regexes = [r for r in rules if r.kind == "regex"]
+        self.delta, self.fail, self.out = automaton or build_automaton(
+            [r.pattern for r in self.literals])
+
+        combinable = [r for r in regexes if not NUMBERED_GROUP_REF.search(r.pattern)]
+        separate = [r for r in regexes if NUMBERED_GROUP_REF.search(r.pattern)]
+        self.regex_rules = {f"r{i}": rule for i, rule in enumerate(combinable)}
+        self.regex = None
+        if combinable:
+            combined = "|".join(f"(?P<r{i}>{rule.pattern})" for i, rule in enumerate(combinable))
+            try:
+                self.regex = re.compile(combined, re.IGNORECASE)
+            except re.error:
+                # Patterns that only fail together (e.g. duplicate group
+                # names) are matched one by one instead
+                separate = regexes
+        self.regex_list = [(rule, re.compile(rule.pattern, re.IGNORECASE))
+                           for rule in separate]
+
+    def _scan_literals(self, text: str) -> Optional[Match]:
+        delta, fail, out, lengths = self.delta, self.fail, self.out, self.lengths
+        lowered = text.lower()
+        # Lowercasing can lengthen a character (U+0130 becomes two), so map
+        # positions in the lowered text back to the original when it does
+        origin = None
+        if len(lowered) != len(text):
+            origin = [i for i, ch in enumerate(text) for _ in ch.lower()]
+            origin.append(len(text))
+
+        found = None
+        state = 0
+        for pos, ch in enumerate(lowered):
+            # Nothing ending here or later can start before the best match
+            if found is not None and pos + 1 - self.longest > found[0]:
+                break
+            code = ord(ch)
+            nxt = delta.get((state << 21) | code)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = delta.get((state << 21) | code)
+            state = nxt or 0
+            if state in out:
+                for i in out[state]:
+                    hit = (pos + 1 - lengths[i], self.literals[i].line, i, pos + 1)
+                    if found is None or hit < found:
+                        found = hit
+        if found is None:
+            return None
+        start, _, i, end = found
+        if origin is not None:
+            start, end = origin[start], origin[end - 1] + 1
+        return Match(self.literals[i], start, end)
+
+    def _scan_regex(self, text: str) -> Optional[Match]:
+        found = None
+        if self.regex is not None:
+            m = self.regex.search(text)
+            if m:
+                found = Match(self.regex_rules[m.lastgroup], m.start(), m.end())
+        for rule, pattern in self.regex_list:
+            m = pattern.search(text)
+            if m and (found is None or (m.start(), rule.line) < (found.start, found.rule.line)):
+                found = Match(rule, m.start(), m.end())
+        return found
+
+    def match(self, text: str) -> Optional[Match]:
+        """Return the rule match that starts earliest in the text, or None."""
+        hits = [m for m in (self._scan_literals(text), self._scan_regex(text)) if m]
+        return min(hits, key=lambda m: (m.start, m.rule.line)) if hits else None
+
+
+def _cache_path(rules_path: Path) -> Path:
+    return rules_path.with_name(f".{rules_path.name}.cache")
+
+
+def load_filter(rules_path: Optional[Path] = None) -> PromptFilter:
+    """Load the rules, reusing the on-disk compiled automaton when current."""
+    rules_path = rules_path or get_rules_path()
+    try:
+        data = rules_path.read_bytes()
+    except FileNotFoundError:
+        return PromptFilter([])
+    digest = hashlib.sha1(data).hexdigest()
+    cache = _cache_path(rules_path)
+
+    try:
+        # loads() on the whole file; load() on a file object reads piecemeal
+        version, cached_digest, rules, automaton = marshal.loads(cache.read_bytes())
+        if version == CACHE_VERSION and cached_digest == digest:
+            return PromptFilter([Rule(*r) for r in rules], automaton)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    prompt_filter = PromptFilter(parse_rules(data.decode("utf-8", errors="replace")))
+    payload = (CACHE_VERSION, digest, [tuple(r) for r in prompt_filter.rules],
+               (prompt_filter.delta, prompt_filter.fail, prompt_filter.out))
+    tmp = cache.with_name(f"{cache.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(marshal.dumps(payload))
+        os.replace(tmp, cache)
+    except OSError:
+        pass  # A read-only hooks dir just means no cache
+    return prompt_filter
+
+
+def main():
+    """Command line interface for testing."""
+    import sys
+    import time
+
+    if len(sys.argv) < 2:
+        print(f"Rules file: {get_rules_path()}")
+        print("Usage: ./prompt_filter.py <prompt text>")
+        return
+    started = time.perf_counter()
+    prompt_filter = load_filter()
+    loaded = time.perf_counter()
+    found = prompt_filter.match(" ".join(sys.argv[1:]))
+    done = time.perf_counter()
+    print(f"{len(prompt_filter.rules)} rule(s), load {(loaded - started) * 1000:.2f} ms, "
+          f"match {(done - loaded) * 1000:.3f} ms")
+    if found:
+        rule = found.rule
+        print(f"Matched line {rule.line} ({rule.kind}) {rule.pattern!r}: {rule.reason}")
+    else:
+        print("No match")
+
+
+if __name__ == "__main__":
+    main()
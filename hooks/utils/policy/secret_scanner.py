@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Secret Scanner
+Redacts credentials from tool payloads before they are logged.
+
+Known key formats are combined into one compiled regex. A second pass
+flags long random-looking tokens by Shannon entropy. Strings are scanned
+in fixed-size windows that overlap by more than the longest possible
+match, so cost stays linear in the output size and no secret straddling
+a window edge is missed. The combined regex only runs on windows that
+contain one of the formats' literal prefixes; plain build or test output
+costs a few substring searches per window. Text past CLAUDE_HOOKS_SECRET_SCAN_MAX characters
+is not scanned; it is withheld instead of being logged unchecked.
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+
+CHUNK_CHARS = 64 * 1024
+MAX_MATCH_CHARS = 4096  # Longest possible match; windows overlap by this much
+MAX_SCAN_CHARS = int(os.getenv("CLAUDE_HOOKS_SECRET_SCAN_MAX", str(4 * 1024 * 1024)))
+
+# Entropy heuristic: tokens of 32-256 characters mixing upper case, lower
+# case and digits with at least this many bits of entropy per character.
+# A run of lower-case letters this long marks an identifier made of words.
+ENTROPY_MIN_LENGTH = 32
+ENTROPY_MAX_LENGTH = 256
+ENTROPY_THRESHOLD = 4.4
+WORD_RUN_RE = re.compile(r"[a-z]{8}")
+
+KNOWN_FORMATS = (
+    ("private_key", r"-----BEGIN[A-Z ]{0,40} PRIVATE KEY-----[\s\S]{0,3900}?-----END[A-Z ]{0,40} PRIVATE KEY-----"),
+    ("aws_access_key", r"\b(?:AKIA|ASIA)[0-9A-Z]{16}\b"),
+    ("github_token", r"\b(?:gh[pousr]_[A-Za-z0-9]{36,255}|github_pat_[A-Za-z0-9_]{22,255})\b"),
+    ("anthropic_key", r"\bsk-ant-[A-Za-z0-9_-]{20,255}"),
+    ("openai_key", r"\bsk-(?:proj-|svcacct-)?[A-Za-z0-9_-]{20,255}"),
+    ("elevenlabs_key", r"\bsk_[a-f0-9]{48}\b"),
+    ("slack_token", r"\bxox[abposr]-[A-Za-z0-9-]{10,255}"),
+    ("google_api_key", r"\bAIza[0-9A-Za-z_-]{35}\b"),
+    ("stripe_key", r"\b[rs]k_(?:live|test)_[0-9A-Za-z]{24,255}\b"),
+    ("jwt", r"\beyJ[A-Za-z0-9_-]{8,1000}\.eyJ[A-Za-z0-9_-]{8,2000}\.[A-Za-z0-9_-]{8,1000}"),
+    ("url_credentials", r"(?<=://)[^\s:/@]{1,128}:[^\s:/@]{1,256}(?=@)"),
+)
+
+# key = value style assignments; only the value is redacted
+ASSIGNMENT = (r"(?i:(?:api[_-]?key|secret[_-]?key|access[_-]?token|auth[_-]?token|password|passwd)"
+              r"[\"']?\s{0,8}[:=]\s{0,8}[\"']?)(?P<assignment>[^\s\"']{8,256})")
+
+# Literal prefixes of the formats above; a window without any is skipped
+TRIGGERS = ("-----BEGIN", "AKIA", "ASIA", "ghp_", "gho_", "ghu_", "ghs_", "ghr_",
+            "github_pat_", "sk-", "sk_", "rk_", "xox", "AIza", "eyJ", "://")
+LOWER_TRIGGERS = ("key", "token", "passw")
+
+SECRET_RE = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in KNOWN_FORMATS)
+                       + "|" + ASSIGNMENT)
+TOKEN_RE = re.compile(r"(?<![A-Za-z0-9_-])[A-Za-z0-9_-]{%d,}" % ENTROPY_MIN_LENGTH)
+
+
+def shannon_entropy(token: str) -> float:
+    """Bits of entropy per character."""
+    length = len(token)
+    return -sum(n / length * math.log2(n / length) for n in Counter(token).values())
+
+
+def looks_random(token: str) -> bool:
+    """Entropy heuristic for tokens that match no known format."""
+    if not ENTROPY_MIN_LENGTH <= len(token) <= ENTROPY_MAX_LENGTH:
+        return False
+    if not (any(c.isupper() for c in token) and any(c.islower() for c in token)
+            and any(c.isdigit() for c in token)):
+        return False  # Hex digests, words and identifiers in one case
+    if WORD_RUN_RE.search(token):
+        return False  # camelCase or snake_case identifiers
+    return shannon_entropy(token) >= ENTROPY_THRESHOLD
+
+
+def find_secrets(text: str) -> List[Tuple[int, int, str]]:
+    """Return sorted, non-overlapping (start, end, kind) spans in the text."""
+    spans: List[Tuple[int, int, str]] = []
+    covered = 0
+    for window in range(0, len(text), CHUNK_CHARS):
+        limit = min(len(text), window + CHUNK_CHARS + MAX_MATCH_CHARS)
+        found = []
+        chunk = text[window:limit]
+        lowered = chunk.lower()
+        if (any(t in chunk for t in TRIGGERS) or any(t in lowered for t in LOWER_TRIGGERS)):
+            for m in SECRET_RE.finditer(text, window, limit):
+                if m.start() >= window + CHUNK_CHARS:
+                    break  # Belongs to the next window
+                kind = m.lastgroup
+                start, end = m.span(kind)
+                found.append((start, end, kind))
+        for m in TOKEN_RE.finditer(text, window, limit):
+            if m.start() >= window + CHUNK_CHARS:
+                break
+            if looks_random(m.group()):
+                found.append((m.start(), m.end(), "high_entropy"))
+        for start, end, kind in sorted(found):
+            if start >= covered:
+                spans.append((start, end, kind))
+                covered = end
+    return spans
+
+
+def redact_text(text: str, counts: Dict[str, int]) -> str:
+    """Redact secrets in one string, tallying redactions by kind."""
+    tail = ""
+    if len(text) > MAX_SCAN_CHARS:
+        tail = f"[UNSCANNED:{len(text) - MAX_SCAN_CHARS} chars withheld]"
+        text = text[:MAX_SCAN_CHARS]
+    spans = find_secrets(text)
+    if not spans:
+        return text + tail
+    parts, last = [], 0
+    for start, end, kind in spans:
+        parts.append(text[last:start])
+        parts.append(f"[REDACTED:{kind}]")
+        counts[kind] = counts.get(kind, 0) + 1
+        last = end
+    parts.append(text[last:])
+    return "".join(parts) + tail
+
+
+def redact(value: Any, counts: Dict[str, int]) -> Any:
+    """Return a copy of a JSON value with secrets redacted from every string."""
+    if isinstance(value, str):
+        return redact_text(value, counts)
+    if isinstance(value, dict):
+        return {k: redact(v, counts) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(v, counts) for v in value]
+    return value
+
+
+def redact_payload(input_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """Redact the tool_input and tool_response fields of a hook payload."""
+    record = dict(input_data)
+    counts: Dict[str, int] = {}
+    for key in ("tool_input", "tool_response"):
+        if key in record:
+            record[key] = redact(record[key], counts)
+    return record, counts
+
+
+def main():
+    """Command line interface for testing."""
+    import sys
+    import time
+
+    text = sys.stdin.read()
+    counts: Dict[str, int] = {}
+    started = time.perf_counter()
+    redacted = redact_text(text, counts)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(redacted)
+    print(f"{len(text)} chars scanned in {elapsed:.1f} ms, redacted {counts or 'nothing'}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
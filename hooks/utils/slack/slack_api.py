@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Slack API Client
+Minimal Web API client used to refresh the Slack caches.
+
+Stdlib only. Calls go to CLAUDE_HOOKS_SLACK_API_URL (default
+https://slack.com/api), so a refresh can be pointed at a local fake server.
+The token comes from SLACK_BOT_TOKEN or SLACK_MCP_XOXP_TOKEN, the variable
+the tool that writes the caches already uses. List methods follow cursor
+pagination. A rate-limited (429) call is retried after its Retry-After delay.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, Optional
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+
+API_URL_ENV = "CLAUDE_HOOKS_SLACK_API_URL"
+DEFAULT_API_URL = "https://slack.com/api"
+TOKEN_ENVS = ("SLACK_BOT_TOKEN", "SLACK_MCP_XOXP_TOKEN")
+
+PAGE_SIZE = 200  # Largest page Slack recommends for list methods
+TIMEOUT = 30
+MAX_RETRIES = 5
+MAX_RETRY_AFTER = 60
+
+
+class SlackAPIError(Exception):
+    """A Slack Web API call failed."""
+
+    def __init__(self, method: str, error: str):
+        super().__init__(f"{method}: {error}")
+        self.error = error
+
+
+def get_token() -> str:
+    """Return the configured Slack token, or an empty string."""
+    for name in TOKEN_ENVS:
+        token = os.getenv(name, "").strip()
+        if token:
+            return token
+    return ""
+
+
+def get_api_url() -> str:
+    """Return the Web API base URL."""
+    return (os.getenv(API_URL_ENV, "").strip() or DEFAULT_API_URL).rstrip("/")
+
+
+class SlackClient:
+    """Calls Slack Web API methods with a bearer token."""
+
+    def __init__(self, token: Optional[str] = None, api_url: Optional[str] = None):
+        self.token = token or get_token()
+        self.api_url = api_url or get_api_url()
+        if not self.token:
+            raise SlackAPIError("auth", "no token in " + " or ".join(TOKEN_ENVS))
+
+    def call(self, method: str, **params: Any) -> Dict[str, Any]:
+        """Call one method and return its decoded response."""
+        request = Request(f"{self.api_url}/{method}",
+                          data=urlencode(params).encode("utf-8"),
+                          headers={"Authorization": f"Bearer {self.token}",
+                                   "Content-Type": "application/x-www-form-urlencoded"})
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                with urlopen(request, timeout=TIMEOUT) as response:
+                    body = json.loads(response.read())
+            except HTTPError as e:
+                if e.code == 429 and attempt < MAX_RETRIES:
+                    try:
+                        delay = float(e.headers.get("Retry-After") or 1)
+                    except ValueError:
+                        delay = 1.0
+                    time.sleep(min(max(delay, 0.0), MAX_RETRY_AFTER))
+                    continue
+                raise SlackAPIError(method, f"HTTP {e.code}") from e
+            except (URLError, OSError, ValueError) as e:
+                raise SlackAPIError(method, str(e)) from e
+            if not isinstance(body, dict) or not body.get("ok"):
+                error = body.get("error") if isinstance(body, dict) else None
+                raise SlackAPIError(method, error or "unexpected_response")
+            return body
+        raise SlackAPIError(method, "ratelimited")
+
+    def paginate(self, method: str, key: str, **params: Any) -> Iterator[Dict[str, Any]]:
+        """Yield every item of a cursor-paginated list method."""
+        cursor = ""
+        while True:
+            page = dict(params, limit=PAGE_SIZE)
+            if cursor:
+                page["cursor"] = cursor
+            body = self.call(method, **page)
+            yield from body.get(key) or []
+            cursor = (body.get("response_metadata") or {}).get("next_cursor") or ""
+            if not cursor:
+                return
+
+    def list_users(self) -> Iterator[Dict[str, Any]]:
+        return self.paginate("users.list", "members")
+
+    def list_conversations(self) -> Iterator[Dict[str, Any]]:
+        return self.paginate("conversations.list", "channels", exclude_archived="true",
+                             types="public_channel,private_channel,mpim,im")
+
+    def user_info(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return one user, or None if it no longer exists."""
+        try:
+            return self.call("users.info", user=user_id).get("user")
+        except SlackAPIError as e:
+            if e.error == "user_not_found":
+                return None
+            raise
+
+    def conversation_info(self, channel_id: str) -> Optional[Dict[str, Any]]:
+        """Return one conversation, or None if it was archived or deleted."""
+        try:
+            channel = self.call("conversations.info", channel=channel_id).get("channel")
+        except SlackAPIError as e:
+            if e.error == "channel_not_found":
+                return None
+            raise
+        return None if not channel or channel.get("is_archived") else channel
+
+
+def main():
+    """Command line interface for testing."""
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: ./slack_api.py <method> [key=value ...]")
+        return
+    params = dict(arg.split("=", 1) for arg in sys.argv[2:] if "=" in arg)
+    try:
+        print(json.dumps(SlackClient().call(sys.argv[1], **params), indent=2))
+    except SlackAPIError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
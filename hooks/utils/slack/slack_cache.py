@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+"""
+Slack Cache Index
+Indexed lookups over the Slack user and channel caches.
+
+The caches (``.users_cache.json`` and ``.channels_cache_v2.json`` in
+hooks/utils/tts, or CLAUDE_HOOKS_SLACK_CACHE_DIR) hold full Slack records
+as flat JSON arrays. They are projected into ``.slack_index.sqlite`` beside
+them: one compact row per user or channel, and a names table keyed by the
+normalized name, display name and real name. Its primary-key B-tree serves
+exact lookups and prefix ranges, so no lookup reads the JSON. The index is
+opened on first use. A cache file is re-read only when its size or mtime
+changes, and only records whose projection changed are rewritten.
+
+Every record carries the time it was last fetched. A lookup that returns a
+record older than CLAUDE_HOOKS_SLACK_TTL seconds, or that runs while the
+whole listing is that old, still answers from the index at once but starts
+a detached ``fetch`` (stale-while-revalidate). The fetch asks the Slack API
+for just the stale records, or for the full listing, under a non-blocking
+lock, then delta-merges the answer: the JSON cache is rewritten through a
+temp file and rename only if a record changed, and only changed rows are
+rewritten in the index. Readers never wait on it; the index is in WAL mode.
+Fetching needs a token (see slack_api.py); without one nothing is started.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from slack_api import SlackClient, get_token
+
+
+CACHE_DIR_ENV = "CLAUDE_HOOKS_SLACK_CACHE_DIR"
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "tts"
+INDEX_NAME = ".slack_index.sqlite"
+LOCK_NAME = INDEX_NAME + ".lock"
+
+TTL = int(os.getenv("CLAUDE_HOOKS_SLACK_TTL", str(24 * 3600)))
+MAX_TARGETED = 50  # More stale records than this refetch the whole listing
+
+SOURCES = {
+    "user": ".users_cache.json",
+    "channel": ".channels_cache_v2.json",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (kind, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS names (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    id TEXT NOT NULL,
+    PRIMARY KEY (kind, key, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER
+);
+CREATE TABLE IF NOT EXISTS listings (
+    kind TEXT PRIMARY KEY,
+    fetched_at REAL
+);
+"""
+
+# Columns added to records after the first release, for existing indexes
+MIGRATIONS = (("fetched_at", "REAL"),)
+
+
+def get_cache_dir() -> Path:
+    """Return the directory holding the Slack caches."""
+    override = os.getenv(CACHE_DIR_ENV, "").strip()
+    return Path(override).expanduser() if override else DEFAULT_CACHE_DIR
+
+
+def normalize(name: str) -> str:
+    """Lower-case, accent-free form of a name, without a leading # or @."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().lstrip("#@").split())
+
+
+def project_user(user: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of a users.list member worth keeping."""
+    profile = user.get("profile") or {}
+    return {
+        "id": user.get("id"),
+        "name": user.get("name") or "",
+        "real_name": user.get("real_name") or profile.get("real_name") or "",
+        "display_name": profile.get("display_name") or "",
+        "deleted": bool(user.get("deleted")),
+        "is_bot": bool(user.get("is_bot")),
+        "tz": user.get("tz") or "",
+        "updated": user.get("updated") or 0,
+    }
+
+
+def project_channel(channel: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of a cached channel worth keeping."""
+    return {
+        "id": channel.get("id"),
+        "name": channel.get("name") or "",
+        "topic": channel.get("topic") or "",
+        "purpose": channel.get("purpose") or "",
+        "member_count": channel.get("memberCount") or 0,
+        "private": bool(channel.get("private")),
+        "im": bool(channel.get("im")),
+        "mpim": bool(channel.get("mpim")),
+    }
+
+
+PROJECTIONS = {"user": project_user, "channel": project_channel}
+NAME_FIELDS = {"user": ("name", "display_name", "real_name"), "channel": ("name",)}
+
+
+def name_keys(kind: str, record: Dict[str, Any]) -> List[str]:
+    """Normalized names a record can be looked up by."""
+    keys = []
+    for field in NAME_FIELDS[kind]:
+        key = normalize(record.get(field) or "")
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def connect(cache_dir: Optional[Path] = None) -> sqlite3.Connection:
+    """Open the index, creating or migrating the schema on first use."""
+    path = (cache_dir or get_cache_dir()) / INDEX_NAME
+    conn = sqlite3.connect(str(path), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(records)")}
+    for column, kind in MIGRATIONS:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE records ADD COLUMN {column} {kind}")
+    return conn
+
+
+def _digest(record: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(record, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def write_records(conn: sqlite3.Connection, kind: str,
+                  rows: Iterable[Tuple[Dict[str, Any], str]], fetched_at: float) -> None:
+    """Upsert projected records and their name keys (caller commits)."""
+    for record, digest in rows:
+        conn.execute("INSERT OR REPLACE INTO records (kind, id, data, digest, fetched_at) "
+                     "VALUES (?, ?, ?, ?, ?)",
+                     (kind, record["id"], json.dumps(record, separators=(",", ":")), digest,
+                      fetched_at))
+        conn.execute("DELETE FROM names WHERE kind = ? AND id = ?", (kind, record["id"]))
+        conn.executemany("INSERT OR IGNORE INTO names (kind, key, id) VALUES (?, ?, ?)",
+                         [(kind, key, record["id"]) for key in name_keys(kind, record)])
+
+
+def delete_records(conn: sqlite3.Connection, kind: str, ids: Iterable[str]) -> None:
+    """Drop records and their name keys (caller commits)."""
+    for record_id in ids:
+        conn.execute("DELETE FROM records WHERE kind = ? AND id = ?", (kind, record_id))
+        conn.execute("DELETE FROM names WHERE kind = ? AND id = ?", (kind, record_id))
+
+
+def _register_source(conn: sqlite3.Connection, path: Path, st: os.stat_result) -> None:
+    conn.execute("INSERT OR REPLACE INTO sources (path, mtime_ns, size) VALUES (?, ?, ?)",
+                 (str(path), st.st_mtime_ns, st.st_size))
+
+
+def _stamp_listing(conn: sqlite3.Connection, kind: str, fetched_at: float) -> None:
+    conn.execute("INSERT INTO listings (kind, fetched_at) VALUES (?, ?) "
+                 "ON CONFLICT (kind) DO UPDATE "
+                 "SET fetched_at = MAX(COALESCE(fetched_at, 0), excluded.fetched_at)",
+                 (kind, fetched_at))
+
+
+def sync_source(conn: sqlite3.Connection, kind: str, path: Path) -> Dict[str, int]:
+    """
+    Bring the index in line with one cache file. Returns counts of added,
+    updated and removed records; an unchanged file is not even read.
+
+    A file this module did not write was rebuilt whole by the tool that
+    owns it, so every record in it counts as fetched at the file's mtime.
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return {}
+    seen = conn.execute("SELECT mtime_ns, size FROM sources WHERE path = ?",
+                        (str(path),)).fetchone()
+    if seen == (st.st_mtime_ns, st.st_size):
+        return {}
+
+    try:
+        raw = json.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return {}  # Being rewritten; the next lookup tries again
+    project = PROJECTIONS[kind]
+    incoming = {}
+    for item in raw if isinstance(raw, list) else []:
+        if isinstance(item, dict) and item.get("id"):
+            record = project(item)
+            incoming[record["id"]] = (record, _digest(record))
+
+    existing = dict(conn.execute("SELECT id, digest FROM records WHERE kind = ?", (kind,)))
+    changed = [row for record_id, row in incoming.items() if existing.get(record_id) != row[1]]
+    removed = [record_id for record_id in existing if record_id not in incoming]
+    with conn:
+        write_records(conn, kind, changed, st.st_mtime)
+        delete_records(conn, kind, removed)
+        conn.execute("UPDATE records SET fetched_at = ? WHERE kind = ? "
+                     "AND (fetched_at IS NULL OR fetched_at < ?)", (st.st_mtime, kind, st.st_mtime))
+        _stamp_listing(conn, kind, st.st_mtime)
+        _register_source(conn, path, st)
+    added = sum(1 for record, _ in changed if record["id"] not in existing)
+    return {"added": added, "updated": len(changed) - added, "removed": len(removed)}
+
+
+def _load_cache_file(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Raw records of one cache file by id; a later duplicate replaces an earlier one."""
+    try:
+        raw = json.loads(path.read_bytes())
+    except FileNotFoundError:
+        return {}
+    return {item["id"]: item for item in raw if isinstance(item, dict) and item.get("id")}
+
+
+def merge_source(conn: sqlite3.Connection, kind: str, path: Path,
+                 fetched: Dict[str, Optional[Dict[str, Any]]], complete: bool) -> Dict[str, int]:
+    """
+    Delta-merge fetched raw records into one cache file and the index.
+
+    ``fetched`` maps ids to raw records in the cache file's format, or to
+    None for records that no longer exist. With ``complete`` it is the whole
+    listing, and cached records missing from it are removed as well. Fetched
+    fields are laid over the cached record, so fields only the tool that
+    owns the file writes are kept. The file is rewritten only if a record
+    changed; every fetched record has its fetched-at time bumped, but only
+    changed projections are rewritten.
+    """
+    now = time.time()
+    current = _load_cache_file(path)
+    gone = [record_id for record_id in current
+            if (complete and record_id not in fetched) or
+            (record_id in fetched and fetched[record_id] is None)]
+    fresh = {record_id: dict(current.get(record_id) or {}, **item)
+             for record_id, item in fetched.items() if item is not None}
+    changed_raw = [record_id for record_id, item in fresh.items() if current.get(record_id) != item]
+    added = sum(1 for record_id in changed_raw if record_id not in current)
+
+    wrote = None
+    if changed_raw or gone:
+        for record_id in gone:
+            del current[record_id]
+        current.update((record_id, fresh[record_id]) for record_id in changed_raw)
+        _atomic_write(path, json.dumps(list(current.values()), indent=2, ensure_ascii=False))
+        wrote = path.stat()
+
+    project = PROJECTIONS[kind]
+    existing = dict(conn.execute("SELECT id, digest FROM records WHERE kind = ?", (kind,)))
+    rows = [(record, _digest(record)) for record in map(project, fresh.values())]
+    with conn:
+        write_records(conn, kind, [row for row in rows if existing.get(row[0]["id"]) != row[1]], now)
+        delete_records(conn, kind, [record_id for record_id in existing if record_id not in current])
+        conn.executemany("UPDATE records SET fetched_at = ? WHERE kind = ? AND id = ?",
+                         [(now, kind, record_id) for record_id in fresh])
+        if complete:
+            _stamp_listing(conn, kind, now)
+        if wrote is not None:
+            _register_source(conn, path, wrote)  # Our own write; sync_source need not re-read it
+    return {"added": added, "updated": len(changed_raw) - added, "removed": len(gone)}
+
+
+def to_cache_channel(channel: Dict[str, Any], users_by_id: Dict[str, Dict[str, Any]],
+                     users_by_name: Dict[str, Dict[str, Any]],
+                     old: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Convert a conversations.list entry to the channel cache's format. Direct
+    messages are named after their members: a DM's member is looked up by
+    id, a group DM's members by the user names in its channel name.
+    """
+    def real_name(user: Optional[Dict[str, Any]]) -> str:
+        return (user or {}).get("real_name") or ""
+
+    name = channel.get("name") or ""
+    if channel.get("is_im"):
+        user = users_by_id.get(channel.get("user") or "")
+        entry = {"name": "@" + ((user or {}).get("name") or channel.get("user") or ""),
+                 "topic": "", "purpose": f"DM with {real_name(user)}",
+                 "memberCount": 2, "mpim": False, "im": True, "private": False}
+    elif channel.get("is_mpim"):
+        # mpdm-alice--bob--carol-1
+        members = name[len("mpdm-"):].rsplit("-", 1)[0].split("--")
+        names = ", ".join(real_name(users_by_name.get(m)) for m in members)
+        entry = {"name": "@" + name, "topic": "", "purpose": "Group DM with " + names,
+                 "memberCount": len(members), "mpim": True, "im": False, "private": True}
+    else:
+        entry = {"name": "#" + name,
+                 "topic": (channel.get("topic") or {}).get("value") or "",
+                 "purpose": (channel.get("purpose") or {}).get("value") or "",
+                 "memberCount": channel.get("num_members") or 0,
+                 "mpim": False, "im": False, "private": bool(channel.get("is_private"))}
+    if old and (entry["im"] or entry["mpim"]):
+        # Membership of a DM never changes; keep the names as first rendered
+        entry["purpose"] = old.get("purpose", entry["purpose"])
+    return dict({"id": channel.get("id")}, **entry)
+
+
+def fetch(cache_dir: Optional[Path] = None, targets: Iterable[str] = tuple(SOURCES),
+          client: Optional[SlackClient] = None) -> Optional[Dict[str, Dict[str, int]]]:
+    """
+    Refresh records from the Slack API and merge them into the caches. A
+    target is a kind ("user", "channel") for its whole listing, or
+    "kind:id" for one record. Returns None if another fetch holds the lock.
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    listed: set = set()
+    wanted: Dict[str, List[str]] = {}
+    for target in targets:
+        kind, _, record_id = target.partition(":")
+        if kind in SOURCES:
+            if record_id:
+                wanted.setdefault(kind, []).append(record_id)
+            else:
+                listed.add(kind)
+
+    lock_fd = os.open(cache_dir / LOCK_NAME, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return None  # A fetch is already running
+        client = client or SlackClient()
+        conn = connect(cache_dir)
+        try:
+            results = {}
+            for kind, name in SOURCES.items():  # Users first: DM names come from them
+                if kind not in listed and kind not in wanted:
+                    continue
+                path = cache_dir / name
+                sync_source(conn, kind, path)
+                if kind == "user":
+                    if kind in listed:
+                        fetched = {u["id"]: u for u in client.list_users()}
+                    else:
+                        fetched = {i: client.user_info(i) for i in wanted[kind]}
+                else:
+                    sync_source(conn, "user", cache_dir / SOURCES["user"])
+                    users_by_id, users_by_name = {}, {}
+                    for (data,) in conn.execute("SELECT data FROM records WHERE kind = 'user'"):
+                        user = json.loads(data)
+                        users_by_id[user["id"]] = user
+                        if user["name"]:
+                            users_by_name[user["name"]] = user
+                    cached = _load_cache_file(path)
+                    if kind in listed:
+                        raw = {c["id"]: c for c in client.list_conversations()}
+                    else:
+                        raw = {i: client.conversation_info(i) for i in wanted[kind]}
+                    fetched = {i: to_cache_channel(c, users_by_id, users_by_name, cached.get(i))
+                               if c else None
+                               for i, c in raw.items()}
+                results[kind] = merge_source(conn, kind, path, fetched, complete=kind in listed)
+            return results
+        finally:
+            conn.close()
+    finally:
+        os.close(lock_fd)
+
+
+def _fetch_in_background(cache_dir: Path, targets: List[str]) -> None:
+    env = dict(os.environ, **{CACHE_DIR_ENV: str(cache_dir)})
+    subprocess.Popen([sys.executable, str(Path(__file__).resolve()), "fetch"] + targets,
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True, env=env)
+
+
+class SlackCache:
+    """Lazy, indexed view of the Slack caches."""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = cache_dir or get_cache_dir()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._revalidating: set = set()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.refresh()
+        return self._conn
+
+    def refresh(self) -> Dict[str, Dict[str, int]]:
+        """Re-index any cache file that changed since it was last read."""
+        if self._conn is None:
+            self._conn = connect(self.cache_dir)
+        return {kind: sync_source(self._conn, kind, self.cache_dir / name)
+                for kind, name in SOURCES.items()}
+
+    def get(self, kind: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """Return one projected record by id."""
+        rows = self.conn.execute("SELECT data, fetched_at FROM records WHERE kind = ? AND id = ?",
+                                 (kind, record_id))
+        found = self._decode(kind, rows)
+        return found[0] if found else None
+
+    def find(self, kind: str, name: str) -> List[Dict[str, Any]]:
+        """Records whose name, display name or real name equals the given name."""
+        rows = self.conn.execute(
+            "SELECT r.data, r.fetched_at FROM names n JOIN records r ON r.kind = n.kind AND r.id = n.id "
+            "WHERE n.kind = ? AND n.key = ?", (kind, normalize(name)))
+        return self._ranked(self._decode(kind, rows))
+
+    def complete(self, kind: str, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Records with a name starting with the prefix, as a B-tree range scan."""
+        key = normalize(prefix)
+        rows = self.conn.execute(
+            "SELECT DISTINCT r.data, r.fetched_at FROM names n "
+            "JOIN records r ON r.kind = n.kind AND r.id = n.id "
+            "WHERE n.kind = ? AND n.key >= ? AND n.key < ? ORDER BY n.key LIMIT ?",
+            (kind, key, key + "\U0010ffff", limit * 3))
+        return self._ranked(self._decode(kind, rows))[:limit]
+
+    def _decode(self, kind: str, rows: Iterable[Tuple[str, Optional[float]]]) -> List[Dict[str, Any]]:
+        """Decode looked-up rows, revalidating any past the TTL."""
+        cutoff = time.time() - TTL
+        records, stale = [], []
+        for data, fetched_at in rows:
+            record = json.loads(data)
+            records.append(record)
+            if (fetched_at or 0) < cutoff:
+                stale.append(record["id"])
+        self._revalidate(kind, stale)
+        return records
+
+    def _revalidate(self, kind: str, stale: List[str]) -> None:
+        """Start one background fetch per kind for stale records or a stale listing."""
+        if kind in self._revalidating or not get_token():
+            return
+        row = self.conn.execute("SELECT fetched_at FROM listings WHERE kind = ?", (kind,)).fetchone()
+        if not row or (row[0] or 0) < time.time() - TTL or len(stale) > MAX_TARGETED:
+            targets = [kind]
+        elif stale:
+            targets = [f"{kind}:{record_id}" for record_id in stale]
+        else:
+            return
+        self._revalidating.add(kind)
+        _fetch_in_background(self.cache_dir, targets)
+
+    @staticmethod
+    def _ranked(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Active accounts before deactivated ones; otherwise keep index order
+        unique = list({r["id"]: r for r in records}.values())
+        return sorted(unique, key=lambda r: bool(r.get("deleted")))
+
+    def user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return self.get("user", user_id)
+
+    def channel(self, channel_id: str) -> Optional[Dict[str, Any]]:
+        return self.get("channel", channel_id)
+
+    def find_user(self, name: str) -> Optional[Dict[str, Any]]:
+        found = self.find("user", name)
+        return found[0] if found else None
+
+    def find_channel(self, name: str) -> Optional[Dict[str, Any]]:
+        found = self.find("channel", name)
+        return found[0] if found else None
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def main():
+    """Command line interface for testing."""
+    from slack_api import SlackAPIError
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("user", "channel", "refresh", "fetch"):
+        print("Usage: ./slack_cache.py user|channel <name, prefix or id>")
+        print("       ./slack_cache.py refresh")
+        print("       ./slack_cache.py fetch [user|channel|user:<id>|channel:<id> ...]")
+        return
+    cache = SlackCache()
+    started = time.perf_counter()
+    if sys.argv[1] == "refresh":
+        print(json.dumps(cache.refresh()))
+    elif sys.argv[1] == "fetch":
+        try:
+            result = fetch(cache.cache_dir, sys.argv[2:] or tuple(SOURCES))
+        except SlackAPIError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(result) if result is not None else "Another fetch is running")
+    else:
+        kind, query = sys.argv[1], " ".join(sys.argv[2:])
+        record = cache.get(kind, query)
+        matches = [record] if record else cache.find(kind, query) or cache.complete(kind, query)
+        for match in matches:
+            print(json.dumps(match))
+        if not matches:
+            print("No match")
+    print(f"({(time.perf_counter() - started) * 1000:.2f} ms)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Shared test setup. The hook utilities are plain scripts that import their
+siblings by putting their own directory on sys.path; do the same here.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent / "hooks"
+for subdir in ("logs", "policy", "context", "slack"):
+    sys.path.insert(0, str(HOOKS_DIR / "utils" / subdir))
+
+
+@pytest.fixture
+def log_root(tmp_path, monkeypatch):
+    """A private CLAUDE_HOOKS_LOG_DIR for one test."""
+    root = tmp_path / "logs"
+    root.mkdir()
+    monkeypatch.setenv("CLAUDE_HOOKS_LOG_DIR", str(root))
+    return root
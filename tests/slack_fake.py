@@ -0,0 +1,76 @@
+"""
+A local stand-in for the Slack Web API, enough for the cache refresh:
+users.list, conversations.list, users.info and conversations.info with
+cursor pagination, and an optional rate limit on the first call.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qsl
+
+
+class FakeSlack:
+    """Serves the given users and channels until ``close``."""
+
+    def __init__(self, users: List[Dict[str, Any]], channels: List[Dict[str, Any]],
+                 page_size: int = 2, rate_limit_first: bool = False):
+        self.users = users
+        self.channels = channels
+        self.page_size = page_size
+        self.rate_limited = not rate_limit_first
+        self.calls: List[str] = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def answer(self, method: str, params: Dict[str, str]) -> Dict[str, Any]:
+        if method in ("users.list", "conversations.list"):
+            items = self.users if method == "users.list" else self.channels
+            start = int(params.get("cursor") or 0)
+            end = start + min(int(params.get("limit") or self.page_size), self.page_size)
+            return {"ok": True,
+                    "members" if method == "users.list" else "channels": items[start:end],
+                    "response_metadata": {"next_cursor": str(end) if end < len(items) else ""}}
+        if method == "users.info":
+            found = [u for u in self.users if u["id"] == params.get("user")]
+            return {"ok": True, "user": found[0]} if found else {"ok": False, "error": "user_not_found"}
+        if method == "conversations.info":
+            found = [c for c in self.channels if c["id"] == params.get("channel")]
+            return ({"ok": True, "channel": found[0]} if found
+                    else {"ok": False, "error": "channel_not_found"})
+        return {"ok": False, "error": "unknown_method"}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                method = self.path.rsplit("/", 1)[-1]
+                length = int(self.headers.get("Content-Length") or 0)
+                params = dict(parse_qsl(self.rfile.read(length).decode("utf-8")))
+                fake.calls.append(method)
+                if not fake.rate_limited:
+                    fake.rate_limited = True
+                    self.send_response(429)
+                    self.send_header("Retry-After", "0")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                data = json.dumps(fake.answer(method, params)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
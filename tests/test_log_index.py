@@ -0,0 +1,83 @@
+"""Incremental ingestion and queries of the SQLite hook index."""
+
+import log_index
+from log_store import append_line, get_log_path, rotate_log, stamp_record
+from secret_scanner import redact_payload
+
+
+PAYLOAD = {"session_id": "s1", "cwd": "/work/proj", "hook_event_name": "PreToolUse",
+           "tool_name": "Bash"}
+
+
+def _log_command(command):
+    """Log a Bash call the way pre_tool_use does: stamped, then redacted."""
+    record, _ = redact_payload(stamp_record(dict(PAYLOAD, tool_input={"command": command})))
+    path = get_log_path(record, "pre_tool_use")
+    append_line(path, record)
+    return path
+
+
+def _commands(root):
+    return [row["command"] for row in log_index.query(root, tool_name="Bash")]
+
+
+def test_command_holding_a_secret_is_found_as_typed(log_root):
+    typed = "curl -H 'Authorization: Bearer ghp_" + "a1B2c3D4e5" * 4 + "' https://example.com"
+    path = _log_command(typed)
+    assert "ghp_" not in path.read_text()
+
+    log_index.update_index(log_root)
+    assert log_index.count(log_root, command=typed) == 1
+    assert log_index.count(log_root, command="curl https://example.com") == 0
+
+
+def test_cursor_resets_across_rotations(log_root):
+    path = _log_command("echo 1")
+    _log_command("echo 2")
+    assert log_index.update_index(log_root) == 2
+
+    # Rotated after a partial read, with no new active file yet
+    _log_command("echo 3")
+    rotate_log(path)
+    assert log_index.update_index(log_root) == 1
+
+    _log_command("echo 4")
+    assert log_index.update_index(log_root) == 1
+    _log_command("echo 5")
+    rotate_log(path)
+    _log_command("echo 6")
+    assert log_index.update_index(log_root) == 2
+    assert log_index.update_index(log_root) == 0
+    assert _commands(log_root) == [f"echo {n}" for n in range(1, 7)]
+
+
+def test_an_index_from_an_older_version_is_rebuilt(log_root):
+    _log_command("make test")
+    log_index.update_index(log_root)
+    conn = log_index.connect(log_root)
+    with conn:
+        conn.execute("UPDATE events SET command_hash = 'stale'")
+        conn.execute("PRAGMA user_version = 0")
+    conn.close()
+
+    assert log_index.update_index(log_root) == 1
+    assert log_index.count(log_root, command="make test") == 1
+
+
+def _log_stop(log_name, session_id, transcript_path):
+    record = {"session_id": session_id, "cwd": "/work/proj", "hook_event_name": "Stop",
+              "transcript_path": transcript_path}
+    append_line(get_log_path(record, log_name), record)
+
+
+def test_transcripts_come_from_stop_records_in_the_index(log_root):
+    _log_stop("stop", "s1", "/t/s1.jsonl")
+    _log_stop("stop", "s1", "/t/s1.jsonl")
+    _log_stop("subagent_stop", "s1", "/t/s1-agent.jsonl")
+    assert list(log_index.iter_transcripts(log_root)) == [
+        ("s1", "/t/s1.jsonl"), ("s1", "/t/s1-agent.jsonl")]
+
+    _log_stop("stop", "s2", "/t/s2.jsonl")
+    assert [path for _, path in log_index.iter_transcripts(log_root)] == [
+        "/t/s1.jsonl", "/t/s1-agent.jsonl", "/t/s2.jsonl"]
+    assert log_index.update_index(log_root) == 0
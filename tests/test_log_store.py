@@ -0,0 +1,166 @@
+"""Appends, rotation and reads of the central hook log store."""
+
+import json
+import multiprocessing
+import os
+import time
+
+import log_store
+from blob_store import externalize, get_blob_dir, put_blob, rehydrate
+from log_store import append_line, iter_log, iter_records, rotate_log, sweep
+
+
+def _append_many(path, worker, count, size):
+    for seq in range(count):
+        append_line(path, {"worker": worker, "seq": seq, "body": "x" * size})
+
+
+def test_concurrent_appends_never_interleave(tmp_path):
+    path = tmp_path / "post_tool_use.jsonl"
+    workers = [multiprocessing.Process(target=_append_many, args=(path, w, 50, 64 * 1024))
+               for w in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    lines = path.read_bytes().split(b"\n")
+    assert lines[-1] == b""
+    records = [json.loads(line) for line in lines[:-1]]
+    assert len(records) == 8 * 50
+    assert {(r["worker"], r["seq"]) for r in records} == {(w, s) for w in range(8) for s in range(50)}
+    assert all(len(r["body"]) == 64 * 1024 for r in records)
+
+
+def test_append_stays_fast(tmp_path):
+    # A generous bound; a hook appends one line, this appends a thousand
+    path = tmp_path / "pre_tool_use.jsonl"
+    started = time.perf_counter()
+    for seq in range(1000):
+        append_line(path, {"seq": seq, "tool_input": {"command": "ls -la"}})
+    assert time.perf_counter() - started < 2.0
+
+
+def test_torn_trailing_line_is_skipped(tmp_path):
+    path = tmp_path / "stop.jsonl"
+    append_line(path, {"seq": 1})
+    append_line(path, {"seq": 2})
+    with open(path, "ab") as f:
+        f.write(b'{"seq": 3, "trunc')
+    assert [r["seq"] for r in iter_records(path)] == [1, 2]
+
+
+def test_legacy_json_array_is_readable(tmp_path):
+    path = tmp_path / "chat.json"
+    path.write_text(json.dumps([{"seq": 1}, {"seq": 2}]))
+    assert [r["seq"] for r in iter_records(path)] == [1, 2]
+
+
+def test_size_rotation_keeps_every_record(tmp_path):
+    session_dir = tmp_path / "session"
+    session_dir.mkdir()
+    path = session_dir / "post_tool_use.jsonl"
+    for seq in range(40):
+        append_line(path, {"seq": seq, "body": "y" * 1000}, max_bytes=8 * 1024)
+    segments = [p for p in session_dir.iterdir() if log_store.SEGMENT_RE.match(p.name)]
+    assert segments and all(p.name.endswith((".gz", ".zst")) for p in segments)
+    assert [r["seq"] for r in iter_log(session_dir, "post_tool_use")] == list(range(40))
+
+
+def test_rotate_log_then_append_starts_a_new_file(tmp_path):
+    path = tmp_path / "stop.jsonl"
+    append_line(path, {"seq": 1})
+    segment = rotate_log(path)
+    assert segment is not None and segment.exists() and not path.exists()
+    append_line(path, {"seq": 2})
+    assert [r["seq"] for r in iter_log(tmp_path, "stop")] == [1, 2]
+
+
+def _log_with_blob(session_dir, name, text, root, age):
+    """Write one record whose payload is stored as a blob, rotated to a segment aged ``age``."""
+    path = session_dir / f"{name}.jsonl"
+    append_line(path, {"tool_input": externalize({"content": text}, threshold=10, root=root)})
+    segment = rotate_log(path)
+    os.utime(segment, (time.time() - age, time.time() - age))
+    return segment
+
+
+def _age_blobs(root, age):
+    for path in get_blob_dir(root).rglob("*.gz"):
+        os.utime(path, (time.time() - age, time.time() - age))
+
+
+def _tree_bytes(root):
+    return sum(p.stat().st_size for p in root.rglob("*") if p.is_file())
+
+
+def test_sweep_under_the_cap_deletes_nothing(log_root):
+    session_dir = log_root / "p" / "2026-01-01" / "s"
+    session_dir.mkdir(parents=True)
+    _log_with_blob(session_dir, "post_tool_use", "old payload " * 50, log_root, 3000)
+    stats = sweep(log_root, retention_bytes=10 ** 9)
+    assert stats["deleted"] == stats["blobs_deleted"] == 0
+
+
+def test_sweep_keeps_blobs_that_surviving_logs_reference(log_root):
+    session_dir = log_root / "p" / "2026-01-01" / "s"
+    session_dir.mkdir(parents=True)
+    old = _log_with_blob(session_dir, "post_tool_use", "only in the old segment " * 400, log_root, 3000)
+    shared = "shared by both segments " * 400
+    append_line(session_dir / "post_tool_use.jsonl",
+                {"tool_input": externalize({"content": shared}, threshold=10, root=log_root)})
+    os.utime(rotate_log(session_dir / "post_tool_use.jsonl"), (time.time() - 2000,) * 2)
+    newer = _log_with_blob(session_dir, "stop", shared, log_root, 1000)
+    active = session_dir / "pre_tool_use.jsonl"
+    append_line(active, {"tool_input": externalize({"content": "active " * 400}, threshold=10,
+                                                   root=log_root)})
+    orphan = put_blob("referenced by nothing " * 400, log_root)
+    _age_blobs(log_root, 4000)
+
+    orphan_size = (get_blob_dir(log_root) / orphan[:2] / f"{orphan}.gz").stat().st_size
+    stats = sweep(log_root, max_age=10 ** 6,
+                  retention_bytes=_tree_bytes(log_root) - orphan_size - 1)
+
+    assert not old.exists() and newer.exists() and active.exists()
+    assert stats["deleted"] == 1 and stats["blobs_deleted"] == 2  # The orphan, then old's own blob
+    for log_name in ("post_tool_use", "stop", "pre_tool_use"):
+        for record in iter_log(session_dir, log_name):
+            assert rehydrate(record["tool_input"], lazy=False, root=log_root)["content"]
+
+
+def test_sweep_spares_young_unreferenced_blobs(log_root):
+    digest = put_blob("just stored, line not yet appended " * 100, log_root)
+    sweep(log_root, retention_bytes=0)
+    assert (get_blob_dir(log_root) / digest[:2] / f"{digest}.gz").exists()
+
+
+def test_maybe_sweep_runs_in_the_background(log_root, monkeypatch):
+    started = []
+    monkeypatch.setattr(log_store, "sweep", lambda *a, **k: started.append("inline"))
+    monkeypatch.setattr(log_store, "_sweep_in_background", lambda root: started.append(root))
+    assert log_store.maybe_sweep(log_root)
+    assert not log_store.maybe_sweep(log_root)  # Claimed for SWEEP_INTERVAL
+    assert started == [log_root]
+
+
+def _at(monkeypatch, when):
+    class FrozenDatetime(log_store.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return when
+    monkeypatch.setattr(log_store, "datetime", FrozenDatetime)
+
+
+def test_session_keeps_its_first_day_past_midnight(log_root, monkeypatch):
+    payload = {"session_id": "s1", "cwd": "/work/proj"}
+    _at(monkeypatch, log_store.datetime(2026, 10, 18, 23, 59))
+    first = log_store.get_session_dir(payload)
+
+    _at(monkeypatch, log_store.datetime(2026, 10, 19, 0, 1))
+    assert log_store.get_session_dir(payload) == first
+    _at(monkeypatch, log_store.datetime(2026, 10, 25, 9, 0))
+    assert log_store.get_session_dir(payload) == first
+    assert [r["date"] for r in log_store.iter_sessions(log_root)] == ["2026-10-18"]
+
+    other = log_store.get_session_dir(dict(payload, session_id="s2"))
+    assert other.parent.name == "2026-10-25"
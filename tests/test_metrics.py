@@ -0,0 +1,58 @@
+"""Hook metrics: appended deltas, folding and the Prometheus rendering."""
+
+import multiprocessing
+
+import metrics
+from metrics import DELTAS_NAME, fold_deltas, metric_key, record, to_prometheus
+
+
+def _record_many(root, count):
+    for _ in range(count):
+        record({metric_key("claude_hook_invocations_total", hook="stop"): 1},
+               {metric_key("claude_hook_duration_seconds", hook="stop"): [0.003]}, root)
+
+
+def test_concurrent_deltas_all_fold_in(tmp_path):
+    workers = [multiprocessing.Process(target=_record_many, args=(tmp_path, 50)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    data = fold_deltas(tmp_path)
+    assert data["counters"]['claude_hook_invocations_total{hook="stop"}'] == 200
+    hist = data["histograms"]['claude_hook_duration_seconds{hook="stop"}']
+    assert hist["count"] == 200
+    assert hist["buckets"][metrics.BUCKETS.index(0.005)] == 200
+    assert not (tmp_path / DELTAS_NAME).exists()
+
+    # A second fold adds nothing new
+    assert fold_deltas(tmp_path) == data
+
+
+def test_fold_picks_up_an_interrupted_fold(tmp_path):
+    _record_many(tmp_path, 2)
+    (tmp_path / DELTAS_NAME).rename(tmp_path / f"{DELTAS_NAME}.1.fold")
+    _record_many(tmp_path, 1)
+    assert fold_deltas(tmp_path)["counters"]['claude_hook_invocations_total{hook="stop"}'] == 3
+    assert list(tmp_path.glob(f"{DELTAS_NAME}*")) == []
+
+
+def test_label_values_are_escaped():
+    key = metric_key("claude_hook_blocked_total", hook="pre", rule='a\\b"c\nd')
+    assert key == 'claude_hook_blocked_total{hook="pre",rule="a\\\\b\\"c\\nd"}'
+    text = to_prometheus({"counters": {key: 1}, "histograms": {}})
+    assert "\n" not in text.splitlines()[-1]
+    assert text.splitlines()[-1] == key + " 1"
+
+
+def test_hook_metrics_flush_appends_one_line(tmp_path):
+    hook = metrics.HookMetrics("notification", root=tmp_path)
+    with hook.span("parse"):
+        pass
+    hook.count("claude_hook_blocked_total", rule="x")
+    hook.flush()
+    hook.flush()
+    assert len((tmp_path / DELTAS_NAME).read_text().splitlines()) == 1
+    data = metrics.load_metrics(tmp_path)
+    assert data["counters"]['claude_hook_invocations_total{hook="notification"}'] == 1
@@ -0,0 +1,45 @@
+"""
+The read-only fast path's .env policy: the verdicts of the full pipeline for
+Read, and .env names in the paths and globs of Glob, Grep and LS.
+"""
+import importlib.util
+
+import pytest
+
+from conftest import HOOKS_DIR
+
+
+@pytest.fixture(scope="module")
+def hook():
+    spec = importlib.util.spec_from_file_location("pre_tool_use", HOOKS_DIR / "pre_tool_use.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize("file_path", ["/p/.env", "/p/.env.local", "/p/.envrc", "/p/.env.sample"])
+def test_read_gets_the_full_pipeline_verdict(hook, file_path):
+    tool_input = {"file_path": file_path}
+    assert hook.is_env_path_access("Read", tool_input) == hook.is_env_file_access("Read", tool_input)
+
+
+@pytest.mark.parametrize("tool_name, tool_input", [
+    ("Glob", {"pattern": "**/.env*"}),
+    ("Glob", {"pattern": ".env.production", "path": "app"}),
+    ("Grep", {"pattern": "API_KEY", "glob": "{.env,*.md}"}),
+    ("Grep", {"pattern": "API_KEY", "path": "/p/.env"}),
+    ("LS", {"path": "/p/config/.env.local"}),
+])
+def test_env_names_in_paths_and_globs_are_blocked(hook, tool_name, tool_input):
+    assert hook.is_env_path_access(tool_name, tool_input)
+
+
+@pytest.mark.parametrize("tool_name, tool_input", [
+    ("Glob", {"pattern": "**/*.py"}),
+    ("Glob", {"pattern": "**/.envrc"}),
+    ("Grep", {"pattern": "\\.env", "path": "src"}),
+    ("Grep", {"pattern": "x", "glob": ".env.sample"}),
+    ("LS", {"path": "/p/venv.environment/"}),
+])
+def test_other_names_are_allowed(hook, tool_name, tool_input):
+    assert not hook.is_env_path_access(tool_name, tool_input)
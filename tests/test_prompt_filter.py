@@ -0,0 +1,67 @@
+"""
+Prompt filter matching: ordering across literals and regexes, offsets
+under case folding, backreferences and rule parsing.
+"""
+from prompt_filter import PromptFilter, load_filter, parse_rules
+
+
+def _filter(text):
+    return PromptFilter(parse_rules(text))
+
+
+def test_literal_starting_first_wins_over_one_ending_first():
+    prompt_filter = _filter("please delete everything => wide\ndelete => narrow\n")
+    found = prompt_filter.match("now please delete everything")
+    assert found.rule.reason == "wide"
+    assert (found.start, found.end) == (4, 28)
+
+
+def test_shorter_literal_starting_first_wins():
+    prompt_filter = _filter("rm -rf / => root\nrf => flag\n")
+    found = prompt_filter.match("run rm -rf / now")
+    assert found.rule.reason == "root"
+
+
+def test_literal_and_regex_rank_by_start_then_line():
+    prompt_filter = _filter("re:drop\\s+table => sql\ntable => word\n")
+    assert prompt_filter.match("a table, then drop table").rule.reason == "word"
+    assert prompt_filter.match("drop table").rule.reason == "sql"
+
+
+def test_offsets_survive_characters_that_lengthen_when_lowered():
+    prompt_filter = _filter("secret => s\n")
+    text = "İİ the SECRET"
+    found = prompt_filter.match(text)
+    assert text[found.start:found.end] == "SECRET"
+
+
+def test_numbered_backreferences_keep_their_group():
+    prompt_filter = _filter("re:foo => first\nre:\\b(\\w+) \\1\\b => repeated word\n")
+    found = prompt_filter.match("this is is odd")
+    assert found.rule.reason == "repeated word"
+    assert (found.start, found.end) == (5, 10)
+    assert prompt_filter.match("this is not odd") is None
+
+
+def test_reason_follows_the_last_separator():
+    (rule,) = parse_rules("re:a\\s*=>\\s*b => arrow found\n")
+    assert rule.pattern == "a\\s*=>\\s*b"
+    assert rule.reason == "arrow found"
+    assert _filter("re:a\\s*=>\\s*b => arrow found").match("x a => b").rule is not None
+
+
+def test_rule_without_reason_gets_the_default():
+    rules = parse_rules("rm -rf\nchmod 777 =>\n")
+    assert [(r.pattern, r.reason) for r in rules] == [
+        ("rm -rf", "Blocked by prompt rule"), ("chmod 777", "Blocked by prompt rule")]
+
+
+def test_cached_automaton_matches_like_a_fresh_one(tmp_path):
+    rules = tmp_path / "prompt_rules.txt"
+    rules.write_text("delete everything => wide\nevery => narrow\n")
+    fresh = load_filter(rules)
+    cached = load_filter(rules)
+    assert (tmp_path / ".prompt_rules.txt.cache").exists()
+    text = "please delete everything"
+    assert fresh.match(text) == cached.match(text)
+    assert cached.match(text).rule.reason == "wide"
@@ -0,0 +1,41 @@
+"""Repository summary: the bounded project-type walk and the summary cache."""
+
+import json
+import time
+
+import repo_context
+
+
+def test_walk_past_its_deadline_returns_what_it_found(tmp_path):
+    (tmp_path / "main.go").write_text("package main\n")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("")
+    assert repo_context.detect_project_type(str(tmp_path)) == ("mixed:go,python", True)
+
+    project_type, finished = repo_context.detect_project_type(
+        str(tmp_path), deadline=time.monotonic() - 1)
+    assert not finished
+    assert project_type == "unknown"
+
+
+def test_summary_cut_short_is_not_complete(tmp_path, monkeypatch):
+    (tmp_path / "main.go").write_text("package main\n")
+    monkeypatch.setattr(repo_context, "detect_project_type",
+                        lambda cwd, deadline=None: ("go", False))
+    summary = repo_context.collect(str(tmp_path))
+    assert summary["project_type"] == "go"
+    assert not summary["complete"]
+
+
+def test_malformed_cache_entry_is_recomputed(tmp_path, log_root, monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(repo_context, "_revalidate_in_background", refreshed.append)
+    (tmp_path / "Cargo.toml").write_text("")
+    cache = repo_context._cache_path(str(tmp_path))
+    cache.parent.mkdir(parents=True)
+    cache.write_text(json.dumps({"key": [], "created": time.time()}))
+
+    summary = repo_context.get_summary(str(tmp_path))
+    assert summary["project_type"] == "rust"
+    assert refreshed == []
+    assert json.loads(cache.read_text())["summary"] == summary
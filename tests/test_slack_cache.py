@@ -0,0 +1,114 @@
+"""Slack cache refresh: delta merges and fetches against a fake Slack API."""
+
+import json
+
+import pytest
+
+import slack_cache
+from slack_cache import SlackCache, connect, fetch, merge_source
+from slack_fake import FakeSlack
+
+
+def _user(user_id, name, real_name, **extra):
+    return dict({"id": user_id, "name": name, "real_name": real_name, "deleted": False,
+                 "profile": {"display_name": name}}, **extra)
+
+
+ALICE = _user("U1", "alice", "Alice Liddell")
+BOB = _user("U2", "bob", "Bob Dobbs")
+CAROL = _user("U3", "carol", "Carol Danvers")
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(slack_cache.CACHE_DIR_ENV, str(tmp_path))
+    monkeypatch.setenv("SLACK_BOT_TOKEN", "xoxb-test")
+    return tmp_path
+
+
+@pytest.fixture
+def slack(monkeypatch):
+    servers = []
+
+    def serve(users, channels=(), **kwargs):
+        server = FakeSlack(list(users), list(channels), **kwargs)
+        monkeypatch.setenv("CLAUDE_HOOKS_SLACK_API_URL", server.url)
+        servers.append(server)
+        return server
+
+    yield serve
+    for server in servers:
+        server.close()
+
+
+def _write_cache(cache_dir, kind, records):
+    (cache_dir / slack_cache.SOURCES[kind]).write_text(json.dumps(records))
+
+
+def _read_cache(cache_dir, kind):
+    records = json.loads((cache_dir / slack_cache.SOURCES[kind]).read_text())
+    return {record["id"]: record for record in records}
+
+
+def test_merge_counts_only_real_changes(cache_dir):
+    _write_cache(cache_dir, "user", [ALICE, BOB])
+    path = cache_dir / slack_cache.SOURCES["user"]
+    conn = connect(cache_dir)
+    try:
+        slack_cache.sync_source(conn, "user", path)
+        before = path.stat().st_mtime_ns
+        assert merge_source(conn, "user", path, {"U1": dict(ALICE)}, complete=False) == {
+            "added": 0, "updated": 0, "removed": 0}
+        assert path.stat().st_mtime_ns == before
+
+        renamed = dict(BOB, real_name="Robert Dobbs")
+        assert merge_source(conn, "user", path, {"U2": renamed, "U3": CAROL, "U1": None},
+                            complete=False) == {"added": 1, "updated": 1, "removed": 1}
+    finally:
+        conn.close()
+    assert sorted(_read_cache(cache_dir, "user")) == ["U2", "U3"]
+    cache = SlackCache(cache_dir)
+    assert cache.find_user("Robert Dobbs")["id"] == "U2"
+    assert cache.user("U1") is None
+    cache.close()
+
+
+def test_full_fetch_keeps_fields_only_the_cache_owner_writes(cache_dir, slack):
+    _write_cache(cache_dir, "user", [dict(ALICE, presence="away"), BOB, CAROL])
+    server = slack([ALICE, dict(BOB, real_name="Robert Dobbs"),
+                    _user("U4", "dave", "Dave Bowman")], rate_limit_first=True)
+
+    assert fetch(cache_dir, ["user"]) == {"user": {"added": 1, "updated": 1, "removed": 1}}
+    assert server.calls == ["users.list"] * 3  # Rate limited once, then two pages
+    users = _read_cache(cache_dir, "user")
+    assert sorted(users) == ["U1", "U2", "U4"]
+    assert users["U1"]["presence"] == "away"
+
+    assert fetch(cache_dir, ["user"]) == {"user": {"added": 0, "updated": 0, "removed": 0}}
+
+
+def test_fetched_direct_messages_are_named_after_their_members(cache_dir, slack):
+    _write_cache(cache_dir, "user", [ALICE, BOB])
+    slack([ALICE, BOB], [
+        {"id": "C1", "name": "general", "num_members": 40,
+         "topic": {"value": "Everything"}, "purpose": {"value": ""}},
+        {"id": "D1", "is_im": True, "user": "U2"},
+        {"id": "G1", "is_mpim": True, "name": "mpdm-alice--bob-1"},
+    ])
+
+    assert fetch(cache_dir, ["channel"])["channel"]["added"] == 3
+    channels = _read_cache(cache_dir, "channel")
+    assert channels["C1"]["name"] == "#general"
+    assert channels["D1"]["name"] == "@bob"
+    assert channels["D1"]["purpose"] == "DM with Bob Dobbs"
+    assert channels["G1"]["purpose"] == "Group DM with Alice Liddell, Bob Dobbs"
+
+
+def test_targeted_fetch_drops_records_slack_no_longer_has(cache_dir, slack):
+    _write_cache(cache_dir, "user", [ALICE, BOB])
+    server = slack([ALICE])
+
+    assert fetch(cache_dir, ["user:U1", "user:U2"]) == {
+        "user": {"added": 0, "updated": 0, "removed": 1}}
+    assert server.calls == ["users.info", "users.info"]
+    assert sorted(_read_cache(cache_dir, "user")) == ["U1"]